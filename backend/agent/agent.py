@@ -1,19 +1,48 @@
+import os
+from functools import lru_cache
+
 from dotenv import load_dotenv
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
 
+from agent.models import build_model, record_model_response, start_model_timer
+from agent.parallel import (
+    discard_prefetched,
+    prefetch_tool_calls,
+    use_prefetched_result,
+)
 from agent.prompt import get_prompt
-from agent.tools import execute_sql_query, get_balance
+from agent.tools import async_execute_sql_query, async_get_balance
 
 load_dotenv()
 
+DEFAULT_MODEL = os.getenv("AGENT_MODEL", "azure/gpt-4o-mini")
+
+
+def get_agent(model: str = DEFAULT_MODEL) -> Agent:
+    """Return the financial agent for ``model``, built once per process.
+
+    ``model`` is a LiteLLM model name, or ``"scripted"`` /
+    ``"scripted:<path>"`` for the offline ``ScriptedLlm`` (see
+    ``agent.models.build_model``).
+
+    The prompt is passed as an instruction provider, so the cached agent
+    still sees the current date on every turn.
+    """
+    return _build_agent(model)
+
 
-def get_agent() -> Agent:
+@lru_cache(maxsize=None)
+def _build_agent(model: str) -> Agent:
     return Agent(
         name="financial_agent",
-        model=LiteLlm(model="azure/gpt-4o-mini"),
-        tools=[execute_sql_query, get_balance],
-        instruction=get_prompt(),
+        model=build_model(model),
+        tools=[async_execute_sql_query, async_get_balance],
+        instruction=get_prompt,
+        before_model_callback=start_model_timer,
+        after_model_callback=[record_model_response, prefetch_tool_calls],
+        # Read-only calls of one response run concurrently (agent.parallel).
+        before_tool_callback=use_prefetched_result,
+        after_agent_callback=discard_prefetched,
     )
 
 
@@ -0,0 +1,242 @@
+"""Templated answers to repeated read-only questions, without the model.
+
+Questions like "saldo saya berapa?" or "pengeluaran bulan ini?" are asked
+over and over. A message is reduced to the set of its content words (so
+"berapa saldo saya" and "saldo saya berapa?" are the same question) and
+matched exactly against the phrasings of a few read-only intents. A match
+is answered from a fresh tool result and a reply template; the reply is
+cached under the normalized message, the WIB date and the data version, so
+it is reused until a write bumps the version.
+
+Anything that could be a write (an amount, or a verb such as "catat",
+"ubah" or "hapus") bypasses the cache and goes to the model, as does every
+message that is not an exact match.
+
+Enable with ``AGENT_ANSWER_CACHE=true``.
+"""
+
+import datetime
+import os
+import re
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from dotenv import load_dotenv
+from google.genai import types
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from agent.executor import offload
+from agent.prompt import TIMEZONE
+from agent.tools import BALANCE_CONCURRENCY, async_get_balance
+from src.cache import cache_call, cache_key, get_cache
+from src.database.models import TransactionMonthlyTotal, TransactionType, engine
+from src.metrics import AGENT_ANSWER_CACHE
+
+load_dotenv()
+
+ANSWER_CACHE_ENABLED = os.getenv("AGENT_ANSWER_CACHE", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("AGENT_ANSWER_CACHE_TTL_SECONDS", "300"))
+
+STOPWORDS = frozenset("""
+    saya aku gue gw ku kamu mu nya berapa brp ya yah dong sih nih deh kak min
+    bang tolong coba cek lihat liat kasih tau tahu info sekarang skrg saat ada
+    yang apa aja saja total jumlah punya di ke untuk buat itu
+    """.split())
+
+MUTATION_WORDS = frozenset("""
+    tambah tambahin tambahkan catat catet catatin masukin masukkan input simpan
+    ubah ubahin ganti edit update koreksi betulin benerin hapus hapusin delete
+    insert salah seharusnya harusnya jadi beli bayar transfer terima dapat
+    """.split())
+_AMOUNT = re.compile(r"\d|\b(?:ribu|rb|juta|jt|k)\b")
+_WORD = re.compile(r"[a-z]+")
+
+
+def message_text(message: types.Content) -> str:
+    return " ".join(part.text for part in message.parts or [] if part.text)
+
+
+def is_mutating(text: str) -> bool:
+    """Whether ``text`` might ask for a write (it names an amount or a write verb)."""
+    lowered = text.lower()
+    return bool(_AMOUNT.search(lowered)) or not MUTATION_WORDS.isdisjoint(
+        _WORD.findall(lowered)
+    )
+
+
+def normalize(text: str) -> Tuple[str, ...]:
+    """The sorted content words of ``text``."""
+    return tuple(sorted(set(_WORD.findall(text.lower())) - STOPWORDS))
+
+
+def rupiah(amount: Any) -> str:
+    return "Rp " + f"{int(amount or 0):,}".replace(",", ".")
+
+
+def _month_totals(month: datetime.date) -> Dict[str, Any]:
+    """Income and expense totals of ``month`` from the trigger-maintained totals.
+
+    Like the tools, a database failure is returned as ``{"error": ...}``.
+    """
+    stmt = (
+        select(TransactionMonthlyTotal.type, func.sum(TransactionMonthlyTotal.total))
+        .where(TransactionMonthlyTotal.month == month)
+        .group_by(TransactionMonthlyTotal.type)
+    )
+    try:
+        with engine.connect() as connection:
+            totals = {row[0]: int(row[1] or 0) for row in connection.execute(stmt)}
+    except SQLAlchemyError as e:
+        return {"error": f"Database error: {str(e)}"}
+    return {
+        "total_income": totals.get(TransactionType.income, 0),
+        "total_expense": totals.get(TransactionType.expense, 0),
+    }
+
+
+_async_month_totals = offload(_month_totals, BALANCE_CONCURRENCY)
+
+
+async def _fetch_balance(today: datetime.date) -> Dict[str, Any]:
+    return await async_get_balance()
+
+
+async def _fetch_month(today: datetime.date) -> Dict[str, Any]:
+    return await _async_month_totals(today.replace(day=1))
+
+
+def _render_balance(result: Dict[str, Any], today: datetime.date) -> str:
+    return (
+        f"Saldo kamu sekarang {rupiah(result['balance'])} "
+        f"(total pemasukan {rupiah(result['total_income'])}, "
+        f"total pengeluaran {rupiah(result['total_expense'])})."
+    )
+
+
+def _render_month_expense(result: Dict[str, Any], today: datetime.date) -> str:
+    return (
+        f"Pengeluaran kamu bulan ini (sampai {today:%d-%m-%Y}) "
+        f"{rupiah(result['total_expense'])}."
+    )
+
+
+def _render_month_income(result: Dict[str, Any], today: datetime.date) -> str:
+    return (
+        f"Pemasukan kamu bulan ini (sampai {today:%d-%m-%Y}) "
+        f"{rupiah(result['total_income'])}."
+    )
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A read-only question, its accepted phrasings (normalized) and its answer."""
+
+    name: str
+    phrasings: FrozenSet[Tuple[str, ...]]
+    fetch: Callable[[datetime.date], Awaitable[Dict[str, Any]]]
+    render: Callable[[Dict[str, Any], datetime.date], str]
+
+
+def _phrasings(*phrases: str) -> FrozenSet[Tuple[str, ...]]:
+    return frozenset(normalize(phrase) for phrase in phrases)
+
+
+READ_ONLY_INTENTS = (
+    Intent(
+        "balance",
+        _phrasings(
+            "saldo",
+            "sisa saldo",
+            "saldo akhir",
+            "duit",
+            "sisa duit",
+            "uang",
+            "sisa uang",
+            "keuangan",
+        ),
+        _fetch_balance,
+        _render_balance,
+    ),
+    Intent(
+        "month_expense",
+        _phrasings(
+            "pengeluaran bulan ini",
+            "pengeluaran bulanan ini",
+            "belanja bulan ini",
+            "habis bulan ini",
+            "keluar bulan ini",
+            "spending bulan ini",
+        ),
+        _fetch_month,
+        _render_month_expense,
+    ),
+    Intent(
+        "month_income",
+        _phrasings(
+            "pemasukan bulan ini",
+            "pendapatan bulan ini",
+            "masuk bulan ini",
+            "income bulan ini",
+        ),
+        _fetch_month,
+        _render_month_income,
+    ),
+)
+
+
+def match_intent(text: str) -> Optional[Intent]:
+    """The read-only intent ``text`` asks for, or ``None`` (also for writes)."""
+    if is_mutating(text):
+        return None
+    return _phrased_intent(normalize(text))
+
+
+def _phrased_intent(words: Tuple[str, ...]) -> Optional[Intent]:
+    for intent in READ_ONLY_INTENTS:
+        if words in intent.phrasings:
+            return intent
+    return None
+
+
+async def cached_answer(message: types.Content) -> Optional[str]:
+    """Answer ``message`` from the cache or a template, or ``None`` for the model.
+
+    Outcomes are counted in ``agent_answer_cache_total``: ``hit`` (cached
+    reply), ``miss`` (templated from a fresh tool result), ``bypass`` (may
+    write) and ``unmatched`` (left to the model, also when the tool fails).
+    """
+    text = message_text(message)
+    if is_mutating(text):
+        AGENT_ANSWER_CACHE.inc(result="bypass")
+        return None
+    words = normalize(text)
+    intent = _phrased_intent(words)
+    if intent is None:
+        AGENT_ANSWER_CACHE.inc(result="unmatched")
+        return None
+
+    today = datetime.datetime.now(TIMEZONE).date()
+    cache = get_cache()
+    key = await cache_call(
+        cache, cache_key, "answer", intent.name, words, today.isoformat()
+    )
+    hit = await cache_call(cache, cache.get, key)
+    if hit is not None:
+        AGENT_ANSWER_CACHE.inc(result="hit")
+        return hit.decode()
+
+    result = await intent.fetch(today)
+    if "error" in result:
+        AGENT_ANSWER_CACHE.inc(result="unmatched")
+        return None
+    reply = intent.render(result, today)
+    await cache_call(cache, cache.set, key, reply.encode(), ANSWER_CACHE_TTL_SECONDS)
+    AGENT_ANSWER_CACHE.inc(result="miss")
+    return reply
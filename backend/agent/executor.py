@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from src.database.config import engine_connection_budget
+from src.metrics import AGENT_TOOL_DURATION, AGENT_TOOL_ERRORS, AGENT_TOOL_WAIT
+
+load_dotenv()
+
+# Threads shared by all blocking tools; keep it at or below the sync engine's
+# DB_POOL_SIZE + DB_MAX_OVERFLOW so threads never queue for a connection.
+TOOL_THREADS = int(
+    os.getenv("AGENT_TOOL_THREADS") or min(8, engine_connection_budget() or 8)
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass
+class ToolTiming:
+    """Cumulative timings of one tool, in seconds."""
+
+    calls: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+    max_run_seconds: float = 0.0
+
+
+_timings: Dict[str, ToolTiming] = {}
+_timings_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=TOOL_THREADS, thread_name_prefix="agent-tool"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the tool threads; called when the server shuts down."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def tool_timings() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of the timings of every offloaded tool, by tool name."""
+    with _timings_lock:
+        return {name: asdict(timing) for name, timing in _timings.items()}
+
+
+def offload(
+    fn: Callable[..., Any], max_concurrency: int
+) -> Callable[..., Awaitable[Any]]:
+    """Wrap a blocking tool as a coroutine that runs on the tool thread pool.
+
+    At most ``max_concurrency`` calls of ``fn`` run at once; further calls
+    wait on the event loop without occupying a thread. The wrapper keeps
+    ``fn``'s name, signature and docstring, so ADK declares the same tool.
+    Time spent waiting for a slot and running is recorded per tool (see
+    ``tool_timings``) and exported to ``/metrics``.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    name = fn.__name__
+    with _timings_lock:
+        timing = _timings.setdefault(name, ToolTiming())
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        queued = time.perf_counter()
+        async with semaphore:
+            started = time.perf_counter()
+            with _timings_lock:
+                timing.in_flight += 1
+            failed = False
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    _get_executor(), functools.partial(fn, *args, **kwargs)
+                )
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                with _timings_lock:
+                    timing.in_flight -= 1
+                    timing.calls += 1
+                    timing.errors += failed
+                    timing.wait_seconds += started - queued
+                    timing.run_seconds += elapsed
+                    timing.max_run_seconds = max(timing.max_run_seconds, elapsed)
+                AGENT_TOOL_WAIT.observe(started - queued, tool=name)
+                AGENT_TOOL_DURATION.observe(elapsed, tool=name)
+                if failed:
+                    AGENT_TOOL_ERRORS.inc(tool=name)
+
+    return wrapper
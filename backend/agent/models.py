@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.lite_llm import LiteLlm, LiteLLMClient
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from src.metrics import LLM_CALL_DURATION, LLM_TOKENS
+
+SCRIPTED_PREFIX = "scripted"
+
+# Check the balance, then answer with the tool result.
+DEFAULT_SCRIPT: Dict[str, Any] = {
+    "latency_ms": 0,
+    "token_delay_ms": 0,
+    "steps": [
+        {"tool": "get_balance", "args": {}},
+        {"text": "Berikut ringkasan saldo kamu: {result}"},
+    ],
+}
+
+
+CHARS_PER_TOKEN = 4
+# OpenAI / Azure cache prompt prefixes of at least 1024 tokens, in steps of
+# 128 tokens.
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+
+class PrefixCache:
+    """Simulated provider prompt cache, keyed on prompt prefixes."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._prefixes: OrderedDict[str, None] = OrderedDict()
+
+    def lookup(self, prompt: str) -> Tuple[int, int]:
+        """Return ``(prompt tokens, cached tokens)`` and cache ``prompt``."""
+        block = CACHE_BLOCK_TOKENS * CHARS_PER_TOKEN
+        digest = hashlib.sha1()
+        cached_chars = 0
+        missed = False
+        for end in range(block, len(prompt) + 1, block):
+            digest.update(prompt[end - block : end].encode())
+            key = digest.hexdigest()
+            if not missed and key in self._prefixes:
+                cached_chars = end
+                self._prefixes.move_to_end(key)
+            else:
+                missed = True
+                self._prefixes[key] = None
+        while len(self._prefixes) > self.max_entries:
+            self._prefixes.popitem(last=False)
+
+        cached = cached_chars // CHARS_PER_TOKEN
+        return len(prompt) // CHARS_PER_TOKEN, (
+            cached if cached >= CACHE_MIN_TOKENS else 0
+        )
+
+
+def _prompt_text(llm_request: LlmRequest) -> str:
+    """The request as a provider sees it: tools, system prompt, then contents."""
+    config = llm_request.config
+    parts = [
+        json.dumps(
+            [
+                tool.model_dump(mode="json", exclude_none=True)
+                for tool in config.tools or []
+            ]
+        ),
+        str(config.system_instruction or ""),
+    ]
+    parts.extend(
+        content.model_dump_json(exclude_none=True) for content in llm_request.contents
+    )
+    return "\n".join(parts)
+
+
+class ScriptedLlm(BaseLlm):
+    """Offline model that replays a fixed script of tool calls and replies.
+
+    Each user message restarts the script. Step ``n`` is played on the
+    ``n``-th model call of the turn, so a ``{"tool": ...}`` step is answered
+    by the runner's function response before the next step runs, and a
+    ``{"tools": [...]}`` step makes several calls in one response. The last
+    step repeats if the model is called more often than there are steps.
+
+    ``{"text": ...}`` steps may use ``{result}``, replaced by the JSON of the
+    latest function response, and are streamed word by word when the runner
+    asks for streaming.
+
+    Attributes:
+        steps: ``{"tool": name, "args": {...}}``, ``{"tools": [{"tool": ...},
+            ...]}`` or ``{"text": reply}`` dicts.
+        latency_ms: Delay before the first chunk of every response.
+        token_delay_ms: Delay between streamed chunks.
+        prefill_ms_per_1k_tokens: Extra first-chunk delay per 1000 prompt
+            tokens that miss the simulated provider prefix cache.
+
+    Final responses report token usage, including the prompt tokens served
+    from the simulated cache, with roughly four characters per token.
+    """
+
+    model: str = SCRIPTED_PREFIX
+    steps: List[Dict[str, Any]] = DEFAULT_SCRIPT["steps"]
+    latency_ms: float = 0
+    token_delay_ms: float = 0
+    prefill_ms_per_1k_tokens: float = 0
+    _prefix_cache: PrefixCache = PrivateAttr(default_factory=PrefixCache)
+
+    @classmethod
+    def from_file(cls, path: str, **overrides: Any) -> "ScriptedLlm":
+        """Load a script saved as JSON in the ``DEFAULT_SCRIPT`` format."""
+        with open(path) as f:
+            script = json.load(f)
+        return cls(model=f"{SCRIPTED_PREFIX}:{path}", **{**script, **overrides})
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        step = self.steps[min(_model_calls_this_turn(llm_request), len(self.steps) - 1)]
+        prompt_tokens, cached_tokens = self._prefix_cache.lookup(
+            _prompt_text(llm_request)
+        )
+        delay_ms = (
+            self.latency_ms
+            + self.prefill_ms_per_1k_tokens * (prompt_tokens - cached_tokens) / 1000
+        )
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+
+        def usage(output: str) -> types.GenerateContentResponseUsageMetadata:
+            return types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                cached_content_token_count=cached_tokens,
+                candidates_token_count=len(output) // CHARS_PER_TOKEN,
+            )
+
+        if "tool" in step or "tools" in step:
+            calls = [
+                types.FunctionCall(name=call["tool"], args=call.get("args", {}))
+                for call in step.get("tools", [step])
+            ]
+            yield LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(function_call=call) for call in calls],
+                ),
+                usage_metadata=usage(json.dumps([call.args for call in calls])),
+            )
+            return
+
+        text = step["text"].replace("{result}", _latest_result(llm_request))
+        if stream:
+            for index, chunk in enumerate(re.findall(r"\s*\S+", text)):
+                if index and self.token_delay_ms:
+                    await asyncio.sleep(self.token_delay_ms / 1000)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                    partial=True,
+                )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=usage(text),
+        )
+
+
+def _model_calls_this_turn(llm_request: LlmRequest) -> int:
+    calls = 0
+    for content in reversed(llm_request.contents):
+        parts = content.parts or []
+        if content.role == "user" and any(part.text for part in parts):
+            break
+        if content.role == "model":
+            calls += 1
+    return calls
+
+
+def _latest_result(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents):
+        for part in reversed(content.parts or []):
+            if part.function_response:
+                return json.dumps(part.function_response.response, default=str)
+    return "{}"
+
+
+# Cached prompt tokens of the latest LiteLLM response in this task. ADK's
+# LiteLlm drops them when converting usage, so the client records them and
+# ``record_model_response`` puts them back on the response.
+_cached_prompt_tokens: ContextVar[Optional[int]] = ContextVar(
+    "cached_prompt_tokens", default=None
+)
+
+
+def _cached_tokens(usage: Any) -> Optional[int]:
+    if not usage:
+        return None
+    details = usage.get("prompt_tokens_details")
+    cached = getattr(details, "cached_tokens", None) if details else None
+    if cached is None:
+        cached = usage.get("cache_read_input_tokens")  # Anthropic
+    return cached
+
+
+class UsageTrackingClient(LiteLLMClient):
+    """LiteLLM client that keeps the cached prompt token counts of responses.
+
+    Streamed calls also ask for usage in the final chunk
+    (``stream_options.include_usage``), which LiteLLM omits by default.
+    """
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        response = await super().acompletion(model, messages, tools, **kwargs)
+        _cached_prompt_tokens.set(_cached_tokens(response.get("usage")))
+        return response
+
+    def completion(self, model, messages, tools, stream=False, **kwargs):
+        if not stream:
+            response = super().completion(model, messages, tools, **kwargs)
+            _cached_prompt_tokens.set(_cached_tokens(response.get("usage")))
+            return response
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        return self._track_stream(
+            super().completion(model, messages, tools, stream=True, **kwargs)
+        )
+
+    @staticmethod
+    def _track_stream(chunks) -> Iterator[Any]:
+        for chunk in chunks:
+            usage = chunk.get("usage")
+            if usage:
+                _cached_prompt_tokens.set(_cached_tokens(usage))
+            yield chunk
+
+
+# Start time of the model call in flight, by invocation; an invocation's
+# model calls run one after another. Calls that raise never reach the after
+# callback, so only the most recent entries are kept.
+_call_started: Dict[str, float] = {}
+_MAX_CALLS_IN_FLIGHT = 1024
+
+
+def start_model_timer(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """``before_model_callback`` that starts timing the model call."""
+    _call_started[callback_context.invocation_id] = time.perf_counter()
+    while len(_call_started) > _MAX_CALLS_IN_FLIGHT:
+        del _call_started[next(iter(_call_started))]
+    return None
+
+
+def record_model_response(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """``after_model_callback`` that exports call latency and token usage.
+
+    Fills in the cached prompt tokens recorded by ``UsageTrackingClient``,
+    so they are also stored on the turn's events.
+
+    Streamed calls invoke it for every partial chunk; the call is timed up
+    to its final (non-partial) response.
+    """
+    if not llm_response.partial:
+        started = _call_started.pop(callback_context.invocation_id, None)
+        if started is not None:
+            LLM_CALL_DURATION.observe(time.perf_counter() - started)
+
+    usage = llm_response.usage_metadata
+    if usage and usage.cached_content_token_count is None:
+        usage.cached_content_token_count = _cached_prompt_tokens.get()
+        _cached_prompt_tokens.set(None)
+    if usage:
+        LLM_TOKENS.inc(usage.prompt_token_count or 0, kind="prompt")
+        LLM_TOKENS.inc(usage.candidates_token_count or 0, kind="completion")
+        LLM_TOKENS.inc(usage.cached_content_token_count or 0, kind="cached")
+    return None
+
+
+def build_model(model: str) -> BaseLlm:
+    """Resolve a model name to an ADK model.
+
+    ``"scripted"`` returns ``ScriptedLlm`` with ``DEFAULT_SCRIPT`` and
+    ``"scripted:<path>"`` one loaded from a JSON script; any other name is
+    passed to ``LiteLlm`` (e.g. ``"azure/gpt-4o-mini"``).
+    """
+    name, _, path = model.partition(":")
+    if name != SCRIPTED_PREFIX:
+        return LiteLlm(model=model, llm_client=UsageTrackingClient())
+    return ScriptedLlm.from_file(path) if path else ScriptedLlm(**DEFAULT_SCRIPT)
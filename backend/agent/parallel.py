@@ -0,0 +1,140 @@
+"""Concurrent read-only tool calls within one model response.
+
+ADK runs the function calls of a response one after another. When a
+response contains several read-only calls (``get_balance``, reads through
+``execute_sql_query``), ``prefetch_tool_calls`` starts them all on the tool
+thread pool as soon as the response arrives, and ``use_prefetched_result``
+hands each result to ADK in place of running the tool again. ADK still emits
+the calls, responses and events in their original order.
+
+Only the calls before the response's first write are started early. The
+write, and every call after it, run when ADK reaches them, so writes stay
+serialized and a read never overtakes a write it follows.
+
+Started calls belong to their invocation: ``discard_prefetched`` (an
+``after_agent_callback``) cancels whatever the invocation did not use.
+"""
+
+import asyncio
+import inspect
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+
+from agent.tools import async_execute_sql_query, async_get_balance, is_read_query
+
+# Started calls by invocation, then by (tool, arguments).
+_Key = Tuple[str, str]
+_prefetched: Dict[str, Dict[_Key, List[asyncio.Task]]] = {}
+
+
+def _read_only_tool(
+    name: str, args: Dict[str, Any]
+) -> Optional[Callable[..., Awaitable[Any]]]:
+    """The coroutine for a call of ``name`` if it cannot write, else ``None``."""
+    if name == "get_balance":
+        return async_get_balance
+    if name == "execute_sql_query" and is_read_query(args.get("sql_query") or ""):
+        return async_execute_sql_query
+    return None
+
+
+def _call_key(name: str, args: Dict[str, Any]) -> _Key:
+    return name, json.dumps(args, sort_keys=True, default=str)
+
+
+def _tool_args(
+    tool: Callable[..., Awaitable[Any]], args: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """``args`` limited to ``tool``'s parameters, or ``None`` if they do not bind.
+
+    ADK drops arguments the function does not take, and answers a call
+    missing a required one with an error instead of running it; such a call
+    is left to ADK.
+    """
+    signature = inspect.signature(tool)
+    args = {name: value for name, value in args.items() if name in signature.parameters}
+    try:
+        signature.bind(**args)
+    except TypeError:
+        return None
+    return args
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # A task ADK never awaits must not log "exception was never retrieved";
+    # an awaited one still raises to its caller.
+    if not task.cancelled():
+        task.exception()
+
+
+def _discard(invocation_id: str) -> None:
+    for tasks in _prefetched.pop(invocation_id, {}).values():
+        for task in tasks:
+            task.cancel()
+
+
+def prefetch_tool_calls(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """``after_model_callback`` that starts a response's leading read-only calls.
+
+    Nothing is started unless there are at least two such calls.
+    """
+    if llm_response.partial or not llm_response.content:
+        return None
+    calls = [
+        part.function_call
+        for part in llm_response.content.parts or []
+        if part.function_call
+    ]
+    reads = []
+    for call in calls:
+        tool = _read_only_tool(call.name, call.args or {})
+        args = _tool_args(tool, call.args or {}) if tool else None
+        if args is None:
+            break
+        reads.append((call, tool, args))
+    if len(reads) < 2:
+        return None
+
+    invocation_id = callback_context.invocation_id
+    # Calls a previous response started but ADK never reached are stale.
+    _discard(invocation_id)
+    started = _prefetched[invocation_id] = {}
+    for call, tool, args in reads:
+        task = asyncio.create_task(tool(**args))
+        task.add_done_callback(_retrieve_exception)
+        started.setdefault(_call_key(call.name, args), []).append(task)
+    return None
+
+
+async def use_prefetched_result(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+) -> Optional[Dict[str, Any]]:
+    """``before_tool_callback`` that returns the result of a started call, if any."""
+    started = _prefetched.get(tool_context.invocation_id)
+    if not started:
+        return None
+    read = _read_only_tool(tool.name, args)
+    read_args = _tool_args(read, args) if read else None
+    if read_args is None:
+        return None
+    tasks = started.get(_call_key(tool.name, read_args))
+    if not tasks:
+        return None
+    task = tasks.pop(0)
+    if not any(started.values()):
+        del _prefetched[tool_context.invocation_id]
+    result = await task
+    # ADK wraps non-dict results the same way; a falsy value would make it
+    # run the tool again.
+    return result if isinstance(result, dict) and result else {"result": result}
+
+
+def discard_prefetched(callback_context: CallbackContext) -> None:
+    """``after_agent_callback`` that cancels the invocation's unused calls."""
+    _discard(callback_context.invocation_id)
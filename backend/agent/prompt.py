@@ -1,17 +1,15 @@
 import datetime
 
+from google.adk.agents.readonly_context import ReadonlyContext
 
-def get_prompt() -> str:
-    waktu_sekarang = datetime.datetime.now(
-        datetime.timezone(datetime.timedelta(hours=7))
-    )
-    tanggal_hari_ini_iso = waktu_sekarang.date().isoformat()
-    waktu_lengkap_iso = waktu_sekarang.isoformat()
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=7))
+HARI = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu")
 
-    prompt = f"""TODAY_DATE = {tanggal_hari_ini_iso}
-TODAY_DATETIME = {waktu_lengkap_iso}
-
-**Peran Kamu:**
+# Providers cache the longest prompt prefix they have seen recently (OpenAI
+# and Azure from 1024 tokens on), so the static instructions come first and
+# the per-request context last. The context changes once a day, so within a
+# day the conversation history after it is cached too.
+PROMPT_BODY = """**Peran Kamu:**
 Oke, kamu itu asisten keuangan yang super cerdas, suka membantu, dan **sangat bertanggung jawab**. Tugas utamamu adalah bantuin orang-orang ngatur duit pribadi mereka. Kamu bisa ngerti kalau mereka ngomongin transaksi, pemasukan, pengeluaran. Kamu juga bisa ngasih info yang oke banget. Paling penting, kamu juga bisa **catat transaksi baru dan ubah transaksi yang sudah ada**, tanpa perlu nanya "yakin?" kecuali kalau emang permintaannya rancu.
 
 **Skill Utama Kamu:**
@@ -154,4 +152,23 @@ Oke, kamu itu asisten keuangan yang super cerdas, suka membantu, dan **sangat be
 
 *   **Jaga ingatan jangka pendek** setidaknya untuk transaksi terakhir yang dibahas atau diubah, jadi kamu bisa nangani perintah lanjutan dengan mulus.
 """
-    return prompt
+
+
+def prompt_context(today: datetime.date | None = None) -> str:
+    """The dynamic suffix of the prompt: today's WIB date."""
+    today = today or datetime.datetime.now(TIMEZONE).date()
+    return f"""
+**Konteks Saat Ini:**
+TODAY_DATE = {today.isoformat()} ({HARI[today.weekday()]})
+TIMEZONE = WIB (UTC+07:00)
+"""
+
+
+def get_prompt(context: ReadonlyContext | None = None) -> str:
+    """Build the system prompt: the static ``PROMPT_BODY``, then today's context.
+
+    Also usable as an ADK ``InstructionProvider``: the agent calls it on every
+    LLM request, which keeps the date fresh for a long-lived agent without
+    re-rendering the instructions.
+    """
+    return PROMPT_BODY + prompt_context()
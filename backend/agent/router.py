@@ -0,0 +1,379 @@
+"""Deterministic routing of simple /run turns around the model.
+
+``route_message`` answers a turn without an LLM round-trip when it can do so
+with high confidence:
+
+* "tambah pengeluaran 20 ribu makan siang kemarin" and similar requests to
+  record one transaction are parsed here (type, amount, date, description
+  and category) and executed as the same ``execute_sql_query`` INSERT the
+  model would have issued (``AGENT_INTENT_ROUTER=true``);
+* read-only questions go through ``agent.answers`` (``AGENT_ANSWER_CACHE``).
+
+Anything else, anything ambiguous (no explicit type, two amounts, an
+unknown category, leftover numbers) and any tool error falls back to the
+model. Routed turns are written to the session as the events the agent
+would have produced, so later turns see a consistent history.
+"""
+
+import datetime
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from google.adk.agents.invocation_context import new_invocation_context_id
+from google.adk.events import Event
+from google.adk.flows.llm_flows.functions import generate_client_function_call_id
+from google.adk.sessions import BaseSessionService, Session
+from google.genai import types
+
+from agent.answers import ANSWER_CACHE_ENABLED, cached_answer, message_text, rupiah
+from agent.prompt import TIMEZONE
+from agent.tools import async_execute_sql_query
+from src.metrics import AGENT_INTENT_ROUTER
+
+load_dotenv()
+
+INTENT_ROUTER_ENABLED = os.getenv("AGENT_INTENT_ROUTER", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+MAX_DESCRIPTION_WORDS = 6
+
+VERBS = frozenset(
+    "tambah tambahin tambahkan catat catet catatin input masukin masukkan".split()
+)
+TYPES = {
+    "pengeluaran": "expense",
+    "expense": "expense",
+    "keluar": "expense",
+    "pemasukan": "income",
+    "pendapatan": "income",
+    "income": "income",
+    "masuk": "income",
+}
+FILLERS = frozenset("""
+    tolong dong ya yah deh sih nih kak min saya aku buat untuk utk di ke dari
+    pada yang sebesar senilai rupiah rp
+    """.split())
+
+CATEGORY_KEYWORDS = {
+    "expense": {
+        "Makanan": "makan makanan sarapan minum kopi jajan snack groceries beras "
+        "sayur buah nasi bakso sate mie",
+        "Transportasi": "bensin gojek grab ojek ojol taksi taxi krl busway "
+        "transjakarta parkir tol",
+        "Belanja": "baju sepatu belanja shopee tokopedia",
+        "Hiburan": "nonton bioskop film netflix spotify game konser",
+        "Utilitas": "listrik pln pdam air gas",
+        "Pulsa & Internet": "pulsa kuota internet wifi indihome",
+        "Kesehatan": "obat dokter apotek vitamin bpjs",
+        "Pendidikan": "buku kursus spp sekolah kuliah",
+        "Donasi": "infaq sedekah zakat donasi kondangan",
+        "Tempat Tinggal": "kos kost sewa kontrakan",
+    },
+    "income": {
+        "Gaji": "gaji",
+        "Bonus": "bonus thr",
+        "Sampingan": "freelance proyek project jualan sampingan",
+    },
+}
+_CATEGORY_BY_WORD = {
+    kind: {
+        word: category
+        for category, words in categories.items()
+        for word in words.split()
+    }
+    for kind, categories in CATEGORY_KEYWORDS.items()
+}
+
+BULAN = (
+    "Januari",
+    "Februari",
+    "Maret",
+    "April",
+    "Mei",
+    "Juni",
+    "Juli",
+    "Agustus",
+    "September",
+    "Oktober",
+    "November",
+    "Desember",
+)
+_MONTHS = {name.lower(): index for index, name in enumerate(BULAN, start=1)}
+_MONTHS.update(
+    {
+        name.lower()[:3]: index
+        for index, name in enumerate(BULAN, start=1)
+        if name != "Mei"
+    }
+)
+_MONTHS.update({"agt": 8, "ags": 8})
+_MONTH = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_DAY_MONTH = re.compile(
+    rf"\b(?:tanggal|tgl)?\s*(\d{{1,2}})\s+({_MONTH})\b(?:\s+(\d{{4}}))?"
+)
+_DAY = re.compile(r"\b(?:tanggal|tgl)\s+(\d{1,2})\b")
+_DAYS_AGO = re.compile(r"\b(\d{1,2})\s+hari\s+(?:yang\s+)?lalu\b")
+_YESTERDAY = re.compile(r"\bkemarin\b")
+_TODAY = re.compile(r"\bhari\s+ini\b")
+_AMOUNT = re.compile(
+    r"\b(?:rp\.?\s*)?(\d+(?:[.,]\d+)*)\s*(ribu|rb|k|juta|jt)?\b(?:\s*rupiah)?"
+)
+_UNITS = {"ribu": 1_000, "rb": 1_000, "k": 1_000, "juta": 1_000_000, "jt": 1_000_000}
+_TOKEN = re.compile(r"[a-z]+|[^\sa-z.,!?]+")
+
+
+@dataclass(frozen=True)
+class ParsedTransaction:
+    """One transaction to record, parsed from a user message."""
+
+    type: str
+    amount: int
+    description: str
+    category: str
+    date: datetime.date
+
+
+@dataclass
+class RoutedTurn:
+    """A turn answered without the model: a reply and the tool call it made, if any."""
+
+    intent: str
+    reply: str
+    function_call: Optional[types.FunctionCall] = None
+    function_response: Optional[Dict[str, Any]] = None
+
+
+def _parse_date(text: str, today: datetime.date) -> tuple[Optional[datetime.date], str]:
+    """Find at most one date phrase in ``text``; return it and ``text`` without it.
+
+    Returns ``(None, text)`` when there is no date phrase (meaning today) and
+    raises ``ValueError`` for an invalid date or more than one phrase.
+    """
+    found = []
+
+    def take(pattern: re.Pattern, resolve) -> None:
+        nonlocal text
+        for match in pattern.finditer(text):
+            found.append(resolve(match))
+        text = pattern.sub(" ", text)
+
+    def day_month(match: re.Match) -> datetime.date:
+        year = int(match[3]) if match[3] else today.year
+        date = datetime.date(year, _MONTHS[match[2]], int(match[1]))
+        if not match[3] and date > today:
+            date = date.replace(year=year - 1)
+        return date
+
+    def day(match: re.Match) -> datetime.date:
+        date = today.replace(day=int(match[1]))
+        if date > today:
+            last_month = today.replace(day=1) - datetime.timedelta(days=1)
+            date = last_month.replace(day=int(match[1]))
+        return date
+
+    take(_ISO_DATE, lambda m: datetime.date(int(m[1]), int(m[2]), int(m[3])))
+    take(_DAY_MONTH, day_month)
+    take(_DAY, day)
+    take(_DAYS_AGO, lambda m: today - datetime.timedelta(days=int(m[1])))
+    take(_YESTERDAY, lambda m: today - datetime.timedelta(days=1))
+    take(_TODAY, lambda m: today)
+    if len(found) > 1:
+        raise ValueError("more than one date")
+    if found and found[0] > today:
+        raise ValueError("date in the future")
+    return (found[0] if found else None), text
+
+
+def _parse_amount(number: str, unit: Optional[str]) -> int:
+    if unit:
+        # "1,5 juta" / "1.5 jt": the separator is a decimal point.
+        return round(float(number.replace(",", ".")) * _UNITS[unit])
+    if re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", number):
+        return int(re.sub(r"[.,]", "", number))
+    if not number.isdigit():
+        raise ValueError(f"ambiguous amount {number!r}")
+    return int(number)
+
+
+def parse_transaction(
+    text: str, today: Optional[datetime.date] = None
+) -> Optional[ParsedTransaction]:
+    """Parse a request to record one transaction, or ``None`` if not confident.
+
+    Accepts messages such as "tambah pengeluaran 20 ribu makan siang",
+    "catat pemasukan gaji 7,5 jt tanggal 25" or "input pengeluaran bensin
+    Rp 30.000 kemarin". A write verb, exactly one type word, exactly one
+    amount of at least Rp 1.000 and a description whose words map to a
+    known category are all required; dates default to today.
+    """
+    today = today or datetime.datetime.now(TIMEZONE).date()
+    text = text.lower()
+    try:
+        date, text = _parse_date(text, today)
+        amounts = list(_AMOUNT.finditer(text))
+        if len(amounts) != 1:
+            return None
+        amount = _parse_amount(amounts[0][1], amounts[0][2])
+    except ValueError:
+        return None
+    if amount < 1_000:
+        return None
+
+    tokens = _TOKEN.findall(_AMOUNT.sub(" ", text))
+    if any(not token.isalpha() for token in tokens):
+        return None
+    if not tokens or tokens[0] not in VERBS | {"tolong"} or VERBS.isdisjoint(tokens):
+        return None
+    kinds = {TYPES[token] for token in tokens if token in TYPES}
+    if len(kinds) != 1:
+        return None
+    kind = kinds.pop()
+
+    words = [
+        token
+        for token in tokens
+        if token not in VERBS and token not in TYPES and token not in FILLERS
+    ]
+    if not words or len(words) > MAX_DESCRIPTION_WORDS:
+        return None
+    categories = {
+        _CATEGORY_BY_WORD[kind][word]
+        for word in words
+        if word in _CATEGORY_BY_WORD[kind]
+    }
+    if len(categories) != 1:
+        return None
+
+    return ParsedTransaction(
+        type=kind,
+        amount=amount,
+        description=" ".join(word.capitalize() for word in words),
+        category=categories.pop(),
+        date=date or today,
+    )
+
+
+def insert_statement(transaction: ParsedTransaction) -> str:
+    """The INSERT the agent's prompt asks the model to write for ``transaction``.
+
+    Only parsed values are interpolated: the type and category come from
+    fixed tables and the description is letters and spaces only.
+    """
+    return (
+        "INSERT INTO transactions_table (type, amount, description, category, date) "
+        f"VALUES ('{transaction.type}', {transaction.amount}, "
+        f"'{transaction.description}', '{transaction.category}', "
+        f"'{transaction.date.isoformat()}');"
+    )
+
+
+def _date_label(date: datetime.date, today: datetime.date) -> str:
+    if date == today:
+        return "hari ini"
+    if date == today - datetime.timedelta(days=1):
+        return "kemarin"
+    return f"tanggal {date.day} {BULAN[date.month - 1]} {date.year}"
+
+
+async def record_transaction(
+    transaction: ParsedTransaction, today: datetime.date
+) -> Optional[RoutedTurn]:
+    """Insert ``transaction`` with the agent's SQL tool; ``None`` if it failed."""
+    sql_query = insert_statement(transaction)
+    result = await async_execute_sql_query(sql_query=sql_query)
+    if any("error" in row for row in result):
+        return None
+    label = "pengeluaran" if transaction.type == "expense" else "pemasukan"
+    return RoutedTurn(
+        intent="add_transaction",
+        reply=(
+            f"Oke, udah saya catat {label} {rupiah(transaction.amount)} buat "
+            f"{transaction.description} di kategori {transaction.category} "
+            f"untuk {_date_label(transaction.date, today)}."
+        ),
+        function_call=types.FunctionCall(
+            id=generate_client_function_call_id(),
+            name=async_execute_sql_query.__name__,
+            args={"sql_query": sql_query},
+        ),
+        function_response={"result": result},
+    )
+
+
+async def route_message(message: types.Content) -> Optional[RoutedTurn]:
+    """Answer ``message`` without the model if possible, else ``None``.
+
+    Outcomes of the transaction parser are counted in
+    ``agent_intent_router_total`` (``routed``, ``unmatched``, ``error``).
+    """
+    if INTENT_ROUTER_ENABLED:
+        today = datetime.datetime.now(TIMEZONE).date()
+        transaction = parse_transaction(message_text(message), today)
+        if transaction is None:
+            AGENT_INTENT_ROUTER.inc(result="unmatched")
+        else:
+            turn = await record_transaction(transaction, today)
+            AGENT_INTENT_ROUTER.inc(result="error" if turn is None else "routed")
+            # A failed write is left to the model, which can explain it.
+            return turn
+
+    if ANSWER_CACHE_ENABLED:
+        reply = await cached_answer(message)
+        if reply is not None:
+            return RoutedTurn(intent="answer", reply=reply)
+    return None
+
+
+async def append_turn(
+    session_service: BaseSessionService,
+    session: Session,
+    message: types.Content,
+    turn: RoutedTurn,
+    author: str,
+) -> List[Event]:
+    """Record ``message`` and the events of ``turn`` in ``session``.
+
+    The events are the ones the agent would have produced: the tool call
+    and its response (if any), then the reply. They are returned without
+    the user's message.
+    """
+    invocation_id = new_invocation_context_id()
+    await session_service.append_event(
+        session, Event(invocation_id=invocation_id, author="user", content=message)
+    )
+    contents = []
+    if turn.function_call is not None:
+        contents.append(
+            types.Content(
+                role="model", parts=[types.Part(function_call=turn.function_call)]
+            )
+        )
+        contents.append(
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part(
+                        function_response=types.FunctionResponse(
+                            id=turn.function_call.id,
+                            name=turn.function_call.name,
+                            response=turn.function_response,
+                        )
+                    )
+                ],
+            )
+        )
+    contents.append(types.Content(role="model", parts=[types.Part(text=turn.reply)]))
+    return [
+        await session_service.append_event(
+            session, Event(invocation_id=invocation_id, author=author, content=content)
+        )
+        for content in contents
+    ]
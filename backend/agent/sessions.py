@@ -0,0 +1,457 @@
+import asyncio
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService, _session_util
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+from google.genai import types
+from sqlalchemy import (
+    DateTime,
+    String,
+    Text,
+    create_engine,
+    delete,
+    func,
+    literal,
+    select,
+    tuple_,
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from src.database.config import engine_options
+from src.metrics import instrument_engine
+
+load_dotenv()
+
+SESSION_KEEP_TURNS = int(os.getenv("SESSION_KEEP_TURNS", "20"))
+SESSION_COMPACT_BATCH = int(os.getenv("SESSION_COMPACT_BATCH", "10"))
+SESSION_SUMMARY_MAX_CHARS = int(os.getenv("SESSION_SUMMARY_MAX_CHARS", "4000"))
+
+SUMMARY_AUTHOR = "history_summary"
+SUMMARY_HEADER = "Ringkasan percakapan sebelumnya:\n"
+TITLE_MAX_CHARS = 80
+_LINE_MAX_CHARS = 300
+
+Summarizer = Callable[[str, List[Event]], str]
+# Keyset position (timestamp, id) of the last item of a page.
+Position = Tuple[datetime, str]
+
+
+class ArchiveBase(DeclarativeBase):
+    pass
+
+
+class ArchivedEvent(ArchiveBase):
+    """Raw session event moved out of ``events`` by compaction."""
+
+    __tablename__ = "events_archive"
+
+    id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    app_name: Mapped[str] = mapped_column(String(128), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    session_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    author: Mapped[str] = mapped_column(String(256))
+    timestamp: Mapped[datetime] = mapped_column(DateTime(), index=True)
+    event: Mapped[str] = mapped_column(Text)  # Event.model_dump_json()
+    archived_at: Mapped[datetime] = mapped_column(DateTime(), default=func.now())
+
+
+def _event_text(event: Event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    texts = []
+    for part in event.content.parts:
+        if part.text:
+            texts.append(part.text)
+        elif part.function_call:
+            texts.append(f"[memanggil {part.function_call.name}]")
+    return " ".join(texts).strip()
+
+
+def session_title(content: Optional[types.Content]) -> str:
+    """Title for a new session: its first message, clipped to ``TITLE_MAX_CHARS``."""
+    parts = content.parts if content and content.parts else []
+    text = " ".join(" ".join(part.text for part in parts if part.text).split())
+    if len(text) > TITLE_MAX_CHARS:
+        text = text[: TITLE_MAX_CHARS - 3] + "..."
+    return text
+
+
+def encode_position(position: Position) -> str:
+    """Encode a keyset position as an opaque cursor."""
+    payload = json.dumps([position[0].isoformat(), position[1]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_position(cursor: str) -> Position:
+    """Decode a cursor produced by :func:`encode_position`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), str(item_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _to_event(row: StorageEvent) -> Event:
+    # Mirrors DatabaseSessionService.get_session.
+    return Event(
+        id=row.id,
+        author=row.author,
+        branch=row.branch,
+        invocation_id=row.invocation_id,
+        content=_session_util.decode_content(row.content),
+        actions=row.actions,
+        timestamp=row.timestamp.timestamp(),
+        long_running_tool_ids=row.long_running_tool_ids,
+        grounding_metadata=row.grounding_metadata,
+        partial=row.partial,
+        turn_complete=row.turn_complete,
+        error_code=row.error_code,
+        error_message=row.error_message,
+        interrupted=row.interrupted,
+    )
+
+
+def extractive_summary(previous: str, events: List[Event]) -> str:
+    """Default summarizer: append one clipped line per message to the summary.
+
+    Only the newest ``SESSION_SUMMARY_MAX_CHARS`` characters are kept, so the
+    summary stays bounded however often a session is compacted.
+    """
+    lines = [previous] if previous else []
+    for event in events:
+        text = _event_text(event)
+        if not text:
+            continue
+        speaker = "Pengguna" if event.author == "user" else "Asisten"
+        text = " ".join(text.split())
+        if len(text) > _LINE_MAX_CHARS:
+            text = text[: _LINE_MAX_CHARS - 3] + "..."
+        lines.append(f"- {speaker}: {text}")
+    summary = "\n".join(lines)
+    if len(summary) > SESSION_SUMMARY_MAX_CHARS:
+        summary = summary[-SESSION_SUMMARY_MAX_CHARS:].split("\n", 1)[-1]
+    return summary
+
+
+class CompactingSessionService(DatabaseSessionService):
+    """``DatabaseSessionService`` that keeps session history bounded.
+
+    ``compact_session`` keeps the last ``keep_turns`` turns (a turn starts at
+    each user message) verbatim. Older events are copied to
+    ``events_archive`` and replaced by one rolling summary event, so
+    ``get_session`` and the model's context stay bounded however old the
+    session is. The summary is authored by ``SUMMARY_AUTHOR``, which ADK
+    passes to the model as context rather than as the agent's own reply.
+
+    Compaction only runs once ``keep_turns + compact_batch`` turns have
+    accumulated, so its cost is amortized over ``compact_batch`` turns.
+    ``keep_turns=0`` disables it.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        keep_turns: int = SESSION_KEEP_TURNS,
+        compact_batch: int = SESSION_COMPACT_BATCH,
+        summarizer: Summarizer = extractive_summary,
+    ):
+        super().__init__(db_url=db_url)
+        # ADK creates its engine with SQLAlchemy's default pool (up to 15
+        # connections); size it like the application's own engines instead.
+        self.db_engine.dispose()
+        self.db_engine = create_engine(db_url, **engine_options(db_url))
+        self.database_session_factory = sessionmaker(bind=self.db_engine)
+        instrument_engine(self.db_engine, "sessions")
+        self.keep_turns = keep_turns
+        self.compact_batch = compact_batch
+        self.summarizer = summarizer
+        ArchiveBase.metadata.create_all(self.db_engine)
+
+    async def compact_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> int:
+        """Archive and summarize all but the last ``keep_turns`` turns.
+
+        The database work is synchronous, so it runs on a worker thread
+        rather than stalling the event loop (and the streams on it).
+
+        Returns:
+            int: Number of events archived (0 if nothing was compacted).
+        """
+        if self.keep_turns <= 0:
+            return 0
+        return await asyncio.to_thread(
+            self._compact_session,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+    def _compact_session(self, *, app_name: str, user_id: str, session_id: str) -> int:
+        with self.database_session_factory() as db:
+            # ADK's get_session is a coroutine around blocking queries; read
+            # the events directly on this worker thread instead.
+            events = [
+                _to_event(row)
+                for row in db.scalars(
+                    select(StorageEvent)
+                    .where(
+                        StorageEvent.app_name == app_name,
+                        StorageEvent.user_id == user_id,
+                        StorageEvent.session_id == session_id,
+                    )
+                    .order_by(StorageEvent.timestamp.asc())
+                )
+            ]
+            turn_starts = [
+                index for index, event in enumerate(events) if event.author == "user"
+            ]
+            if len(turn_starts) <= self.keep_turns + self.compact_batch:
+                return 0
+
+            cutoff = turn_starts[-self.keep_turns]
+            compacted, kept = events[:cutoff], events[cutoff:]
+            previous = next(
+                (
+                    _event_text(event).removeprefix(SUMMARY_HEADER)
+                    for event in compacted
+                    if event.author == SUMMARY_AUTHOR
+                ),
+                "",
+            )
+            archived = [event for event in compacted if event.author != SUMMARY_AUTHOR]
+            summary = self.summarizer(previous, archived)
+
+            # Sort the summary just before the first kept event.
+            timestamp = datetime.fromtimestamp(kept[0].timestamp - 1e-6)
+            db.add_all(
+                ArchivedEvent(
+                    id=event.id,
+                    app_name=app_name,
+                    user_id=user_id,
+                    session_id=session_id,
+                    author=event.author,
+                    timestamp=datetime.fromtimestamp(event.timestamp),
+                    event=event.model_dump_json(exclude_none=True),
+                )
+                for event in archived
+            )
+            db.execute(
+                delete(StorageEvent).where(
+                    StorageEvent.app_name == app_name,
+                    StorageEvent.user_id == user_id,
+                    StorageEvent.session_id == session_id,
+                    StorageEvent.id.in_([event.id for event in compacted]),
+                )
+            )
+            db.add(
+                StorageEvent(
+                    id=Event.new_id(),
+                    app_name=app_name,
+                    user_id=user_id,
+                    session_id=session_id,
+                    invocation_id=kept[0].invocation_id,
+                    author=SUMMARY_AUTHOR,
+                    actions=EventActions(),
+                    timestamp=timestamp,
+                    content=_session_util.encode_content(
+                        types.Content(
+                            role="user",
+                            parts=[types.Part(text=SUMMARY_HEADER + summary)],
+                        )
+                    ),
+                )
+            )
+            db.commit()
+            return len(archived)
+
+    def archived_events(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        limit: Optional[int] = None,
+    ) -> List[Event]:
+        """Return archived events of a session, oldest first."""
+        with self.database_session_factory() as db:
+            rows = (
+                db.query(ArchivedEvent)
+                .filter(
+                    ArchivedEvent.app_name == app_name,
+                    ArchivedEvent.user_id == user_id,
+                    ArchivedEvent.session_id == session_id,
+                )
+                .order_by(ArchivedEvent.timestamp.asc())
+                .limit(limit)
+                .all()
+            )
+            return [Event.model_validate_json(row.event) for row in rows]
+
+    def list_session_summaries(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        limit: int,
+        before: Optional[Position] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Position]]:
+        """Return one page of sessions, most recently updated first.
+
+        Only the ``sessions`` row is read, never its events. The title is
+        the ``title`` stored in the session state when it was created; older
+        sessions fall back to their earliest remaining user message.
+
+        Returns:
+            tuple: ``{"id", "last_update_time", "title"}`` dicts and the
+            position to pass as ``before`` for the next page (``None`` on
+            the last page).
+        """
+        stmt = (
+            select(StorageSession.id, StorageSession.update_time, StorageSession.state)
+            .where(
+                StorageSession.app_name == app_name,
+                StorageSession.user_id == user_id,
+            )
+            .order_by(StorageSession.update_time.desc(), StorageSession.id.desc())
+            .limit(limit + 1)
+        )
+        if before:
+            update_time, session_id = before
+            if self.db_engine.dialect.name == "sqlite":
+                # SQLite stores CURRENT_TIMESTAMP as text without fractional
+                # seconds, while bound datetimes are rendered with them.
+                update_time = literal(str(update_time.replace(microsecond=0)), String)
+            stmt = stmt.where(
+                tuple_(StorageSession.update_time, StorageSession.id)
+                < tuple_(update_time, session_id)
+            )
+
+        with self.database_session_factory() as db:
+            rows = db.execute(stmt).all()
+            next_position = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_position = (rows[-1].update_time, rows[-1].id)
+
+            titles = {row.id: (row.state or {}).get("title") for row in rows}
+            untitled = [session_id for session_id, title in titles.items() if not title]
+            if untitled:
+                titles.update(
+                    self._first_user_messages(db, app_name, user_id, untitled)
+                )
+
+        summaries = [
+            {
+                "id": row.id,
+                "last_update_time": row.update_time.timestamp(),
+                "title": titles[row.id] or None,
+            }
+            for row in rows
+        ]
+        return summaries, next_position
+
+    @staticmethod
+    def _first_user_messages(db, app_name, user_id, session_ids) -> Dict[str, str]:
+        first = (
+            select(
+                StorageEvent.session_id, func.min(StorageEvent.timestamp).label("ts")
+            )
+            .where(
+                StorageEvent.app_name == app_name,
+                StorageEvent.user_id == user_id,
+                StorageEvent.session_id.in_(session_ids),
+                StorageEvent.author == "user",
+            )
+            .group_by(StorageEvent.session_id)
+            .subquery()
+        )
+        stmt = (
+            select(StorageEvent.session_id, StorageEvent.content)
+            .join(
+                first,
+                (StorageEvent.session_id == first.c.session_id)
+                & (StorageEvent.timestamp == first.c.ts),
+            )
+            .where(
+                StorageEvent.app_name == app_name,
+                StorageEvent.user_id == user_id,
+                StorageEvent.author == "user",
+            )
+        )
+        return {
+            session_id: session_title(_session_util.decode_content(content))
+            for session_id, content in db.execute(stmt)
+        }
+
+    def list_history(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        limit: int,
+        before: Optional[Position] = None,
+    ) -> Tuple[List[Event], Optional[Position]]:
+        """Return the ``limit`` events that precede ``before``, oldest first.
+
+        Archived events are included, so scrolling back goes past the last
+        compaction; summary events are not, since the raw events they
+        summarize are.
+
+        Returns:
+            tuple: The events and the position to pass as ``before`` for the
+            previous page (``None`` once the start of the session is reached).
+        """
+        live = (
+            select(StorageEvent)
+            .where(
+                StorageEvent.app_name == app_name,
+                StorageEvent.user_id == user_id,
+                StorageEvent.session_id == session_id,
+                StorageEvent.author != SUMMARY_AUTHOR,
+            )
+            .order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+            .limit(limit + 1)
+        )
+        archived = (
+            select(ArchivedEvent)
+            .where(
+                ArchivedEvent.app_name == app_name,
+                ArchivedEvent.user_id == user_id,
+                ArchivedEvent.session_id == session_id,
+            )
+            .order_by(ArchivedEvent.timestamp.desc(), ArchivedEvent.id.desc())
+            .limit(limit + 1)
+        )
+        if before:
+            live = live.where(tuple_(StorageEvent.timestamp, StorageEvent.id) < before)
+            archived = archived.where(
+                tuple_(ArchivedEvent.timestamp, ArchivedEvent.id) < before
+            )
+
+        with self.database_session_factory() as db:
+            candidates = [
+                (row.timestamp, row.id, _to_event(row)) for row in db.scalars(live)
+            ]
+            candidates += [
+                (row.timestamp, row.id, Event.model_validate_json(row.event))
+                for row in db.scalars(archived)
+            ]
+
+        candidates.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        page = candidates[:limit]
+        next_position = page[-1][:2] if len(candidates) > limit else None
+        return [event for _, _, event in reversed(page)], next_position
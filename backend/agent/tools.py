@@ -1,39 +1,181 @@
-import datetime
+import json
 import os
-from decimal import Decimal
-from typing import Any, Dict, List
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 import psycopg2
 from dotenv import load_dotenv
-from psycopg2.extras import RealDictCursor
+from sqlalchemy.exc import SQLAlchemyError
+
+from agent.executor import offload
+from src.cache import CACHE_TTL_SECONDS, bump_data_version, cache_key, get_cache
+from src.database.config import log_slow_query
+from src.database.models import engine
+from src.metrics import AGENT_SQL_DURATION
 
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 _env_path = os.path.join(_current_dir, "..", ".env")
 load_dotenv(_env_path)
 
+MAX_RESULT_ROWS = int(os.getenv("AGENT_SQL_MAX_ROWS", "200"))
+MAX_RESULT_BYTES = int(os.getenv("AGENT_SQL_MAX_BYTES", "32768"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("AGENT_SQL_STATEMENT_TIMEOUT_MS", "5000"))
+SQL_CONCURRENCY = int(os.getenv("AGENT_SQL_CONCURRENCY", "4"))
+BALANCE_CONCURRENCY = int(os.getenv("AGENT_BALANCE_CONCURRENCY", "4"))
+
+# Comments, whitespace and opening parentheses before a statement's first word
+_LEADING = re.compile(r"(?:\s+|--[^\n]*|/\*.*?\*/|\()*", re.DOTALL)
+_READ_KEYWORDS = {"SELECT", "WITH", "VALUES", "TABLE", "EXPLAIN", "SHOW"}
+_WRITE_WORDS = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+# PostgreSQL type OIDs whose psycopg2 values are not JSON serializable
+_FLOAT_OIDS = {1700}  # numeric
+_ISOFORMAT_OIDS = {1082, 1083, 1114, 1184, 1266}  # date, time(tz), timestamp(tz)
+_STR_OIDS = {1186}  # interval
+
+
+def _column_converter(type_code: Any) -> Optional[Callable[[Any], Any]]:
+    """Pick the JSON converter for a result column from its type OID, if any."""
+    if type_code in _FLOAT_OIDS:
+        return lambda value: None if value is None else float(value)
+    if type_code in _ISOFORMAT_OIDS:
+        return lambda value: None if value is None else value.isoformat()
+    if type_code in _STR_OIDS:
+        return lambda value: None if value is None else str(value)
+    return None
+
+
+def fetch_json_rows(
+    cursor, max_rows: int = MAX_RESULT_ROWS, max_bytes: int = MAX_RESULT_BYTES
+) -> List[Dict[str, Any]]:
+    """Fetch at most ``max_rows`` rows (and about ``max_bytes`` of JSON) as dicts.
+
+    Converters are chosen once per column from ``cursor.description`` instead
+    of inspecting every value. When the result is cut short a final
+    ``{"truncated": True, ...}`` marker row tells the model to narrow the query.
+    """
+    names = [column[0] for column in cursor.description]
+    converters = [
+        (index, converter)
+        for index, column in enumerate(cursor.description)
+        if (converter := _column_converter(column[1])) is not None
+    ]
+
+    rows = cursor.fetchmany(max_rows + 1)
+    truncated = len(rows) > max_rows
+    rows = rows[:max_rows]
+
+    results = []
+    size = 0
+    for row in rows:
+        if converters:
+            row = list(row)
+            for index, converter in converters:
+                row[index] = converter(row[index])
+        record = dict(zip(names, row))
+        size += len(json.dumps(record, default=str))
+        if results and size > max_bytes:
+            truncated = True
+            break
+        results.append(record)
+
+    if truncated:
+        results.append(
+            {
+                "truncated": True,
+                "returned_rows": len(results),
+                "message": "Result truncated; add a LIMIT, filters or an aggregate.",
+            }
+        )
+    return results
+
+
+def first_keyword(sql_query: str) -> str:
+    """The statement's first word, upper-cased, skipping comments and ``(``."""
+    match = re.match(r"\w+", sql_query[_LEADING.match(sql_query).end() :])
+    return match[0].upper() if match else ""
+
+
+def is_read_query(sql_query: str) -> bool:
+    """Whether ``sql_query`` only reads, so ``_run_query`` runs it READ ONLY.
+
+    ``WITH`` and ``EXPLAIN`` statements that mention a data-modifying
+    command (a CTE with ``DELETE``, ``EXPLAIN ANALYZE INSERT``) go down the
+    write path; the READ ONLY transaction would reject them.
+    """
+    keyword = first_keyword(sql_query)
+    if keyword in ("WITH", "EXPLAIN"):
+        return not _WRITE_WORDS.search(sql_query)
+    return keyword in _READ_KEYWORDS
 
-def convert_to_json_serializable(value):
-    """Convert non-JSON serializable types to JSON serializable ones"""
-    if isinstance(value, Decimal):
-        return float(value)
-    elif isinstance(value, (datetime.date, datetime.datetime)):
-        return value.isoformat()
-    elif isinstance(value, datetime.time):
-        return value.isoformat()
-    else:
-        return value
 
+def bounded_query(sql_query: str, max_rows: int = MAX_RESULT_ROWS) -> str:
+    """``sql_query`` limited to ``max_rows + 1`` rows by the database.
 
-def execute_sql_query(sql_query: str) -> List[Dict[str, Any]]:
+    psycopg2's default cursor transfers the whole result at ``execute``, so
+    ``fetch_json_rows``'s cap alone would still load an unbounded SELECT into
+    memory. Statements that cannot be a subquery (``EXPLAIN``, ``SHOW``) are
+    returned unchanged.
     """
-    Execute a SQL query against the PostgreSQL database.
+    if first_keyword(sql_query) not in ("SELECT", "WITH", "VALUES", "TABLE"):
+        return sql_query
+    statement = sql_query.strip().rstrip(";")
+    # Newlines keep a trailing ``--`` comment from swallowing the wrapper.
+    return f"SELECT * FROM (\n{statement}\n) AS bounded LIMIT {int(max_rows) + 1}"
+
+
+def _run_query(sql_query: str) -> List[Dict[str, Any]]:
+    # Connections come from the application engine's bounded pool, which
+    # pre-pings them and caps how many this process holds. Closing the
+    # connection returns it to the pool and rolls back anything uncommitted.
+    try:
+        conn = engine.raw_connection()
+    except SQLAlchemyError as e:
+        return [{"error": f"Database error: {str(e)}"}]
+
+    # Raw psycopg2 cursors bypass SQLAlchemy's statement events, so the
+    # round-trip is timed here.
+    kind = "read" if is_read_query(sql_query) else "write"
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cursor:
+            if kind == "read":
+                # Reads run in a READ ONLY transaction with a statement
+                # timeout, sent in the same round-trip as the query itself.
+                conn.rollback()
+                cursor.execute(
+                    "SET TRANSACTION READ ONLY; "
+                    f"SET LOCAL statement_timeout = {int(STATEMENT_TIMEOUT_MS)}; "
+                    f"{bounded_query(sql_query)}"
+                )
+                return fetch_json_rows(cursor)
+
+            else:
+                cursor.execute(sql_query)
+                conn.commit()
+                bump_data_version()
+                return [{"success": True, "affected_rows": cursor.rowcount}]
+
+    except psycopg2.Error as e:
+        return [{"error": f"Database error: {str(e)}"}]
+    except Exception as e:
+        return [{"error": f"Unexpected error: {str(e)}"}]
+    finally:
+        conn.close()
+        elapsed = time.perf_counter() - started
+        AGENT_SQL_DURATION.observe(elapsed, kind=kind)
+        log_slow_query("agent_tools", sql_query, elapsed, kind=kind)
+
+
+def execute_sql_query(sql_query: str) -> List[Dict[str, Any]]:
+    """Run one SQL statement on transactions_table (PostgreSQL).
 
     Args:
-        sql_query (str): The SQL query to execute
-        params (tuple, optional): Parameters for the SQL query to prevent SQL injection
+        sql_query: The statement.
 
     Returns:
-        List[Dict[str, Any]]: Query results as a list of dictionaries or error message
+        Rows as dicts, [{"success", "affected_rows"}] for writes, or [{"error"}].
     """
     if not sql_query or not sql_query.strip():
         return [{"error": "SQL query cannot be empty"}]
@@ -42,50 +184,31 @@ def execute_sql_query(sql_query: str) -> List[Dict[str, Any]]:
     if "transactions_table" not in sql_query.lower():
         return [{"error": "Query must reference 'transactions_table'"}]
 
-    database_url = os.getenv("DATABASE_URL")
-    if not database_url:
-        return [{"error": "DATABASE_URL environment variable is not set"}]
-
-    try:
-        with psycopg2.connect(database_url, cursor_factory=RealDictCursor) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(sql_query)
-
-                if sql_query.strip().upper().startswith("SELECT"):
-                    results = cursor.fetchall()
-                    clean_results = []
-                    for row in results:
-                        clean_row = {}
-                        for key, value in row.items():
-                            clean_row[key] = convert_to_json_serializable(value)
-                        clean_results.append(clean_row)
-                    return clean_results
-
-                else:
-                    conn.commit()
-                    return [{"success": True, "affected_rows": cursor.rowcount}]
-
-    except psycopg2.Error as e:
-        return [{"error": f"Database error: {str(e)}"}]
-    except Exception as e:
-        return [{"error": f"Unexpected error: {str(e)}"}]
+    return _run_query(sql_query)
 
 
 def get_balance() -> Dict[str, Any]:
-    """
-    Get the balance by summing all income and expenses.
+    """Current balance.
 
     Returns:
-        Dict[str, Any]: A dictionary containing the balance information
+        {"balance", "total_income", "total_expense"} in rupiah.
     """
+    cache = get_cache()
+    key = cache_key("balance")
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    # transaction_totals holds one trigger-maintained row per type, so this
+    # never scans transactions_table.
     sql_query = """
     SELECT
-        SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS total_income,
-        SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS total_expense
-    FROM transactions_table;
+        COALESCE(SUM(CASE WHEN type = 'income' THEN total END), 0) AS total_income,
+        COALESCE(SUM(CASE WHEN type = 'expense' THEN total END), 0) AS total_expense
+    FROM transaction_totals;
     """
 
-    result = execute_sql_query(sql_query)
+    result = _run_query(sql_query)
 
     if "error" in result[0]:
         return result[0]
@@ -95,8 +218,16 @@ def get_balance() -> Dict[str, Any]:
 
     balance = total_income - total_expense
 
-    return {
+    result = {
         "balance": balance,
         "total_income": total_income,
         "total_expense": total_expense,
     }
+    cache.set(key, json.dumps(result).encode(), CACHE_TTL_SECONDS)
+    return result
+
+
+# Non-blocking variants registered with the agent: the psycopg2 calls run on
+# the tool thread pool so a slow query never stalls the event loop.
+async_execute_sql_query = offload(execute_sql_query, SQL_CONCURRENCY)
+async_get_balance = offload(get_balance, BALANCE_CONCURRENCY)
@@ -0,0 +1,218 @@
+"""Per-turn overhead of the agent ``/run`` path, measured offline.
+
+Runs turns through the same runner and SSE serialization as
+``routes.agent.agent_run`` with ``ScriptedLlm`` as the model, and splits each
+turn's wall time into:
+
+    session_load   get_session / create_session
+    session_write  DatabaseSessionService.append_event
+    model          time spent inside the (scripted) model
+    tools          execute_sql_query / get_balance
+    serialize      Event.model_dump_json + SSE framing
+    runner         everything else (ADK flow, callbacks, event plumbing)
+
+``compaction`` (``CompactingSessionService.compact_session``, which
+``agent_run`` runs after the response is sent) is reported separately and
+is not part of ``total``.
+
+Sessions are stored in ``BENCH_DATABASE_URL`` (default
+``sqlite:///./bench.db``).
+
+Usage:
+    python -m benchmarks.agent --turns 200 --turns-per-session 10
+    python -m benchmarks.agent --script path/to/script.json --cprofile agent.prof
+"""
+
+import argparse
+import asyncio
+import cProfile
+import functools
+import inspect
+import os
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+from benchmarks.api import BENCH_DATABASE_URL, summarize
+
+PHASES = ("session_load", "session_write", "model", "tools", "serialize", "runner")
+
+# Durations (seconds) per phase for the turn being measured.
+_current: dict[str, float] = defaultdict(float)
+
+
+def _timed_async(phase, fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _current[phase] += time.perf_counter() - started
+
+    return wrapper
+
+
+def _timed_sync(phase, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current[phase] += time.perf_counter() - started
+
+    return wrapper
+
+
+def _timed_stream(phase, fn):
+    # Only time spent producing each item counts, not the consumer's work
+    # between items.
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        stream = fn(*args, **kwargs)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await anext(stream)
+            except StopAsyncIteration:
+                return
+            finally:
+                _current[phase] += time.perf_counter() - started
+            yield item
+
+    return wrapper
+
+
+def instrument(runner) -> None:
+    """Wrap the runner's session service, model and tools with phase timers."""
+    service = runner.session_service
+    service.get_session = _timed_async("session_load", service.get_session)
+    service.create_session = _timed_async("session_load", service.create_session)
+    service.append_event = _timed_async("session_write", service.append_event)
+
+    agent = runner.agent
+    # ``model`` is a pydantic field, so bypass validation to install the wrapper.
+    object.__setattr__(
+        agent.model,
+        "generate_content_async",
+        _timed_stream("model", agent.model.generate_content_async),
+    )
+    agent.tools = [
+        (_timed_async if inspect.iscoroutinefunction(tool) else _timed_sync)(
+            "tools", tool
+        )
+        for tool in agent.tools
+    ]
+
+
+async def run_turn(runner, app_name: str, session_id: str, text: str, streaming: bool):
+    """Run one turn like ``agent_run`` does and return its phase durations in ms."""
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    _current.clear()
+    user_id = "1"
+    started = time.perf_counter()
+
+    session = await runner.session_service.get_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    if not session:
+        await runner.session_service.create_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+
+    frames = []
+    config = RunConfig(
+        streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE
+    )
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+        run_config=config,
+    ):
+        serialize_started = time.perf_counter()
+        sse_event = event.model_dump_json(exclude_none=True, by_alias=True)
+        frames.append(f"data: {sse_event}\n\n")
+        _current["serialize"] += time.perf_counter() - serialize_started
+
+    total = time.perf_counter() - started
+    measured = {phase: _current[phase] * 1000 for phase in PHASES[:-1]}
+    measured["runner"] = total * 1000 - sum(measured.values())
+    measured["total"] = total * 1000
+
+    compaction_started = time.perf_counter()
+    await runner.session_service.compact_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    measured["compaction"] = (time.perf_counter() - compaction_started) * 1000
+    return measured
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, list[float]]:
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+    os.environ["AGENT_MODEL"] = f"scripted:{args.script}" if args.script else "scripted"
+    from src.routes.agent import APP_NAME, get_runner
+
+    runner = get_runner()
+    runner.agent.model.latency_ms = args.latency_ms
+    runner.agent.model.token_delay_ms = args.token_delay_ms
+    instrument(runner)
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    session_id = None
+    for turn in range(args.turns):
+        if turn % args.turns_per_session == 0:
+            session_id = f"bench-{uuid.uuid4()}"
+        measured = await run_turn(
+            runner, APP_NAME, session_id, "cek saldo", not args.no_streaming
+        )
+        for phase, value in measured.items():
+            samples[phase].append(value)
+    return samples
+
+
+def report(samples: dict[str, list[float]]) -> None:
+    total = statistics.fmean(samples["total"])
+    print(f"{'phase':<14} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'share':>7}")
+    for phase in (*PHASES, "total", "compaction"):
+        values = samples[phase]
+        p50, p95, _ = summarize(values)
+        mean = statistics.fmean(values)
+        print(f"{phase:<14} {mean:>9.2f} {p50:>9.2f} {p95:>9.2f} {mean / total:>7.1%}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument(
+        "--turns-per-session",
+        type=int,
+        default=1,
+        help="Turns sent to each session before starting a new one.",
+    )
+    parser.add_argument("--script", help="JSON script for ScriptedLlm.")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--token-delay-ms", type=float, default=0)
+    parser.add_argument("--no-streaming", action="store_true")
+    parser.add_argument("--cprofile", help="Write cProfile stats to this file.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    samples = asyncio.run(benchmark(args))
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+    report(samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Latency and throughput benchmark for the HTTP API.
+
+For every table size the benchmark reseeds ``transactions_table`` with
+synthetic rows, then drives ``server:app`` in-process (through
+``httpx.ASGITransport``) at each concurrency level and reports p50/p95/p99
+latency and throughput per scenario. The agent ``/run`` scenario runs the
+offline ``ScriptedLlm`` (``AGENT_MODEL=scripted``): each turn calls
+``get_balance`` and replies with a fixed template. It measures the runner,
+the tool, session storage and serialization without any network calls.
+The agent tools run raw psycopg2 queries, so this scenario needs
+PostgreSQL and is skipped on SQLite; a turn whose tool returned an error
+counts as failed.
+
+The database named by ``BENCH_DATABASE_URL`` (default ``sqlite:///./bench.db``)
+is wiped before each table size; never point it at real data.
+
+Usage:
+    python -m benchmarks.api --sizes 1000 10000 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+import httpx
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+
+CATEGORIES = {
+    "income": ["Gaji", "Sampingan", "Bonus"],
+    "expense": [
+        "Makanan",
+        "Makan Luar",
+        "Tempat Tinggal",
+        "Utilitas",
+        "Transportasi",
+        "Hiburan",
+    ],
+}
+SEED_START = datetime(2023, 1, 1)
+SEED_DAYS = 3 * 365
+BULK_ROWS = 500
+
+
+def http_error(response: httpx.Response) -> bool:
+    return response.status_code >= 400
+
+
+def tool_error(response: httpx.Response) -> bool:
+    """Whether the ``/run`` response failed or any of its tool calls returned an error."""
+    if http_error(response):
+        return True
+    for event in response.json():
+        for part in (event.get("content") or {}).get("parts") or []:
+            result = (part.get("functionResponse") or {}).get("response") or {}
+            rows = result.get("result")
+            if "error" in result or (
+                isinstance(rows, list) and any("error" in row for row in rows)
+            ):
+                return True
+    return False
+
+
+@dataclass
+class Scenario:
+    name: str
+    send: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+    failed: Callable[[httpx.Response], bool] = http_error
+    postgres_only: bool = False
+
+
+@dataclass
+class Result:
+    scenario: str
+    rows: int
+    concurrency: int
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput_rps: float
+
+
+class _NoCache:
+    """Cache backend that never hits, so read scenarios measure the database."""
+
+    epoch = "bench"
+    blocking = False
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def version(self):
+        return 0
+
+    def bump_version(self):
+        return 0
+
+
+def generate_rows(count: int, seed: int = 0) -> list[dict]:
+    """Return ``count`` deterministic transaction rows for ``bulk_insert_transactions``."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        type_ = "income" if rng.random() < 0.15 else "expense"
+        category = rng.choice(CATEGORIES[type_])
+        rows.append(
+            {
+                "type": type_,
+                "amount": rng.randrange(10_000, 10_000_000, 500),
+                "description": f"{category} #{rng.randrange(1000)}",
+                "category": category,
+                "date": SEED_START + timedelta(minutes=rng.randrange(SEED_DAYS * 1440)),
+            }
+        )
+    return rows
+
+
+def summarize(latencies_ms: list[float]) -> tuple[float, float, float]:
+    """Return the (p50, p95, p99) of ``latencies_ms``."""
+    if len(latencies_ms) < 2:
+        value = latencies_ms[0] if latencies_ms else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def build_scenarios(ids: list[int], rows: int) -> list[Scenario]:
+    """Scenarios in run order; ``delete`` consumes ``ids`` front to back."""
+    payload = generate_rows(1, seed=rows)[0]
+    payload["date"] = payload["date"].isoformat()
+    bulk_rows = generate_rows(BULK_ROWS, seed=rows + 1)
+    for row in bulk_rows:
+        row["date"] = row["date"].isoformat()
+    deletable = iter(ids)
+
+    def list_page(client, i):
+        # Vary the filter so the page is not the same query every time.
+        return client.get(
+            "/api/v1/transactions",
+            params={"limit": 50, "min_amount": (i % 100) * 1000},
+        )
+
+    def create(client, i):
+        return client.post("/api/v1/transactions", json=payload)
+
+    def bulk(client, i):
+        return client.post("/api/v1/transactions/bulk", json=bulk_rows)
+
+    def report(client, i):
+        path = ("by-category", "by-period", "by-type")[i % 3]
+        return client.get(f"/api/v1/reports/{path}", params={"granularity": "month"})
+
+    def delete(client, i):
+        return client.delete(f"/api/v1/transactions/{next(deletable)}")
+
+    def agent_run(client, i):
+        return client.post(
+            "/api/v1/run",
+            json={
+                "session_id": f"bench-{rows}-{time.monotonic_ns()}-{i}",
+                "new_message": {"role": "user", "parts": [{"text": "cek saldo"}]},
+                "streaming": False,
+            },
+        )
+
+    return [
+        Scenario("list", list_page),
+        Scenario("report", report),
+        Scenario("create", create),
+        Scenario("bulk", bulk),
+        Scenario("delete", delete),
+        Scenario("agent_run", agent_run, failed=tool_error, postgres_only=True),
+    ]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> tuple[list[float], int, float]:
+    """Send ``requests`` requests from ``concurrency`` workers.
+
+    Returns:
+        tuple: Per-request latencies in milliseconds, the number of failed
+        requests and the wall-clock duration in seconds.
+    """
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            try:
+                response = await scenario.send(client, i)
+                failed = scenario.failed(response)
+            except (httpx.HTTPError, StopIteration):
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def seed(engine, rows: int) -> list[int]:
+    """Replace the table contents with ``rows`` generated rows and return their ids."""
+    from sqlalchemy import delete, select
+
+    from src.database.bulk import bulk_insert_transactions
+    from src.database.models import Base, Transaction
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(delete(Transaction))
+        bulk_insert_transactions(connection, generate_rows(rows))
+        return list(
+            connection.scalars(select(Transaction.id).order_by(Transaction.id.desc()))
+        )
+
+
+async def benchmark(args: argparse.Namespace) -> list[Result]:
+    # The app reads DATABASE_URL at import time, so import it only after
+    # pointing it at the benchmark database.
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+    os.environ["AGENT_MODEL"] = "scripted"
+    from agent.agent import get_agent
+    from server import app
+    from src.cache import TTLCache, set_cache
+    from src.database.models import async_engine, engine
+
+    engine.echo = async_engine.echo = False
+    postgres = engine.dialect.name == "postgresql"
+    if not postgres and (not args.only or "agent_run" in args.only):
+        print(
+            "Skipping agent_run: the agent tools need PostgreSQL "
+            "(set BENCH_DATABASE_URL).",
+            file=sys.stderr,
+        )
+    get_agent().model.latency_ms = args.llm_latency_ms
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+        for rows in args.sizes:
+            for concurrency in args.concurrency:
+                ids = seed(engine, rows)
+                set_cache(TTLCache() if args.cache else _NoCache())
+                for scenario in build_scenarios(ids, rows):
+                    if args.only and scenario.name not in args.only:
+                        continue
+                    if scenario.postgres_only and not postgres:
+                        continue
+                    latencies, errors, elapsed = await run_scenario(
+                        client, scenario, args.requests, concurrency
+                    )
+                    p50, p95, p99 = summarize(latencies)
+                    result = Result(
+                        scenario=scenario.name,
+                        rows=rows,
+                        concurrency=concurrency,
+                        requests=len(latencies),
+                        errors=errors,
+                        p50_ms=round(p50, 2),
+                        p95_ms=round(p95, 2),
+                        p99_ms=round(p99, 2),
+                        throughput_rps=round(len(latencies) / elapsed, 1),
+                    )
+                    print(format_result(result), flush=True)
+                    results.append(result)
+    return results
+
+
+HEADER = (
+    f"{'scenario':<10} {'rows':>8} {'conc':>5} {'reqs':>6} {'errs':>5} "
+    f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}"
+)
+
+
+def format_result(result: Result) -> str:
+    return (
+        f"{result.scenario:<10} {result.rows:>8} {result.concurrency:>5} "
+        f"{result.requests:>6} {result.errors:>5} {result.p50_ms:>9.2f} "
+        f"{result.p95_ms:>9.2f} {result.p99_ms:>9.2f} {result.throughput_rps:>9.1f}"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per scenario."
+    )
+    parser.add_argument(
+        "--only", nargs="+", help="Run only these scenarios (e.g. list report)."
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the response cache enabled for read scenarios.",
+    )
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=0,
+        help="Delay before each scripted model response.",
+    )
+    parser.add_argument("--output", help="Also write the results as JSON here.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    print(HEADER)
+    results = asyncio.run(benchmark(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
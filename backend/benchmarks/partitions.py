@@ -0,0 +1,200 @@
+"""Insert throughput and range-query latency, heap vs monthly partitions.
+
+For each layout the benchmark recreates ``transactions_table`` and loads
+``--rows`` synthetic transactions spread over the ``--days`` up to today:
+
+* ``heap``: the table of ``init-scripts/01-create-transaction-schema.sql``,
+  with its seven secondary indexes;
+* ``partitioned``: the same table after ``src.database.partitions.migrate``.
+
+It then reports the ``COPY`` load rate, the rate of single-row INSERTs
+committed one by one (as the API and the agent write), and p50/p95 latency
+of a month aggregate, a 7-day range and a keyset page of the newest rows.
+
+Partitioning is PostgreSQL-only: ``BENCH_DATABASE_URL`` must point at a
+PostgreSQL database, which is wiped; never point it at real data.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.partitions --rows 5000000
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.api import BENCH_DATABASE_URL, summarize
+
+LAYOUTS = ("heap", "partitioned")
+HEAP_INDEXES = (
+    "CREATE INDEX idx_transactions_type ON transactions_table (type)",
+    "CREATE INDEX idx_transactions_category ON transactions_table (category)",
+    "CREATE INDEX idx_transactions_date ON transactions_table (date DESC)",
+    "CREATE INDEX idx_transactions_created_at ON transactions_table (created_at DESC)",
+    "CREATE INDEX idx_transactions_amount ON transactions_table (amount)",
+    "CREATE INDEX idx_transactions_type_date ON transactions_table (type, date DESC)",
+    "CREATE INDEX idx_transactions_category_date "
+    "ON transactions_table (category, date DESC)",
+)
+QUERIES = {
+    "month": (
+        "SELECT category, SUM(amount), COUNT(*) FROM transactions_table "
+        "WHERE type = 'expense' AND date >= :month AND date < :next_month "
+        "GROUP BY category"
+    ),
+    "week": (
+        "SELECT date, description, amount FROM transactions_table "
+        "WHERE date >= :week AND date < :week_end ORDER BY date"
+    ),
+    "page": (
+        "SELECT id, date, description, amount FROM transactions_table "
+        "WHERE date < :before ORDER BY date DESC, id DESC LIMIT 50"
+    ),
+}
+
+
+def recreate(engine, layout: str) -> None:
+    """Drop every transactions table, then create the one for ``layout``."""
+    from sqlalchemy import text
+
+    from src.database.models import Base
+    from src.database.partitions import migrate
+
+    with engine.begin() as connection:
+        # CASCADE takes the transactions_archived view with it.
+        connection.execute(
+            text(
+                "DROP TABLE IF EXISTS transactions_table, transactions_archive, "
+                "transaction_totals, transaction_monthly_totals CASCADE"
+            )
+        )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for statement in HEAP_INDEXES:
+            connection.execute(text(statement))
+        if layout == "partitioned":
+            migrate(connection)
+
+
+def load(engine, rows: int, days: int) -> float:
+    """Load ``rows`` synthetic rows over the last ``days``; return rows/s."""
+    from src.database.synthetic import SyntheticConfig, generate_batches, load_batch
+
+    config = SyntheticConfig(
+        rows=rows, start=date.today() - timedelta(days=days), days=days
+    )
+    loaded = 0
+    elapsed = 0.0
+    for batch in generate_batches(config):
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            loaded += load_batch(connection, batch)
+        elapsed += time.perf_counter() - started
+    return loaded / elapsed
+
+
+def insert_rate(engine, inserts: int) -> float:
+    """Insert ``inserts`` rows of today, one transaction each; return rows/s."""
+    from sqlalchemy import insert
+
+    from src.database.models import Transaction
+
+    started = time.perf_counter()
+    for index in range(inserts):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Transaction).values(
+                    type="expense",
+                    amount=15_000 + index,
+                    description="Kopi",
+                    category="Makanan",
+                    date=datetime.now(),
+                )
+            )
+    return inserts / (time.perf_counter() - started)
+
+
+def query_latencies(engine, repeat: int, days: int) -> dict[str, list[float]]:
+    """Run each of ``QUERIES`` ``repeat`` times over ranges of the loaded period."""
+    from sqlalchemy import text
+
+    today = date.today()
+    latencies = {name: [] for name in QUERIES}
+    for index in range(repeat):
+        # Walk back through the period so each run reads different pages.
+        week = today - timedelta(days=7 + index * 7 % max(days - 7, 1))
+        month = week.replace(day=1)
+        params = {
+            "month": month,
+            "next_month": (month + timedelta(days=32)).replace(day=1),
+            "week": week,
+            "week_end": week + timedelta(days=7),
+            "before": datetime.combine(week, datetime.min.time()),
+        }
+        with engine.connect() as connection:
+            for name, sql in QUERIES.items():
+                started = time.perf_counter()
+                connection.execute(text(sql), params).all()
+                latencies[name].append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def benchmark(args: argparse.Namespace) -> dict[str, dict]:
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+    from sqlalchemy import text
+
+    from src.database.models import engine
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("BENCH_DATABASE_URL must point at PostgreSQL")
+
+    results = {}
+    for layout in args.layouts:
+        recreate(engine, layout)
+        load_rate = load(engine, args.rows, args.days)
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE transactions_table"))
+        results[layout] = {
+            "load": load_rate,
+            "insert": insert_rate(engine, args.inserts),
+            "queries": query_latencies(engine, args.queries, args.days),
+        }
+    return results
+
+
+def report(results: dict[str, dict]) -> None:
+    print(f"{'layout':<12} {'COPY rows/s':>12} {'INSERT rows/s':>14}")
+    for layout, result in results.items():
+        print(f"{layout:<12} {result['load']:>12,.0f} {result['insert']:>14,.0f}")
+    print()
+    print(f"{'layout':<12} {'query':<6} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for layout, result in results.items():
+        for name, latencies in result["queries"].items():
+            p50, p95, _ = summarize(latencies)
+            print(
+                f"{layout:<12} {name:<6} {p50:>9.2f} {p95:>9.2f} "
+                f"{statistics.fmean(latencies):>9.2f}"
+            )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument(
+        "--inserts", type=int, default=2_000, help="Single-row INSERTs to time."
+    )
+    parser.add_argument(
+        "--queries", type=int, default=50, help="Runs of each range query."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    report(benchmark(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Time to first token with the old and the current prompt layout.
+
+``legacy`` renders the prompt the way it used to be: a header with the
+current time (to the microsecond) before the instructions, so no request
+shares a prefix with an earlier one. ``current`` is ``agent.prompt.get_prompt``:
+static instructions first and the date last. Each layout runs the same turns
+through a fresh runner and reports the time from sending the message to the
+first streamed text chunk, and the share of prompt tokens served from the
+provider's prefix cache.
+
+By default the model is ``ScriptedLlm``, which simulates provider prefix
+caching (``agent.models.PrefixCache``) and charges
+``--prefill-ms-per-1k-tokens`` for every uncached 1000 prompt tokens. Pass
+``--model`` with a LiteLLM model name to measure a real provider instead.
+
+Tools read ``BENCH_DATABASE_URL`` (default ``sqlite:///./bench.db``), which
+is reseeded.
+
+Usage:
+    python -m benchmarks.prompt --turns 40 --turns-per-session 5
+    python -m benchmarks.prompt --model azure/gpt-4o-mini --turns 20
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import time
+
+from benchmarks.api import BENCH_DATABASE_URL, summarize
+
+LAYOUTS = ("legacy", "current")
+QUESTIONS = (
+    "cek saldo",
+    "berapa saldo saya sekarang?",
+    "duit saya ada berapa?",
+    "bisa nggak saya jajan 100 ribu?",
+    "saldo bulan ini gimana?",
+)
+
+
+def legacy_prompt(context=None) -> str:
+    """The prompt as rendered before the static prefix was split out."""
+    from agent.prompt import PROMPT_BODY, TIMEZONE
+
+    now = datetime.datetime.now(TIMEZONE)
+    return (
+        f"TODAY_DATE = {now.date().isoformat()}\n"
+        f"TODAY_DATETIME = {now.isoformat()}\n\n" + PROMPT_BODY
+    )
+
+
+def build_runner(layout: str, args: argparse.Namespace):
+    from google.adk.agents import Agent
+    from google.adk.runners import InMemoryRunner
+
+    from agent.models import (
+        ScriptedLlm,
+        build_model,
+        record_model_response,
+        start_model_timer,
+    )
+    from agent.prompt import get_prompt
+    from agent.tools import async_execute_sql_query, async_get_balance
+
+    if args.model:
+        model = build_model(args.model)
+    else:
+        model = ScriptedLlm(
+            latency_ms=args.latency_ms,
+            prefill_ms_per_1k_tokens=args.prefill_ms_per_1k_tokens,
+        )
+    agent = Agent(
+        name="financial_agent",
+        model=model,
+        tools=[async_execute_sql_query, async_get_balance],
+        instruction=legacy_prompt if layout == "legacy" else get_prompt,
+        before_model_callback=start_model_timer,
+        after_model_callback=record_model_response,
+    )
+    return InMemoryRunner(agent=agent, app_name="bench")
+
+
+async def run_turn(runner, session_id: str, text: str) -> tuple[float, float]:
+    """Return the turn's time to first text chunk (ms) and cached-token ratio."""
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    started = time.perf_counter()
+    first_text = None
+    prompt = cached = 0
+    async for event in runner.run_async(
+        user_id="1",
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    ):
+        parts = event.content.parts if event.content else None
+        if first_text is None and parts and any(part.text for part in parts):
+            first_text = time.perf_counter()
+        if event.usage_metadata and not event.partial:
+            prompt += event.usage_metadata.prompt_token_count or 0
+            cached += event.usage_metadata.cached_content_token_count or 0
+    ttft = ((first_text or time.perf_counter()) - started) * 1000
+    return ttft, cached / prompt if prompt else 0.0
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, dict[str, list[float]]]:
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+    from benchmarks.api import seed
+    from src.database.models import engine
+
+    engine.echo = False
+    seed(engine, args.rows)
+
+    results = {}
+    for layout in args.layouts:
+        runner = build_runner(layout, args)
+        ttfts, ratios = [], []
+        session_id = None
+        for turn in range(args.turns):
+            if turn % args.turns_per_session == 0:
+                session = await runner.session_service.create_session(
+                    app_name="bench", user_id="1"
+                )
+                session_id = session.id
+            ttft, ratio = await run_turn(
+                runner, session_id, QUESTIONS[turn % len(QUESTIONS)]
+            )
+            ttfts.append(ttft)
+            ratios.append(ratio)
+        results[layout] = {"ttft": ttfts, "cached": ratios}
+    return results
+
+
+def report(results: dict[str, dict[str, list[float]]]) -> None:
+    print(
+        f"{'layout':<8} {'turns':>6} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'mean ms':>9} {'cached':>7}"
+    )
+    for layout, samples in results.items():
+        p50, p95, _ = summarize(samples["ttft"])
+        print(
+            f"{layout:<8} {len(samples['ttft']):>6} {p50:>9.1f} {p95:>9.1f} "
+            f"{statistics.fmean(samples['ttft']):>9.1f} "
+            f"{statistics.fmean(samples['cached']):>7.1%}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=LAYOUTS)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--turns-per-session", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--model", help="LiteLLM model name (default: scripted).")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=150,
+        help="Scripted model: fixed delay before each response.",
+    )
+    parser.add_argument(
+        "--prefill-ms-per-1k-tokens",
+        type=float,
+        default=100,
+        help="Scripted model: delay per 1000 uncached prompt tokens.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    report(asyncio.run(benchmark(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Throughput of ``server:app`` as the number of uvicorn workers grows.
+
+For each worker count the benchmark starts ``uvicorn server:app --workers N``
+on a local port (with ``WEB_CONCURRENCY=N`` so the pools are sized from
+``DB_MAX_CONNECTIONS``), drives it for a fixed duration from several client
+processes, and reports throughput, latency percentiles and the speedup over
+the first worker count. Client processes are separate so the load generator
+does not become the bottleneck.
+
+The database named by ``BENCH_DATABASE_URL`` (default ``sqlite:///./bench.db``)
+is wiped and reseeded once; never point it at real data.
+
+Usage:
+    python -m benchmarks.scaling --workers 1 2 4 --clients 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.api import BENCH_DATABASE_URL, summarize
+
+PATHS = {
+    "health": "/",
+    "list": "/api/v1/transactions?limit=50&min_amount={i}000",
+    "report": "/api/v1/reports/by-category",
+    "balance_run": None,  # POST /run, see _send
+}
+
+
+async def _send(client: httpx.AsyncClient, scenario: str, i: int) -> httpx.Response:
+    if scenario == "balance_run":
+        return await client.post(
+            "/api/v1/run",
+            json={
+                "session_id": f"scale-{os.getpid()}-{i}",
+                "new_message": {"role": "user", "parts": [{"text": "cek saldo"}]},
+                "streaming": False,
+            },
+        )
+    return await client.get(PATHS[scenario].format(i=i % 100))
+
+
+async def _drive(base_url: str, scenario: str, concurrency: int, duration: float):
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await _send(client, scenario, i)
+                errors += response.status_code >= 400
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += concurrency
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(args: tuple) -> tuple[list[float], int]:
+    return asyncio.run(_drive(*args))
+
+
+def _wait_until_up(base_url: str, server: subprocess.Popen, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{base_url} did not come up within {timeout}s")
+
+
+def run(args: argparse.Namespace) -> None:
+    env = {
+        **os.environ,
+        "DATABASE_URL": BENCH_DATABASE_URL,
+        "AGENT_MODEL": "scripted",
+    }
+    os.environ.update(env)
+    from benchmarks.api import seed
+    from src.database.models import engine
+
+    engine.echo = False
+    seed(engine, args.rows)
+    engine.dispose()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    baseline = None
+    print(
+        f"{'workers':>7} {'requests':>9} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'req/s':>9} {'speedup':>8}"
+    )
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "server:app",
+                "--port",
+                str(args.port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            env={**env, "WEB_CONCURRENCY": str(workers)},
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            _wait_until_up(base_url, server)
+            # Warm every worker (imports, caches, pools) before measuring.
+            _client_process((base_url, args.scenario, args.concurrency, 1.0))
+
+            started = time.perf_counter()
+            with multiprocessing.Pool(args.clients) as pool:
+                results = pool.map(
+                    _client_process,
+                    [(base_url, args.scenario, args.concurrency, args.duration)]
+                    * args.clients,
+                )
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+        latencies = [value for values, _ in results for value in values]
+        errors = sum(count for _, count in results)
+        p50, p95, p99 = summarize(latencies)
+        throughput = len(latencies) / elapsed
+        baseline = baseline or throughput
+        print(
+            f"{workers:>7} {len(latencies):>9} {errors:>5} {p50:>9.2f} {p95:>9.2f} "
+            f"{p99:>9.2f} {throughput:>9.1f} {throughput / baseline:>7.2f}x",
+            flush=True,
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cpus = os.cpu_count() or 1
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, max(1, cpus // 2), cpus}),
+    )
+    parser.add_argument("--scenario", choices=sorted(PATHS), default="list")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument(
+        "--clients", type=int, default=4, help="Load generator processes."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Connections per client."
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds.")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
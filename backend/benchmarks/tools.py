@@ -0,0 +1,183 @@
+"""Latency of agent turns whose model response makes several tool calls.
+
+Each turn is one scripted response with ``--calls`` read-only calls (SELECTs
+through ``execute_sql_query`` and ``get_balance``) followed by the reply,
+run through a fresh ``InMemoryRunner``. ``serial`` is the agent without
+``agent.parallel``'s callbacks, so ADK runs the calls one after another;
+``parallel`` is the agent as configured in ``agent.agent``. ``--writes``
+puts that many INSERTs in the middle of the calls, which stay serialized.
+
+Tools query ``BENCH_DATABASE_URL`` (default ``sqlite:///./bench.db``),
+which is reseeded. The agent tools need PostgreSQL; against SQLite the
+queries fail fast, so every round-trip also sleeps ``--query-ms`` (set it to
+0 against PostgreSQL to measure the real queries only).
+
+Usage:
+    python -m benchmarks.tools --turns 30 --calls 4
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.tools --query-ms 0
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import statistics
+import time
+
+from benchmarks.api import BENCH_DATABASE_URL, summarize
+
+MODES = ("serial", "parallel")
+READS = (
+    "SELECT category, SUM(amount) AS total FROM transactions_table "
+    "WHERE type = 'expense' GROUP BY category ORDER BY total DESC",
+    "SELECT date, description, amount FROM transactions_table "
+    "ORDER BY date DESC LIMIT 10",
+    "SELECT type, COUNT(*) AS count, AVG(amount) AS average "
+    "FROM transactions_table GROUP BY type",
+    "SELECT description, amount FROM transactions_table "
+    "WHERE type = 'expense' ORDER BY amount DESC LIMIT 5",
+)
+WRITE = (
+    "INSERT INTO transactions_table (type, amount, description, category, date) "
+    "VALUES ('expense', 15000, 'Kopi', 'Makanan', '2025-05-31')"
+)
+
+
+def script(calls: int, writes: int) -> list[dict]:
+    """``ScriptedLlm`` steps: one response with the tool calls, then a reply."""
+    tools = [{"tool": "get_balance"}] + [
+        {"tool": "execute_sql_query", "args": {"sql_query": READS[index % len(READS)]}}
+        for index in range(calls - 1)
+    ]
+    for index in range(writes):
+        position = (index + 1) * len(tools) // (writes + 1)
+        tools.insert(
+            position, {"tool": "execute_sql_query", "args": {"sql_query": WRITE}}
+        )
+    return [{"tools": tools}, {"text": "Oke, ini ringkasannya: {result}"}]
+
+
+def build_runner(mode: str, args: argparse.Namespace):
+    from google.adk.agents import Agent
+    from google.adk.runners import InMemoryRunner
+
+    from agent.agent import get_agent
+    from agent.models import ScriptedLlm
+
+    configured = get_agent("scripted")
+    agent = Agent(
+        name="financial_agent",
+        model=ScriptedLlm(
+            steps=script(args.calls, args.writes), latency_ms=args.latency_ms
+        ),
+        tools=configured.tools,
+        instruction=configured.instruction,
+        before_model_callback=configured.before_model_callback,
+        after_model_callback=(
+            configured.after_model_callback if mode == "parallel" else None
+        ),
+        before_tool_callback=(
+            configured.before_tool_callback if mode == "parallel" else None
+        ),
+    )
+    return InMemoryRunner(agent=agent, app_name="bench")
+
+
+def simulate_round_trips(query_ms: float) -> None:
+    """Make every agent SQL round-trip take at least ``query_ms`` longer."""
+    from agent import tools
+
+    run_query = tools._run_query
+
+    @functools.wraps(run_query)
+    def slow_run_query(sql_query: str):
+        time.sleep(query_ms / 1000)
+        return run_query(sql_query)
+
+    tools._run_query = slow_run_query
+
+
+async def run_turn(runner, bump_version) -> float:
+    """Return the wall time (ms) of one turn."""
+    from google.genai import types
+
+    # get_balance is cached until a write; start every turn cold.
+    bump_version()
+    session = await runner.session_service.create_session(app_name="bench", user_id="1")
+    started = time.perf_counter()
+    async for _ in runner.run_async(
+        user_id="1",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text="ringkasan")]),
+    ):
+        pass
+    return (time.perf_counter() - started) * 1000
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, list[float]]:
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+    from benchmarks.api import seed
+    from src.cache import bump_data_version
+    from src.database.models import engine
+
+    seed(engine, args.rows)
+    if args.query_ms:
+        simulate_round_trips(args.query_ms)
+
+    results = {}
+    for mode in args.modes:
+        runner = build_runner(mode, args)
+        await run_turn(runner, bump_data_version)  # warm-up
+        results[mode] = [
+            await run_turn(runner, bump_data_version) for _ in range(args.turns)
+        ]
+    return results
+
+
+def report(results: dict[str, list[float]]) -> None:
+    print(f"{'mode':<9} {'turns':>6} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for mode, latencies in results.items():
+        p50, p95, _ = summarize(latencies)
+        print(
+            f"{mode:<9} {len(latencies):>6} {p50:>9.1f} {p95:>9.1f} "
+            f"{statistics.fmean(latencies):>9.1f}"
+        )
+    if {"serial", "parallel"} <= results.keys():
+        speedup = statistics.median(results["serial"]) / statistics.median(
+            results["parallel"]
+        )
+        print(f"p50 speedup: {speedup:.2f}x")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument(
+        "--calls", type=int, default=4, help="Read-only calls per response."
+    )
+    parser.add_argument(
+        "--writes", type=int, default=0, help="INSERTs among the calls."
+    )
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument(
+        "--query-ms",
+        type=float,
+        default=50,
+        help="Simulated extra latency per SQL round-trip.",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0,
+        help="Scripted model: fixed delay before each response.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    report(asyncio.run(benchmark(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
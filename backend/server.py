@@ -1,10 +1,40 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from agent.executor import shutdown_executor
+from src.cache import require_shared_cache
+from src.database.config import worker_count
+from src.database.models import async_engine, engine
+from src.database.partitions import ensure_partitions_on_startup
+from src.metrics import HTTP_REQUEST_DURATION, REGISTRY
+from src.routes.agent import get_runner, get_session_service
 from src.routes.agent import router as agent_router
+from src.routes.transaction import NEXT_CURSOR_HEADER
 from src.routes.transaction import router as transaction_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker process. Connections inherited from a parent
+    # process (e.g. gunicorn --preload) must not be shared, so drop them
+    # without closing, then build the agent runner and session service here.
+    require_shared_cache(worker_count())
+    engine.dispose(close=False)
+    await async_engine.dispose(close=False)
+    ensure_partitions_on_startup(engine)
+    get_runner()
+    yield
+    shutdown_executor()
+    get_session_service().db_engine.dispose()
+    engine.dispose()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,9 +42,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 
+def _route_template(request: Request) -> str:
+    """The matched route's path template, e.g. ``/api/v1/session/{session_id}``.
+
+    Labelling by template rather than raw path keeps the series bounded.
+    Depending on the FastAPI version ``scope["route"]`` of an included router
+    may lack the router's prefix, so the prefix is recovered from the path.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    path = request.scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    HTTP_REQUEST_DURATION.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=_route_template(request),
+        status=response.status_code,
+    )
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def health_check():
     return {"status": "ok", "last_updated": "2025-06-03"}
@@ -26,4 +92,6 @@ app.include_router(router=transaction_router, prefix="/api/v1", tags=["transacti
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each worker is a separate process with its own pools; size them with
+    # DB_MAX_CONNECTIONS (see src.database.config.engine_options).
+    uvicorn.run("server:app", host="0.0.0.0", port=8000, workers=worker_count())
@@ -0,0 +1,244 @@
+"""Read-through response cache invalidated by a data version counter.
+
+Cache keys embed the current data version, which every write path bumps
+(``create_transaction``, ``delete_transaction``, bulk loads and non-SELECT
+statements from the agent's ``execute_sql_query``). Bumping the version makes
+all previously cached entries unreachable; they then age out by TTL/LRU.
+
+Writes that bypass the app (seeds, the partition CLI, psql, loads from other
+processes) cannot bump it. ``cached_response`` therefore also keys on the
+database's own write counter (``src.database.models.data_version``), which
+the totals triggers maintain, so HTTP responses and their ETags follow every
+write. The agent's cached tool results and answers only key on the app's
+version: after an outside write they may lag for up to their TTL.
+
+The default backend is in-process, so each worker has its own version, and
+the version restarts at 0 with the process. ETags therefore also carry the
+backend's ``epoch``, a random token per in-process cache, so a tag issued
+before a restart never matches one issued after it. Set
+``CACHE_URL=redis://...`` to share entries and the version across workers;
+the Redis version outlives restarts of the app.
+
+The backends are synchronous, for the agent's tools on the tool thread pool.
+Async code goes through ``cache_call``, which moves Redis round trips off
+the event loop.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, Protocol, TypeVar
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+load_dotenv()
+
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+T = TypeVar("T")
+
+
+class Cache(Protocol):
+    epoch: str
+    # Whether calls do network I/O (see ``cache_call``).
+    blocking: bool
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    def version(self) -> int: ...
+
+    def bump_version(self) -> int: ...
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._version = 0
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            # Older versions can never be read again.
+            self._entries.clear()
+            return self._version
+
+
+class RedisCache:
+    """Cache backed by a Redis-compatible client (``get``/``set``/``incr``)."""
+
+    VERSION_KEY = "data_version"
+    epoch = "r"
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = "finansi:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def version(self) -> int:
+        return int(self.client.get(self.prefix + self.VERSION_KEY) or 0)
+
+    def bump_version(self) -> int:
+        return int(self.client.incr(self.prefix + self.VERSION_KEY))
+
+
+_cache: Optional[Cache] = None
+
+
+def get_cache() -> Cache:
+    global _cache
+    if _cache is None:
+        _cache = RedisCache.from_url(CACHE_URL) if CACHE_URL else TTLCache()
+    return _cache
+
+
+def set_cache(cache: Cache) -> None:
+    """Replace the process-wide cache backend (used by tests)."""
+    global _cache
+    _cache = cache
+
+
+def require_shared_cache(workers: int) -> None:
+    """Refuse to run several workers on per-process caches.
+
+    A write handled by one worker would only bump that worker's version, so
+    the others would keep serving stale lists, balances and agent answers.
+    """
+    if workers > 1 and not CACHE_URL:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={workers} needs a shared cache: set CACHE_URL "
+            "(e.g. redis://redis:6379/0) or run a single worker"
+        )
+
+
+async def cache_call(cache: Cache, fn: Callable[..., T], *args: Any) -> T:
+    """Call ``fn``, which uses ``cache``, from async code.
+
+    A blocking backend (Redis) is called in the threadpool so its network
+    round trip does not stall the event loop; the in-process cache answers
+    inline, where a thread hop would cost more than the lookup itself.
+    """
+    if cache.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+def bump_data_version() -> int:
+    """Invalidate every cached read; call after any write to transactions."""
+    return get_cache().bump_version()
+
+
+async def bump_data_version_async() -> int:
+    """``bump_data_version`` for async write paths."""
+    cache = get_cache()
+    return await cache_call(cache, cache.bump_version)
+
+
+def _digest(*parts: Any) -> str:
+    payload = json.dumps(parts, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=12).hexdigest()
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """Build a key for ``namespace`` that is only valid for the current data version."""
+    return f"{namespace}:v{get_cache().version()}:{_digest(*parts)}"
+
+
+async def cached_response(
+    request: Request,
+    namespace: str,
+    build: Callable[[], Awaitable[Response]],
+    db_version: int,
+    ttl: int = CACHE_TTL_SECONDS,
+) -> Response:
+    """Serve ``build()``'s response from cache, with ETag / ``If-None-Match`` support.
+
+    The key (and the ETag) cover the request path, query string, data
+    version and ``db_version``, the database's write counter, so a client
+    revalidating after a write always gets fresh data, whichever process
+    wrote. The ETag also carries the cache's ``epoch``, so a tag from before
+    a restart is not answered with 304.
+    Responses with status >= 500 are not cached.
+    """
+    cache = get_cache()
+    version = await cache_call(cache, cache.version)
+    digest = _digest(request.url.path, str(request.query_params))
+    key = f"{namespace}:v{version}.{db_version}:{digest}"
+    etag = f'W/"{cache.epoch}.{version}.{db_version}-{digest}"'
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    hit = await cache_call(cache, cache.get, key)
+    if hit is not None:
+        status_code, headers, body = json.loads(hit)
+        response = Response(
+            content=body.encode(), status_code=status_code, headers=headers
+        )
+    else:
+        response = await build()
+        if response.status_code < 500:
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name != "content-length"
+            }
+            payload = json.dumps(
+                [response.status_code, headers, response.body.decode()]
+            ).encode()
+            await cache_call(cache, cache.set, key, payload, ttl)
+
+    response.headers["ETag"] = etag
+    return response
@@ -0,0 +1,90 @@
+import csv
+import io
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Connection, insert
+from sqlalchemy.util import await_only
+
+from .models import Transaction
+
+COPY_CHUNK_SIZE = 5000
+COPY_COLUMNS = ("type", "amount", "description", "category", "date")
+
+
+def _copy_chunk(connection: Connection, rows: Sequence[dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [
+                row["type"],
+                row["amount"],
+                row["description"],
+                row["category"],
+                row["date"].isoformat(),
+            ]
+        )
+    buffer.seek(0)
+    copy_csv(connection, buffer)
+
+
+def copy_csv(connection: Connection, buffer: io.StringIO) -> None:
+    """``COPY`` CSV rows in ``COPY_COLUMNS`` order into ``transactions_table``.
+
+    psycopg2 connections only.
+    """
+    dbapi_connection = connection.connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY transactions_table ({', '.join(COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def _copy_records_asyncpg(
+    connection: Connection, rows: Sequence[dict[str, Any]]
+) -> None:
+    driver_connection = connection.connection.driver_connection
+    await_only(
+        driver_connection.copy_records_to_table(
+            "transactions_table",
+            columns=COPY_COLUMNS,
+            records=[tuple(row[column] for column in COPY_COLUMNS) for row in rows],
+        )
+    )
+
+
+def bulk_insert_transactions(
+    connection: Connection,
+    rows: Sequence[dict[str, Any]],
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> int:
+    """Insert already-validated transaction rows in chunks.
+
+    PostgreSQL loads each chunk with ``COPY ... FROM STDIN`` (through
+    psycopg2, or asyncpg when called from ``AsyncConnection.run_sync``);
+    other dialects (the SQLite test engine) fall back to an ``executemany``
+    INSERT. Rows are written inside the caller's transaction, which is left
+    uncommitted.
+
+    Args:
+        connection: Connection to load through.
+        rows: Mappings with the keys in ``COPY_COLUMNS``; ``type`` is the
+            plain string value and ``date`` a ``datetime``.
+        chunk_size: Number of rows sent per round-trip.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    dialect = connection.dialect
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        if dialect.name != "postgresql":
+            connection.execute(insert(Transaction), list(chunk))
+        elif dialect.driver == "asyncpg":
+            _copy_records_asyncpg(connection, chunk)
+        else:
+            _copy_chunk(connection, chunk)
+    return len(rows)
@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+from typing import Any, Optional, Union
+
+from sqlalchemy.engine import make_url
+
+slow_query_logger = logging.getLogger("sql.slow")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_echo() -> Union[bool, str]:
+    value = (os.getenv("DB_ECHO") or "").strip().lower()
+    if value == "debug":
+        return "debug"
+    return value in ("1", "true", "yes", "on")
+
+
+# Statements slower than this are logged as JSON to the "sql.slow" logger;
+# 0 disables the log.
+SLOW_QUERY_MS = _env_int("DB_SLOW_QUERY_MS", 500)
+SLOW_QUERY_MAX_CHARS = 2000
+
+
+def log_slow_query(engine: str, statement: str, seconds: float, **fields: Any) -> None:
+    """Log ``statement`` as one JSON line if it took at least ``SLOW_QUERY_MS``.
+
+    Parameters are not logged, as they may hold user data.
+    """
+    duration_ms = seconds * 1000
+    if not SLOW_QUERY_MS or duration_ms < SLOW_QUERY_MS:
+        return
+    record = {
+        "event": "slow_query",
+        "engine": engine,
+        "duration_ms": round(duration_ms, 1),
+        "statement": " ".join(statement.split())[:SLOW_QUERY_MAX_CHARS],
+        **fields,
+    }
+    slow_query_logger.warning(json.dumps(record, default=str))
+
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` rewritten for its asyncio driver (asyncpg / aiosqlite)."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Engines each worker process opens: the async API engine, the sync engine
+# used by the agent tools and the agent session service's engine.
+ENGINES_PER_WORKER = 3
+
+
+def worker_count() -> int:
+    """Number of server processes, from ``WEB_CONCURRENCY`` (as uvicorn reads it)."""
+    return max(1, _env_int("WEB_CONCURRENCY", 1))
+
+
+def engine_connection_budget() -> Optional[int]:
+    """Connections one engine may hold so the deployment stays within budget.
+
+    ``DB_MAX_CONNECTIONS`` is the number of connections all workers together
+    may open (the server's ``max_connections`` minus what other clients
+    need); it is split evenly over every engine of every worker. ``None``
+    when no budget is configured.
+    """
+    total = _env_int("DB_MAX_CONNECTIONS", 0)
+    if not total:
+        return None
+    return max(1, total // (worker_count() * ENGINES_PER_WORKER))
+
+
+def _statement_timeout_args(url: str, timeout_ms: int) -> dict[str, Any]:
+    """``connect_args`` that set PostgreSQL's ``statement_timeout`` per connection."""
+    if not timeout_ms or make_url(url).get_backend_name() != "postgresql":
+        return {}
+    if make_url(url).get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    return {"options": f"-c statement_timeout={timeout_ms}"}
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Engine and pool options for ``create_engine``, read from the environment.
+
+    Each engine holds at most ``DB_POOL_SIZE + DB_MAX_OVERFLOW`` connections.
+    When ``DB_MAX_CONNECTIONS`` is set the defaults are derived from
+    :func:`engine_connection_budget` instead (half kept open, half overflow),
+    so adding workers shrinks each pool rather than exceeding the database's
+    limit. SQLite engines keep SQLAlchemy's pool defaults.
+
+    Pass the URL of the driver that will be used (e.g. the result of
+    :func:`async_database_url` for async engines): the statement timeout is
+    set differently for psycopg2 and asyncpg.
+
+    Environment variables:
+        DB_ECHO: ``true`` logs every statement, ``debug`` also the rows
+            (default false; costly, for local debugging only).
+        DB_STATEMENT_TIMEOUT_MS: Server-side statement timeout for every
+            connection, PostgreSQL only (default 0, no timeout).
+        DB_MAX_CONNECTIONS: Connection budget shared by all workers (optional).
+        WEB_CONCURRENCY: Number of worker processes (default 1).
+        DB_POOL_SIZE: Connections kept open in the pool (default 5).
+        DB_MAX_OVERFLOW: Extra connections allowed under burst (default 5).
+        DB_POOL_TIMEOUT: Seconds to wait for a free connection (default 30).
+        DB_POOL_RECYCLE: Seconds before a connection is replaced (default 1800).
+        DB_POOL_PRE_PING: Check connections before use (default true).
+    """
+    options: dict[str, Any] = {
+        "echo": _env_echo(),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    connect_args = _statement_timeout_args(url, _env_int("DB_STATEMENT_TIMEOUT_MS", 0))
+    if connect_args:
+        options["connect_args"] = connect_args
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    pool_size, max_overflow = 5, 5
+    budget = engine_connection_budget()
+    if budget:
+        pool_size = (budget + 1) // 2
+        max_overflow = budget - pool_size
+
+    options.update(
+        pool_size=_env_int("DB_POOL_SIZE", pool_size),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", max_overflow),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+    )
+    return options
@@ -2,16 +2,43 @@ import enum
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import (BigInteger, Column, DateTime, Enum, Integer, Text,
-                        create_engine, func)
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Integer,
+    SmallInteger,
+    Text,
+    create_engine,
+    func,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from src.metrics import instrument_engine
+
+from .config import async_database_url, engine_options
+from .totals import install_totals_triggers
+
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    **engine_options(async_database_url(DATABASE_URL)),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
 Base = declarative_base()
 
 
@@ -24,7 +51,10 @@ class Transaction(Base):
     __tablename__ = "transactions_table"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    type = Column(Enum(TransactionType, name="transaction_type", create_type=False), nullable=False)
+    type = Column(
+        Enum(TransactionType, name="transaction_type", create_type=False),
+        nullable=False,
+    )
     amount = Column(BigInteger, nullable=False)
     description = Column(Text, nullable=False)
     category = Column(Text, nullable=False)
@@ -32,9 +62,60 @@ class Transaction(Base):
     created_at = Column(DateTime, nullable=False, server_default=func.now())
 
 
+class TransactionTotal(Base):
+    """Running totals per transaction type, maintained by database triggers."""
+
+    __tablename__ = "transaction_totals"
+
+    type = Column(
+        Enum(TransactionType, name="transaction_type", create_type=False),
+        primary_key=True,
+    )
+    total = Column(BigInteger, nullable=False, default=0)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class TransactionMonthlyTotal(Base):
+    """Running totals per type, category and month, maintained by database triggers."""
+
+    __tablename__ = "transaction_monthly_totals"
+
+    type = Column(
+        Enum(TransactionType, name="transaction_type", create_type=False),
+        primary_key=True,
+    )
+    category = Column(Text, primary_key=True)
+    month = Column(Date, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class TransactionDataVersion(Base):
+    """Count of write statements on transactions, bumped by the totals triggers."""
+
+    __tablename__ = "transaction_data_version"
+
+    id = Column(SmallInteger, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+install_totals_triggers(Base.metadata)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def data_version(db: AsyncSession) -> int:
+    """The current ``TransactionDataVersion``; changes with every write."""
+    version = await db.scalar(select(TransactionDataVersion.version))
+    return version or 0
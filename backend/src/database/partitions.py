@@ -0,0 +1,510 @@
+"""Monthly range partitioning and archival of ``transactions_table`` (PostgreSQL).
+
+``migrate`` turns the single heap into a table partitioned by ``date`` with
+one partition per month (``transactions_y2025m05``) and a default partition
+that catches dates no monthly partition covers yet. Data, the id sequence
+and the totals triggers carry over. Only the primary key and three indexes
+are kept; type, category and amount lookups are served by the composite
+``(type, date)`` and ``(category, date)`` indexes, so every insert now
+updates four indexes of one small partition instead of eight of the
+whole table.
+
+``ensure_partitions`` creates the partitions of the current and the next
+``TRANSACTION_PARTITION_MONTHS_AHEAD`` months, counted in WIB like the rest
+of the app. It also creates a partition for every month that has rows in
+the default partition, so rows dated past the created months, or
+back-dated into a month without a partition (including archived ones),
+never stay in the default partition beyond the next run. The server runs
+it at startup; schedule ``python -m src.database.partitions ensure``
+(``make partitions``) for long-running deployments.
+
+``archive_partitions`` moves partitions older than
+``TRANSACTION_ARCHIVE_AFTER_MONTHS`` out of ``transactions_table``. They
+go either into ``transactions_archive``, as chunks of JSONB rows that
+PostgreSQL stores compressed (read them back through the
+``transactions_archived`` view), or into one Parquet file per month
+(needs ``pyarrow``). Archiving leaves ``transaction_totals`` and
+``transaction_monthly_totals`` untouched, so the balance and monthly
+reports still include archived months. Every month is written out before
+its partition is detached, in a transaction of its own, so the table is
+locked only briefly per month. A month that receives rows after it was
+archived gets its partition back from ``ensure_partitions`` and is
+archived again by the next run, appended to what was archived before.
+
+The SQL mirrors ``init-scripts/03-partition-transactions.sql``.
+
+Usage:
+    python -m src.database.partitions migrate
+    python -m src.database.partitions ensure --months-ahead 6
+    python -m src.database.partitions archive --keep-months 24 [--parquet DIR]
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import re
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from .totals import BUMP_DATA_VERSION
+from .totals import POSTGRES_DDL as TOTALS_DDL
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("TRANSACTION_PARTITION_MONTHS_AHEAD", "3"))
+ARCHIVE_AFTER_MONTHS = int(os.getenv("TRANSACTION_ARCHIVE_AFTER_MONTHS", "24"))
+ARCHIVE_CHUNK_ROWS = 10_000
+ARCHIVE_LOCK_TIMEOUT = "5s"
+
+# WIB, the zone of agent.prompt.TIMEZONE: months roll over when the app's do.
+TIMEZONE = datetime.timezone(datetime.timedelta(hours=7))
+
+_PARTITION_NAME = re.compile(r"^transactions_y(\d{4})m(\d{2})$")
+
+FUNCTIONS_DDL = [
+    """
+CREATE OR REPLACE FUNCTION create_transaction_partition(month date) RETURNS text AS $$
+DECLARE
+    lower_bound date := date_trunc('month', month)::date;
+    upper_bound date := (date_trunc('month', month) + interval '1 month')::date;
+    table_name text := 'transactions_y' || to_char(lower_bound, 'YYYY"m"MM');
+BEGIN
+    IF to_regclass(table_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Rows of this month may already sit in the default partition: move
+    -- them into the new table first, then attach it. The CHECK constraint
+    -- lets ATTACH skip scanning the new partition. Writes wait until the
+    -- commit (reads do not), so no row of this month can land in the
+    -- default partition between the move and the ATTACH, which would fail
+    -- on it; they are routed to the new partition once it is attached.
+    LOCK TABLE transactions_table IN SHARE ROW EXCLUSIVE MODE;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE transactions_table INCLUDING DEFAULTS, '
+        || 'CONSTRAINT %I CHECK (date >= %L AND date < %L))',
+        table_name, table_name || '_bounds', lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM transactions_default '
+        || 'WHERE date >= %L AND date < %L RETURNING *) '
+        || 'INSERT INTO %I SELECT * FROM moved',
+        lower_bound, upper_bound, table_name
+    );
+    EXECUTE format(
+        'ALTER TABLE transactions_table ATTACH PARTITION %I '
+        || 'FOR VALUES FROM (%L) TO (%L)',
+        table_name, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'ALTER TABLE %I DROP CONSTRAINT %I', table_name, table_name || '_bounds'
+    );
+    RETURN table_name;
+END;
+$$ LANGUAGE plpgsql
+""",
+    "DROP FUNCTION IF EXISTS ensure_transaction_partitions(integer)",
+    """
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(
+    months_ahead integer,
+    today date DEFAULT (now() AT TIME ZONE 'Asia/Jakarta')::date
+) RETURNS SETOF text AS $$
+DECLARE
+    month date;
+    created text;
+BEGIN
+    -- Workers starting together must not race to create the same table.
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_transaction_partitions'));
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', today::timestamp),
+            date_trunc('month', today::timestamp) + make_interval(months => months_ahead),
+            interval '1 month'
+        )::date
+        -- Rows dated into months that have no partition (yet or any more)
+        UNION
+        SELECT date_trunc('month', date)::date FROM transactions_default
+        ORDER BY 1
+    LOOP
+        created := create_transaction_partition(month);
+        IF created IS NOT NULL THEN
+            RETURN NEXT created;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE TABLE IF NOT EXISTS transactions_archive (
+    month DATE NOT NULL,
+    chunk INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    payload JSONB NOT NULL,
+    archived_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (month, chunk)
+)
+""",
+    """
+CREATE OR REPLACE FUNCTION archive_transaction_partition(month date, chunk_rows integer)
+RETURNS bigint AS $$
+DECLARE
+    table_name text := 'transactions_y' || to_char(month, 'YYYY"m"MM');
+    archived bigint;
+    first_chunk integer;
+BEGIN
+    -- The rows are copied out of the still-attached partition; meanwhile
+    -- only writes to it wait, transactions_table stays fully usable.
+    EXECUTE format('LOCK TABLE %I IN SHARE MODE', table_name);
+    EXECUTE format('SELECT count(*) FROM %I', table_name) INTO archived;
+    -- A month archived before (and re-created for late rows) is appended to.
+    SELECT coalesce(max(a.chunk) + 1, 0) INTO first_chunk
+    FROM transactions_archive a
+    WHERE a.month = date_trunc('month', archive_transaction_partition.month)::date;
+    -- Large JSONB values are TOASTed: compressed and stored out of line.
+    EXECUTE format(
+        'INSERT INTO transactions_archive (month, chunk, row_count, payload) '
+        || 'SELECT %L, %s + chunk, count(*), jsonb_agg(doc ORDER BY seq) '
+        || 'FROM (SELECT row_number() OVER (ORDER BY date, id) AS seq, '
+        || '(row_number() OVER (ORDER BY date, id) - 1) / %s AS chunk, '
+        || 'to_jsonb(p) AS doc FROM %I p) numbered GROUP BY chunk',
+        date_trunc('month', month)::date, first_chunk, chunk_rows, table_name
+    );
+    -- DETACH locks transactions_table exclusively until the caller commits,
+    -- so call this in a transaction of its own. DETACH ... CONCURRENTLY is
+    -- not allowed while a default partition exists.
+    EXECUTE format('ALTER TABLE transactions_table DETACH PARTITION %I', table_name);
+    EXECUTE format('DROP TABLE %I', table_name);
+    -- DETACH and DROP fire no triggers, but the rows left the API's reads.
+    INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN archived;
+END;
+$$ LANGUAGE plpgsql
+""",
+]
+
+MIGRATION_DDL = """
+DO $$
+DECLARE
+    id_sequence text;
+    month date;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'transactions_table'::regclass
+    ) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE transactions_table RENAME TO transactions_table_unpartitioned;
+    id_sequence := pg_get_serial_sequence('transactions_table_unpartitioned', 'id');
+
+    EXECUTE format($ddl$
+        CREATE TABLE transactions_table (
+            id INTEGER NOT NULL DEFAULT nextval(%L::regclass),
+            type transaction_type NOT NULL,
+            amount BIGINT NOT NULL,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) PARTITION BY RANGE (date)
+    $ddl$, id_sequence);
+    CREATE TABLE transactions_default PARTITION OF transactions_table DEFAULT;
+
+    FOR month IN
+        SELECT DISTINCT date_trunc('month', date)::date
+        FROM transactions_table_unpartitioned
+    LOOP
+        PERFORM create_transaction_partition(month);
+    END LOOP;
+
+    -- The old table's triggers are dropped with it; the totals are already
+    -- up to date, so the copy must not fire them again.
+    INSERT INTO transactions_table (id, type, amount, description, category, date, created_at)
+    SELECT id, type, amount, description, category, date, created_at
+    FROM transactions_table_unpartitioned;
+
+    EXECUTE format(
+        'ALTER SEQUENCE %s OWNED BY transactions_table.id', id_sequence
+    );
+    DROP TABLE transactions_table_unpartitioned;
+
+    -- Indexes are built after the copy; the partition key must be part of
+    -- the primary key.
+    ALTER TABLE transactions_table ADD PRIMARY KEY (id, date);
+    CREATE INDEX idx_transactions_date ON transactions_table (date DESC);
+    CREATE INDEX idx_transactions_type_date ON transactions_table (type, date DESC);
+    CREATE INDEX idx_transactions_category_date
+        ON transactions_table (category, date DESC);
+
+    COMMENT ON TABLE transactions_table IS
+        'Financial transactions, partitioned by month of date';
+END;
+$$
+"""
+
+ARCHIVE_VIEW_DDL = """
+CREATE OR REPLACE VIEW transactions_archived AS
+SELECT r.*
+FROM transactions_archive a
+CROSS JOIN LATERAL jsonb_populate_recordset(NULL::transactions_table, a.payload) AS r
+"""
+
+
+def wib_today() -> datetime.date:
+    """Today's date in WIB."""
+    return datetime.datetime.now(TIMEZONE).date()
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"transactions_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime.date]:
+    """The month a ``transactions_yYYYYmMM`` partition holds, else ``None``."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return datetime.date(int(match[1]), int(match[2]), 1)
+
+
+def archive_cutoff(today: datetime.date, keep_months: int) -> datetime.date:
+    """First day of the oldest month that is kept; older months are cold."""
+    months = today.year * 12 + today.month - 1 - keep_months
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+def cold_months(
+    names: List[str], today: datetime.date, keep_months: int
+) -> List[datetime.date]:
+    """Months of the partitions in ``names`` that are older than ``keep_months``."""
+    cutoff = archive_cutoff(today, keep_months)
+    months = (partition_month(name) for name in names)
+    return sorted(month for month in months if month is not None and month < cutoff)
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('transactions_table'))"
+            )
+        )
+    )
+
+
+def _execute_ddl(connection: Connection, statement: str) -> None:
+    # Without parameters the driver leaves the ``%I``/``%L`` of format() alone.
+    connection.exec_driver_sql(statement, execution_options={"no_parameters": True})
+
+
+def migrate(connection: Connection) -> None:
+    """Partition ``transactions_table`` by month; does nothing if it already is."""
+    for statement in FUNCTIONS_DDL:
+        _execute_ddl(connection, statement)
+    _execute_ddl(connection, MIGRATION_DDL)
+    # The triggers of the old table were dropped with it.
+    for statement in TOTALS_DDL:
+        _execute_ddl(connection, statement)
+    _execute_ddl(connection, ARCHIVE_VIEW_DDL)
+    ensure_partitions(connection)
+
+
+def ensure_partitions(
+    connection: Connection,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    today: Optional[datetime.date] = None,
+) -> List[str]:
+    """Create missing partitions up to ``months_ahead`` months ahead; return them.
+
+    Months with rows in the default partition get their partition too.
+    """
+    if not is_partitioned(connection):
+        return []
+    return list(
+        connection.scalars(
+            text("SELECT ensure_transaction_partitions(:months_ahead, :today)"),
+            {"months_ahead": months_ahead, "today": today or wib_today()},
+        )
+    )
+
+
+def ensure_partitions_on_startup(engine: Engine) -> None:
+    """Run ``ensure_partitions`` once, logging instead of raising on failure."""
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.begin() as connection:
+            created = ensure_partitions(connection)
+    except SQLAlchemyError:
+        logger.exception("Could not create transaction partitions")
+        return
+    if created:
+        logger.info("Created transaction partitions: %s", ", ".join(created))
+
+
+def _write_parquet(connection: Connection, name: str, path: str) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    result = connection.execution_options(stream_results=True).exec_driver_sql(
+        f'SELECT * FROM "{name}" ORDER BY date, id'
+    )
+    written = 0
+    writer = None
+    try:
+        for rows in result.partitions(ARCHIVE_CHUNK_ROWS * 10):
+            columns = {
+                column: [getattr(row, column) for row in rows]
+                for column in result.keys()
+            }
+            table = pa.table(columns)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+            written += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def _partition_names(connection: Connection) -> List[str]:
+    return list(
+        connection.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'transactions_table'::regclass"
+            )
+        )
+    )
+
+
+def _set_lock_timeout(connection: Connection) -> None:
+    # Queries queue behind a waiting DETACH; give up rather than stall them.
+    connection.exec_driver_sql(f"SET LOCAL lock_timeout = '{ARCHIVE_LOCK_TIMEOUT}'")
+
+
+def _parquet_path(parquet_dir: str, name: str) -> str:
+    path = os.path.join(parquet_dir, f"{name}.parquet")
+    # A month archived before keeps its earlier file.
+    copy = 0
+    while os.path.exists(path):
+        copy += 1
+        path = os.path.join(parquet_dir, f"{name}.{copy}.parquet")
+    return path
+
+
+def _archive_to_parquet(engine: Engine, month: datetime.date, parquet_dir: str) -> int:
+    name = partition_name(month)
+    path = _parquet_path(parquet_dir, name)
+    # Renamed into place only once the partition is dropped, so a failed
+    # month leaves no file behind to be duplicated by the next run.
+    partial = f"{path}.partial"
+    try:
+        with engine.begin() as connection:
+            _set_lock_timeout(connection)
+            connection.exec_driver_sql(f'LOCK TABLE "{name}" IN SHARE MODE')
+            written = _write_parquet(connection, name, partial)
+            connection.exec_driver_sql(
+                f'ALTER TABLE transactions_table DETACH PARTITION "{name}"'
+            )
+            connection.exec_driver_sql(f'DROP TABLE "{name}"')
+            connection.exec_driver_sql(BUMP_DATA_VERSION)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    if os.path.exists(partial):
+        os.replace(partial, path)
+    return written
+
+
+def archive_partitions(
+    engine: Engine,
+    keep_months: int = ARCHIVE_AFTER_MONTHS,
+    parquet_dir: Optional[str] = None,
+    today: Optional[datetime.date] = None,
+) -> dict:
+    """Archive monthly partitions older than ``keep_months``; return rows per month.
+
+    Rows of cold months still in the default partition are given their
+    partition (``ensure_partitions``) first, so they are archived too. Then
+    each month is archived in a short transaction of its own: its rows are
+    written out of the still-attached partition, which only blocks writes to
+    that partition, and it is detached and dropped. ``transactions_table``
+    is locked exclusively from the DETACH to that month's commit only. If a
+    month fails, the months before it stay archived and it keeps its
+    partition.
+    """
+    today = today or wib_today()
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise RuntimeError(
+                "transactions_table is not partitioned; run "
+                "`python -m src.database.partitions migrate` first"
+            )
+        ensure_partitions(connection, today=today)
+        months = cold_months(_partition_names(connection), today, keep_months)
+
+    archived = {}
+    for month in months:
+        if parquet_dir:
+            archived[month] = _archive_to_parquet(engine, month, parquet_dir)
+            continue
+        with engine.begin() as connection:
+            _set_lock_timeout(connection)
+            archived[month] = connection.scalar(
+                text("SELECT archive_transaction_partition(:month, :chunk_rows)"),
+                {"month": month, "chunk_rows": ARCHIVE_CHUNK_ROWS},
+            )
+    return archived
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .models import engine
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Partition transactions_table by month.")
+    ensure = commands.add_parser("ensure", help="Create upcoming partitions.")
+    ensure.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="Archive cold partitions.")
+    archive.add_argument("--keep-months", type=int, default=ARCHIVE_AFTER_MONTHS)
+    archive.add_argument(
+        "--parquet", metavar="DIR", help="Write Parquet files instead (pyarrow)."
+    )
+    args = parser.parse_args(argv)
+
+    if engine.dialect.name != "postgresql":
+        parser.error("partitioning needs PostgreSQL")
+    if args.command == "archive":
+        if args.parquet:
+            os.makedirs(args.parquet, exist_ok=True)
+        archived = archive_partitions(engine, args.keep_months, args.parquet)
+        for month, rows in archived.items():
+            print(f"Archived {partition_name(month)}: {rows} rows")
+        print(f"Archived {len(archived)} partitions")
+        return
+    with engine.begin() as connection:
+        if args.command == "migrate":
+            migrate(connection)
+            print("transactions_table is partitioned by month")
+        else:
+            created = ensure_partitions(connection, args.months_ahead)
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
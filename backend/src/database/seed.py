@@ -1,16 +1,19 @@
+import argparse
 import os
-from datetime import datetime
+import time
+from datetime import date, datetime
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, delete, text
 from sqlalchemy.orm import sessionmaker
 
+from .config import engine_options
 from .models import Base, Transaction, TransactionType
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 sample_transactions = [
@@ -136,12 +139,96 @@ def seed_database():
         db.close()
 
 
-def main():
+def seed_synthetic(config, append: bool = False) -> None:
+    """Load ``config.rows`` synthetic transactions, reporting throughput per batch.
+
+    Existing transactions are removed first unless ``append`` is set. Each
+    batch is committed on its own, so an interrupted load keeps what it
+    loaded so far.
+    """
+    from .synthetic import generate_batches, load_batch
+
+    if not append:
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                # Also resets the totals tables (see totals.py).
+                connection.execute(text("TRUNCATE transactions_table RESTART IDENTITY"))
+            else:
+                connection.execute(delete(Transaction))
+        print("Cleared existing transaction data")
+
+    loaded = 0
+    generate_seconds = load_seconds = 0.0
+    started = time.perf_counter()
+    batches = generate_batches(config)
+    while True:
+        batch_started = time.perf_counter()
+        batch = next(batches, None)
+        if batch is None:
+            break
+        generated = time.perf_counter()
+        with engine.begin() as connection:
+            loaded += load_batch(connection, batch)
+        generate_seconds += generated - batch_started
+        load_seconds += time.perf_counter() - generated
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"{loaded:>12,} / {config.rows:,} rows "
+            f"({loaded / config.rows:6.1%}) {loaded / elapsed:>10,.0f} rows/s",
+            flush=True,
+        )
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Loaded {loaded:,} rows in {elapsed:.1f}s ({loaded / elapsed:,.0f} rows/s; "
+        f"generate {generate_seconds:.1f}s, load {load_seconds:.1f}s)"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create the tables and seed data.")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="ROWS",
+        help="Load ROWS generated transactions instead of the sample ones.",
+    )
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument(
+        "--start", type=date.fromisoformat, default=date(2023, 1, 1), help="YYYY-MM-DD"
+    )
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument(
+        "--append", action="store_true", help="Keep existing transactions."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
     """Main function to create tables and seed data."""
+    args = parse_args(argv)
     try:
         print("Starting database seeding process...")
         create_tables()
-        seed_database()
+        if args.synthetic:
+            from .synthetic import SyntheticConfig
+
+            seed_synthetic(
+                SyntheticConfig(
+                    rows=args.synthetic,
+                    users=args.users,
+                    start=args.start,
+                    days=args.days,
+                    seed=args.seed,
+                    batch_size=args.batch_size,
+                ),
+                append=args.append,
+            )
+        else:
+            seed_database()
         print("Database seeding completed successfully!")
     except Exception as e:
         print(f"Error during seeding process: {e}")
@@ -0,0 +1,460 @@
+"""Deterministic, production-scale synthetic transactions for seeding.
+
+Rows are generated in NumPy batches from a seeded generator and loaded with
+``COPY`` on PostgreSQL. The data follows the patterns the reports and the
+agent care about:
+
+* recurring income and bills: a monthly salary per user on their payday
+  (mostly the 25th), yearly raises, THR two weeks before Lebaran, and
+  monthly rent for most users;
+* day-to-day spending over Indonesian categories and merchants, denser
+  right after paydays, on weekends, during Ramadan and the Lebaran week, in
+  late December and in the July school season;
+* occasional side income.
+
+``transactions_table`` has no user column, so users only shape the data:
+each has their own payday, salary, rent and spending level.
+
+Requires ``numpy`` (``pip install .[seed]``).
+"""
+
+import csv
+import io
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Connection
+
+from .bulk import bulk_insert_transactions, copy_csv
+
+# category: (share of spending rows, median amount in IDR, log-normal sigma,
+# descriptions)
+EXPENSE_CATEGORIES: dict[str, tuple[float, int, float, tuple[str, ...]]] = {
+    "Makanan": (
+        0.26,
+        60_000,
+        0.7,
+        (
+            "Belanja Groceries",
+            "Belanja Sayur di Pasar",
+            "Indomaret",
+            "Alfamart",
+            "Superindo",
+            "Beli Beras 5kg",
+            "Telur dan Minyak Goreng",
+        ),
+    ),
+    "Makan Luar": (
+        0.22,
+        35_000,
+        0.6,
+        (
+            "Makan di Warteg",
+            "Nasi Padang",
+            "GoFood",
+            "GrabFood",
+            "Kopi Kenangan",
+            "Bakso",
+            "Sate Ayam",
+            "Mie Ayam",
+        ),
+    ),
+    "Transportasi": (
+        0.16,
+        25_000,
+        0.8,
+        (
+            "Bensin Motor",
+            "Gojek",
+            "Grab",
+            "KRL Commuter Line",
+            "TransJakarta",
+            "Parkir",
+            "Bayar Tol",
+        ),
+    ),
+    "Belanja": (
+        0.08,
+        150_000,
+        0.9,
+        ("Shopee", "Tokopedia", "Baju di Mall", "Perlengkapan Rumah"),
+    ),
+    "Hiburan": (
+        0.07,
+        75_000,
+        0.7,
+        (
+            "Langganan Netflix",
+            "Nonton Bioskop",
+            "Spotify Premium",
+            "Karaoke",
+            "Top Up Game",
+        ),
+    ),
+    "Utilitas": (
+        0.06,
+        300_000,
+        0.5,
+        (
+            "Tagihan Listrik PLN",
+            "Token Listrik",
+            "Tagihan PDAM",
+            "IndiHome",
+            "Iuran Sampah",
+        ),
+    ),
+    "Pulsa & Internet": (
+        0.06,
+        50_000,
+        0.5,
+        ("Isi Pulsa Telkomsel", "Paket Data XL", "Paket Data Indosat"),
+    ),
+    "Kesehatan": (
+        0.04,
+        120_000,
+        0.9,
+        ("Apotek K-24", "Iuran BPJS Kesehatan", "Periksa ke Klinik", "Vitamin"),
+    ),
+    "Pendidikan": (0.02, 250_000, 0.9, ("Buku", "Kursus Online", "SPP Sekolah")),
+    "Donasi": (0.03, 50_000, 0.8, ("Infaq Masjid", "Sedekah", "Kondangan", "Zakat")),
+}
+WEEKEND_BOOST = {"Makan Luar": 1.5, "Hiburan": 1.8, "Belanja": 1.4}
+
+SIDE_INCOME_SHARE = 0.03
+SIDE_INCOME_MEDIAN = 1_500_000
+SIDE_INCOME_DESCRIPTIONS = (
+    "Freelance Design",
+    "Jualan Online",
+    "Ojek Online",
+    "Les Privat",
+)
+
+PAYDAYS = (25, 1, 28)
+PAYDAY_SHARES = (0.6, 0.3, 0.1)
+SALARY_MEDIAN = 6_500_000
+YEARLY_RAISE = 0.05
+RENT_SHARE = 0.7
+RENT_MEDIAN = 1_500_000
+RENT_DAY = 5
+RENT_DESCRIPTIONS = ("Sewa Kost", "Sewa Kontrakan", "Cicilan KPR")
+THR_DAYS_BEFORE_LEBARAN = 14
+
+# Idul Fitri (1 Syawal) as set by the Indonesian government.
+LEBARAN = (
+    "2020-05-24",
+    "2021-05-13",
+    "2022-05-02",
+    "2023-04-22",
+    "2024-04-10",
+    "2025-03-31",
+    "2026-03-20",
+    "2027-03-10",
+    "2028-02-27",
+)
+
+# Relative activity per hour of day: breakfast, lunch and evening peaks.
+HOUR_WEIGHTS = np.array(
+    [1, 1, 1, 1, 1, 2, 4, 8, 8, 6, 6, 8, 12, 11, 7, 6, 7, 9, 12, 12, 10, 7, 4, 2],
+    dtype=float,
+)
+
+
+@dataclass
+class SyntheticConfig:
+    """What to generate; the same config always yields the same rows.
+
+    Attributes:
+        rows: Total number of transactions.
+        users: Number of simulated users (payday, salary, rent, spending).
+        start: First day of the generated period.
+        days: Length of the period in days.
+        seed: Seed of the random generator.
+        batch_size: Rows per generated (and loaded) batch.
+    """
+
+    rows: int
+    users: int = 100
+    start: date = date(2023, 1, 1)
+    days: int = 3 * 365
+    seed: int = 0
+    batch_size: int = 100_000
+
+
+@dataclass
+class Batch:
+    """Transactions as columns; ``date`` is ``datetime64[s]``."""
+
+    type: np.ndarray
+    amount: np.ndarray
+    description: np.ndarray
+    category: np.ndarray
+    date: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def __getitem__(self, index: slice | np.ndarray) -> "Batch":
+        return Batch(
+            self.type[index],
+            self.amount[index],
+            self.description[index],
+            self.category[index],
+            self.date[index],
+        )
+
+    def rows(self) -> list[dict[str, Any]]:
+        """Rows in the format of ``bulk_insert_transactions``."""
+        return [
+            {
+                "type": type_,
+                "amount": amount,
+                "description": description,
+                "category": category,
+                "date": when,
+            }
+            for type_, amount, description, category, when in zip(
+                self.type.tolist(),
+                self.amount.tolist(),
+                self.description.tolist(),
+                self.category.tolist(),
+                self.date.astype("datetime64[us]").tolist(),
+            )
+        ]
+
+    def to_csv(self) -> io.StringIO:
+        """CSV in ``bulk.COPY_COLUMNS`` order, ready for ``copy_csv``."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            zip(
+                self.type.tolist(),
+                self.amount.tolist(),
+                self.description.tolist(),
+                self.category.tolist(),
+                np.datetime_as_string(self.date, unit="s").tolist(),
+            )
+        )
+        buffer.seek(0)
+        return buffer
+
+
+def _concat(batches: list[Batch]) -> Batch:
+    return Batch(
+        *(
+            np.concatenate([getattr(batch, column) for batch in batches])
+            for column in ("type", "amount", "description", "category", "date")
+        )
+    )
+
+
+def _round_amounts(amounts: np.ndarray) -> np.ndarray:
+    return np.maximum(500, np.round(amounts / 500) * 500).astype(np.int64)
+
+
+class _Calendar:
+    """Per-day weekday, seasonal factor and spending probability of the period."""
+
+    def __init__(self, start: date, days: int):
+        self.dates = np.arange(
+            np.datetime64(start, "D"), np.datetime64(start, "D") + days
+        )
+        months = self.dates.astype("datetime64[M]")
+        day_of_month = (self.dates - months).astype(int) + 1
+        month = months.astype(int) % 12 + 1
+        # 1970-01-01 was a Thursday; 0 is Monday.
+        self.weekday = (self.dates.astype(int) + 3) % 7
+
+        self.season = np.ones(days)
+        for lebaran in LEBARAN:
+            offset = (self.dates - np.datetime64(lebaran)).astype(int)
+            self.season[(offset >= -30) & (offset < -3)] *= 1.25  # Ramadan
+            self.season[(offset >= -3) & (offset <= 3)] *= 1.7  # mudik, Lebaran
+        self.season[(month == 12) & (day_of_month >= 15)] *= 1.3
+        self.season[month == 7] *= 1.15  # new school year
+
+        # Spending peaks right after the most common payday and thins out
+        # towards the end of the month.
+        since_payday = np.where(day_of_month >= 25, day_of_month - 25, day_of_month + 5)
+        cycle = 1 + 0.8 * np.exp(-since_payday / 6)
+        weights = self.season * cycle * np.where(self.weekday >= 5, 1.15, 1.0)
+        self.probability = weights / weights.sum()
+
+
+class _Users:
+    def __init__(self, rng: np.random.Generator, count: int):
+        self.payday = rng.choice(PAYDAYS, size=count, p=PAYDAY_SHARES)
+        self.salary = _round_amounts(SALARY_MEDIAN * rng.lognormal(0, 0.45, count))
+        self.rent = np.where(
+            rng.random(count) < RENT_SHARE,
+            _round_amounts(RENT_MEDIAN * rng.lognormal(0, 0.4, count)),
+            0,
+        )
+        self.rent_description = rng.integers(len(RENT_DESCRIPTIONS), size=count)
+        # Heavier spenders both spend more often and spend more.
+        activity = rng.lognormal(0, 0.5, count)
+        self.probability = activity / activity.sum()
+        self.spending_scale = np.sqrt(self.salary / SALARY_MEDIAN)
+
+
+def _recurring(config: SyntheticConfig, users: _Users) -> Batch:
+    start = np.datetime64(config.start, "D")
+    end = start + config.days
+    months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+    user_ids = np.arange(config.users)
+    grid_user = np.repeat(user_ids, len(months))
+    grid_month = np.tile(months, config.users)
+    years = (grid_month - months[0]).astype(int) // 12
+
+    parts = []
+
+    def add(type_, amount, description, category, when, keep=None):
+        keep = (when >= start) & (when < end) & (True if keep is None else keep)
+        count = int(keep.sum())
+        parts.append(
+            Batch(
+                np.full(count, type_, dtype=object),
+                amount[keep].astype(np.int64),
+                (
+                    np.asarray(description, dtype=object)[keep]
+                    if np.ndim(description)
+                    else np.full(count, description, dtype=object)
+                ),
+                np.full(count, category, dtype=object),
+                when[keep].astype("datetime64[s]") + 9 * 3600,
+            )
+        )
+
+    salary = _round_amounts(users.salary[grid_user] * (1 + YEARLY_RAISE) ** years)
+    payday = grid_month.astype("datetime64[D]") + users.payday[grid_user] - 1
+    add("income", salary, "Gaji Bulanan", "Gaji", payday)
+
+    rent_day = grid_month.astype("datetime64[D]") + RENT_DAY - 1
+    rent_description = np.array(RENT_DESCRIPTIONS, dtype=object)[
+        users.rent_description[grid_user]
+    ]
+    add(
+        "expense",
+        users.rent[grid_user],
+        rent_description,
+        "Tempat Tinggal",
+        rent_day,
+        keep=users.rent[grid_user] > 0,
+    )
+
+    for lebaran in LEBARAN:
+        thr_day = np.full(
+            config.users, np.datetime64(lebaran) - THR_DAYS_BEFORE_LEBARAN
+        )
+        years = (thr_day[0].astype("datetime64[M]") - months[0]).astype(int) // 12
+        add(
+            "income",
+            _round_amounts(users.salary * (1 + YEARLY_RAISE) ** years),
+            "THR Lebaran",
+            "Bonus",
+            thr_day,
+        )
+    return _concat(parts)
+
+
+class _SpendingModel:
+    def __init__(self, calendar: _Calendar, users: _Users):
+        self.calendar = calendar
+        self.users = users
+        names = list(EXPENSE_CATEGORIES)
+        self.categories = np.array(names, dtype=object)
+        shares = np.array([EXPENSE_CATEGORIES[name][0] for name in names])
+        self.median = np.array([EXPENSE_CATEGORIES[name][1] for name in names])
+        self.sigma = np.array([EXPENSE_CATEGORIES[name][2] for name in names])
+
+        # Cumulative category shares for each weekday.
+        boost = np.array([WEEKEND_BOOST.get(name, 1.0) for name in names])
+        by_weekday = np.array(
+            [shares * (boost if weekday >= 5 else 1.0) for weekday in range(7)]
+        )
+        self.cumulative = np.cumsum(
+            by_weekday / by_weekday.sum(axis=1, keepdims=True), axis=1
+        )
+        self.cumulative[:, -1] = 1.0
+
+        descriptions = [EXPENSE_CATEGORIES[name][3] for name in names]
+        self.description_count = np.array([len(d) for d in descriptions])
+        self.description_offset = np.concatenate(
+            ([0], np.cumsum(self.description_count)[:-1])
+        )
+        self.descriptions = np.array(
+            [d for group in descriptions for d in group], dtype=object
+        )
+        self.hour_probability = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+
+    def generate(self, rng: np.random.Generator, size: int) -> Batch:
+        calendar = self.calendar
+        day = rng.choice(len(calendar.dates), size=size, p=calendar.probability)
+        user = rng.choice(len(self.users.salary), size=size, p=self.users.probability)
+        category = (
+            rng.random(size)[:, None] > self.cumulative[calendar.weekday[day]]
+        ).sum(axis=1)
+
+        amount = (
+            self.median[category]
+            * np.exp(self.sigma[category] * rng.standard_normal(size))
+            * np.sqrt(calendar.season[day])
+            * self.users.spending_scale[user]
+        )
+        description = self.descriptions[
+            self.description_offset[category]
+            + (rng.random(size) * self.description_count[category]).astype(int)
+        ]
+        categories = self.categories[category]
+        types = np.full(size, "expense", dtype=object)
+
+        side = rng.random(size) < SIDE_INCOME_SHARE
+        side_count = int(side.sum())
+        types[side] = "income"
+        categories[side] = "Sampingan"
+        amount[side] = SIDE_INCOME_MEDIAN * rng.lognormal(0, 0.6, side_count)
+        description[side] = np.array(SIDE_INCOME_DESCRIPTIONS, dtype=object)[
+            rng.integers(len(SIDE_INCOME_DESCRIPTIONS), size=side_count)
+        ]
+
+        seconds = rng.choice(24, size=size, p=self.hour_probability) * 3600
+        seconds += rng.integers(3600, size=size)
+        when = calendar.dates[day].astype("datetime64[s]") + seconds
+        return Batch(types, _round_amounts(amount), description, categories, when)
+
+
+def generate_batches(config: SyntheticConfig) -> Iterator[Batch]:
+    """Yield ``config.rows`` transactions in batches of ``config.batch_size``.
+
+    Recurring rows (salaries, rent, THR) come first, then day-to-day
+    spending; if the recurring rows alone exceed ``config.rows`` a
+    deterministic sample of them is returned.
+    """
+    rng = np.random.default_rng(config.seed)
+    calendar = _Calendar(config.start, config.days)
+    users = _Users(rng, config.users)
+
+    recurring = _recurring(config, users)
+    if len(recurring) > config.rows:
+        recurring = recurring[np.sort(rng.permutation(len(recurring))[: config.rows])]
+    for start in range(0, len(recurring), config.batch_size):
+        yield recurring[start : start + config.batch_size]
+
+    model = _SpendingModel(calendar, users)
+    remaining = config.rows - len(recurring)
+    while remaining > 0:
+        size = min(config.batch_size, remaining)
+        yield model.generate(rng, size)
+        remaining -= size
+
+
+def load_batch(connection: Connection, batch: Batch) -> int:
+    """Insert ``batch`` in the caller's transaction; ``COPY`` on psycopg2."""
+    if (
+        connection.dialect.name == "postgresql"
+        and connection.dialect.driver == "psycopg2"
+    ):
+        copy_csv(connection, batch.to_csv())
+        return len(batch)
+    return bulk_insert_transactions(connection, batch.rows())
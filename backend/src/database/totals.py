@@ -0,0 +1,159 @@
+"""Triggers that keep ``transaction_totals`` and ``transaction_monthly_totals``
+in sync with ``transactions_table``.
+
+Every write path (the API, bulk COPY loads and SQL issued by the agent) goes
+through these triggers, so balance reads only touch the aggregate tables. The
+PostgreSQL statements mirror ``init-scripts/02-create-transaction-totals.sql``.
+
+The same triggers count writes in ``transaction_data_version``, including
+writes from outside the app (psql, seeds, other processes); the response
+cache keys on that counter (see ``src.cache``).
+"""
+
+from sqlalchemy import DDL, MetaData, event
+
+# For writes the triggers do not see, such as detaching a partition.
+BUMP_DATA_VERSION = """
+INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+ON CONFLICT (id) DO UPDATE SET version = v.version + 1
+"""
+
+POSTGRES_DDL = [
+    """
+CREATE OR REPLACE FUNCTION apply_transaction_totals() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO transaction_totals AS t (type, total, count)
+        SELECT type, -SUM(amount), -COUNT(*) FROM old_rows GROUP BY type
+        ON CONFLICT (type) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+
+        INSERT INTO transaction_monthly_totals AS t (type, category, month, total, count)
+        SELECT type, category, date_trunc('month', date)::date, -SUM(amount), -COUNT(*)
+        FROM old_rows GROUP BY 1, 2, 3
+        ON CONFLICT (type, category, month) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO transaction_totals AS t (type, total, count)
+        SELECT type, SUM(amount), COUNT(*) FROM new_rows GROUP BY type
+        ON CONFLICT (type) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+
+        INSERT INTO transaction_monthly_totals AS t (type, category, month, total, count)
+        SELECT type, category, date_trunc('month', date)::date, SUM(amount), COUNT(*)
+        FROM new_rows GROUP BY 1, 2, 3
+        ON CONFLICT (type, category, month) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM transaction_monthly_totals WHERE count = 0;
+    END IF;
+
+    INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION reset_transaction_totals() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM transaction_totals;
+    DELETE FROM transaction_monthly_totals;
+    INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE TRIGGER transactions_totals_insert
+AFTER INSERT ON transactions_table
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals()
+""",
+    """
+CREATE OR REPLACE TRIGGER transactions_totals_update
+AFTER UPDATE ON transactions_table
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals()
+""",
+    """
+CREATE OR REPLACE TRIGGER transactions_totals_delete
+AFTER DELETE ON transactions_table
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals()
+""",
+    """
+CREATE OR REPLACE TRIGGER transactions_totals_truncate
+AFTER TRUNCATE ON transactions_table
+FOR EACH STATEMENT EXECUTE FUNCTION reset_transaction_totals()
+""",
+]
+
+# SQLite has no statement-level triggers or transition tables, so the test
+# engine maintains the same tables row by row.
+_SQLITE_APPLY = """
+    INSERT INTO transaction_totals (type, total, count)
+    VALUES ({row}.type, {sign}{row}.amount, {sign}1)
+    ON CONFLICT (type) DO UPDATE
+    SET total = total + excluded.total, count = count + excluded.count;
+
+    INSERT INTO transaction_monthly_totals (type, category, month, total, count)
+    VALUES (
+        {row}.type, {row}.category, strftime('%%Y-%%m-01', {row}.date),
+        {sign}{row}.amount, {sign}1
+    )
+    ON CONFLICT (type, category, month) DO UPDATE
+    SET total = total + excluded.total, count = count + excluded.count;
+"""
+
+_SQLITE_BUMP_VERSION = """
+    INSERT INTO transaction_data_version (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = version + 1;
+"""
+
+SQLITE_DDL = [
+    f"""
+CREATE TRIGGER IF NOT EXISTS transactions_totals_insert
+AFTER INSERT ON transactions_table
+BEGIN
+{_SQLITE_APPLY.format(row="NEW", sign="")}
+{_SQLITE_BUMP_VERSION}
+END
+""",
+    f"""
+CREATE TRIGGER IF NOT EXISTS transactions_totals_update
+AFTER UPDATE ON transactions_table
+BEGIN
+{_SQLITE_APPLY.format(row="OLD", sign="-")}
+{_SQLITE_APPLY.format(row="NEW", sign="")}
+    DELETE FROM transaction_monthly_totals WHERE count = 0;
+{_SQLITE_BUMP_VERSION}
+END
+""",
+    f"""
+CREATE TRIGGER IF NOT EXISTS transactions_totals_delete
+AFTER DELETE ON transactions_table
+BEGIN
+{_SQLITE_APPLY.format(row="OLD", sign="-")}
+    DELETE FROM transaction_monthly_totals WHERE count = 0;
+{_SQLITE_BUMP_VERSION}
+END
+""",
+]
+
+
+def install_totals_triggers(metadata: MetaData) -> None:
+    """Create the totals triggers whenever ``metadata.create_all`` runs."""
+    for statement in POSTGRES_DDL:
+        event.listen(
+            metadata, "after_create", DDL(statement).execute_if(dialect="postgresql")
+        )
+    for statement in SQLITE_DDL:
+        event.listen(
+            metadata, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
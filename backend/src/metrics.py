@@ -0,0 +1,285 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Served by ``GET /metrics``. Every worker process keeps its own registry, and
+with several workers each scrape is answered by whichever worker accepts it.
+Samples therefore carry a ``worker`` label (the process id): every series
+belongs to one process, so its counters never go backwards, and ``rate()``
+per series and ``sum by`` over ``worker`` stay meaningful. A scrape still
+only sees one worker, so for complete numbers run one worker per container
+or port (``WEB_CONCURRENCY=1``, scaled out with replicas) and scrape each.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.database.config import log_slow_query
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Labels = tuple[tuple[str, str], ...]
+Sample = tuple[str, Labels, float]
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = buckets
+        # labels -> [count per bucket (last one is +Inf), sum]
+        self._values: dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += count
+                    samples.append(
+                        (f"{self.name}_bucket", key + (("le", str(bound)),), cumulative)
+                    )
+                samples.append((f"{self.name}_count", key, cumulative))
+                samples.append((f"{self.name}_sum", key, total))
+        return samples
+
+
+class GaugeCallback(_Metric):
+    """Gauge whose samples are read from ``collect()`` at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._collectors: dict[str, Callable[[], Iterable[tuple[dict, float]]]] = {}
+
+    def set(self, key: str, collect: Callable[[], Iterable[tuple[dict, float]]]):
+        """Register ``collect`` under ``key``, replacing any earlier one."""
+        with self._lock:
+            self._collectors[key] = collect
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            collectors = list(self._collectors.values())
+        return [
+            (self.name, _labels(labels), value)
+            for collect in collectors
+            for labels, value in collect()
+        ]
+
+
+class Registry:
+    def __init__(self, label_worker: bool = False):
+        self._metrics: dict[str, _Metric] = {}
+        self.label_worker = label_worker
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        # Read at render time: a worker forked after import has its own pid.
+        worker = (("worker", str(os.getpid())),) if self.label_worker else ()
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(worker + labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(label_worker=True)
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time until the response headers were sent, by route.",
+    )
+)
+DB_QUERY_DURATION = REGISTRY.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Statements executed through SQLAlchemy, by engine.",
+    )
+)
+DB_QUERY_ERRORS = REGISTRY.register(
+    Counter("db_query_errors_total", "Statements that raised, by engine.")
+)
+DB_POOL_CHECKED_OUT = REGISTRY.register(
+    GaugeCallback("db_pool_checked_out", "Connections currently in use, by engine.")
+)
+DB_POOL_CAPACITY = REGISTRY.register(
+    GaugeCallback("db_pool_capacity", "pool_size + max_overflow of the engine's pool.")
+)
+AGENT_SQL_DURATION = REGISTRY.register(
+    Histogram(
+        "agent_sql_duration_seconds",
+        "psycopg2 round-trips of the agent SQL tools, by statement kind.",
+    )
+)
+AGENT_TOOL_DURATION = REGISTRY.register(
+    Histogram("agent_tool_duration_seconds", "Agent tool run time, by tool.")
+)
+AGENT_TOOL_WAIT = REGISTRY.register(
+    Histogram(
+        "agent_tool_wait_seconds", "Time tool calls waited for a concurrency slot."
+    )
+)
+AGENT_TOOL_ERRORS = REGISTRY.register(
+    Counter("agent_tool_errors_total", "Agent tool calls that raised, by tool.")
+)
+LLM_CALL_DURATION = REGISTRY.register(
+    Histogram("llm_call_duration_seconds", "Model calls, request to final response.")
+)
+LLM_TOKENS = REGISTRY.register(
+    Counter("llm_tokens_total", "Tokens reported by the model, by kind.")
+)
+AGENT_TURN_DURATION = REGISTRY.register(
+    Histogram("agent_turn_duration_seconds", "Whole /run turns, by mode.")
+)
+AGENT_TURN_TOKENS = REGISTRY.register(
+    Histogram(
+        "agent_turn_tokens",
+        "Prompt plus completion tokens of all model calls in a /run turn.",
+        buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+    )
+)
+AGENT_TURN_CACHED_RATIO = REGISTRY.register(
+    Histogram(
+        "agent_turn_cached_token_ratio",
+        "Share of a /run turn's prompt tokens served from the provider's cache.",
+        buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+    )
+)
+AGENT_ANSWER_CACHE = REGISTRY.register(
+    Counter(
+        "agent_answer_cache_total",
+        "/run messages seen by the answer cache, by result "
+        "(hit, miss, bypass, unmatched).",
+    )
+)
+AGENT_INTENT_ROUTER = REGISTRY.register(
+    Counter(
+        "agent_intent_router_total",
+        "/run messages seen by the transaction parser, by result "
+        "(routed, unmatched, error).",
+    )
+)
+SSE_FIRST_FRAME = REGISTRY.register(
+    Histogram(
+        "sse_time_to_first_frame_seconds",
+        "Time from a streaming /run request to its first SSE frame.",
+    )
+)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Record statement timings and pool usage of ``engine`` under ``name``.
+
+    Statements slower than ``DB_SLOW_QUERY_MS`` are also logged (see
+    ``src.database.config.log_slow_query``).
+
+    Pass ``AsyncEngine.sync_engine`` for async engines.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_DURATION.observe(elapsed, engine=name)
+        log_slow_query(name, statement, elapsed, rows=cursor.rowcount, many=many)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None:
+            stack = context.connection.info.get("query_started")
+            if stack:
+                stack.pop()
+        DB_QUERY_ERRORS.inc(engine=name)
+
+    pool = engine.pool
+    if hasattr(pool, "size") and hasattr(pool, "_max_overflow"):
+        DB_POOL_CHECKED_OUT.set(name, lambda: [({"engine": name}, pool.checkedout())])
+        DB_POOL_CAPACITY.set(
+            name,
+            lambda: [({"engine": name}, pool.size() + max(pool._max_overflow, 0))],
+        )
@@ -1,23 +1,46 @@
+import enum
 import os
-from typing import List, Union
+import time
+from functools import lru_cache
+from typing import List, Optional, Union
 
 from dotenv import load_dotenv
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Header, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.cli.utils.common import BaseModel
 from google.adk.events import Event
 from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions import Session
 from google.genai import types
 
-from agent.agent import get_agent
+from agent.agent import DEFAULT_MODEL, get_agent
+from agent.router import append_turn, route_message
+from agent.sessions import (
+    CompactingSessionService,
+    decode_position,
+    encode_position,
+    session_title,
+)
+from src.metrics import (
+    AGENT_TURN_CACHED_RATIO,
+    AGENT_TURN_DURATION,
+    AGENT_TURN_TOKENS,
+    SSE_FIRST_FRAME,
+)
+from src.routes.transaction import NEXT_CURSOR_HEADER
+from src.streams import SSE_HEADERS, ReplayStream, StreamRegistry
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 APP_NAME = os.getenv("APP_NAME")
 print(DATABASE_URL)
 
+DEFAULT_SESSIONS_PAGE_SIZE = 50
+MAX_SESSIONS_PAGE_SIZE = 200
+DEFAULT_HISTORY_PAGE_SIZE = 100
+MAX_HISTORY_PAGE_SIZE = 500
+
 
 class AgentRunRequest(BaseModel):
     session_id: str
@@ -25,17 +48,89 @@ class AgentRunRequest(BaseModel):
     streaming: bool = True
 
 
+class SessionView(str, enum.Enum):
+    full = "full"
+    summary = "summary"
+
+
+class SessionSummary(BaseModel):
+    id: str
+    last_update_time: float
+    title: Optional[str] = None
+
+
 router = APIRouter()
-session_service = DatabaseSessionService(db_url=DATABASE_URL)
+streams = StreamRegistry()
+
+
+def _record_turn(events: List[Event], started: float, mode: str) -> None:
+    AGENT_TURN_DURATION.observe(time.perf_counter() - started, mode=mode)
+    usages = [
+        event.usage_metadata
+        for event in events
+        if event.usage_metadata and not event.partial
+    ]
+    prompt = sum(usage.prompt_token_count or 0 for usage in usages)
+    completion = sum(usage.candidates_token_count or 0 for usage in usages)
+    cached = sum(usage.cached_content_token_count or 0 for usage in usages)
+    if prompt + completion:
+        AGENT_TURN_TOKENS.observe(prompt + completion)
+    if prompt:
+        AGENT_TURN_CACHED_RATIO.observe(cached / prompt)
+
+
+@lru_cache(maxsize=None)
+def get_session_service() -> CompactingSessionService:
+    """Return this process's session service, created on first use.
+
+    It connects to the database when created, so it is built lazily (by the
+    app's lifespan) rather than at import time, which would happen before a
+    server forks its workers.
+    """
+    return CompactingSessionService(db_url=DATABASE_URL)
+
+
+def get_runner(model: str = DEFAULT_MODEL) -> Runner:
+    """Return the long-lived runner for ``model``; runners hold no per-turn state."""
+    return _build_runner(model)
+
+
+@lru_cache(maxsize=None)
+def _build_runner(model: str) -> Runner:
+    return Runner(
+        app_name=APP_NAME,
+        agent=get_agent(model),
+        session_service=get_session_service(),
+    )
 
 
 @router.post("/run", response_model=None)
-async def agent_run(req: AgentRunRequest) -> Union[StreamingResponse, List[Event]]:
-    root_agent = get_agent()
+async def agent_run(
+    req: AgentRunRequest,
+    background_tasks: BackgroundTasks,
+    last_event_id: Optional[str] = Header(None),
+) -> Union[StreamingResponse, List[Event], Response]:
+    """Run one agent turn.
+
+    Streaming turns run in the background and are sent as SSE frames with
+    ``id:`` fields. Re-sending the request with ``Last-Event-ID`` resumes
+    the same turn from that frame instead of running the agent again; 204
+    means there is no such turn left to resume.
+    """
+    started = time.perf_counter()
     user_id = "1"
-    runner = Runner(
-        app_name=APP_NAME, agent=root_agent, session_service=session_service
-    )
+    runner = get_runner()
+
+    if req.streaming and last_event_id:
+        stream = streams.get(req.session_id)
+        position = stream.position(last_event_id) if stream else None
+        if position is None:
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+        return StreamingResponse(
+            stream.subscribe(after=position),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
 
     session = await runner.session_service.get_session(
         app_name=APP_NAME, user_id=user_id, session_id=req.session_id
@@ -43,25 +138,73 @@ async def agent_run(req: AgentRunRequest) -> Union[StreamingResponse, List[Event
 
     if not session:
         session = await runner.session_service.create_session(
-            app_name=APP_NAME, user_id=user_id, session_id=req.session_id
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=req.session_id,
+            state={"title": session_title(req.new_message)},
+        )
+
+    # Simple requests are answered without the model (see agent.router).
+    turn = await route_message(req.new_message)
+    if turn is not None:
+        events = await append_turn(
+            runner.session_service,
+            session,
+            req.new_message,
+            turn,
+            author=runner.agent.name,
+        )
+        _record_turn(events, started, mode="routed")
+        background_tasks.add_task(
+            runner.session_service.compact_session,
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=req.session_id,
+        )
+        if not req.streaming:
+            return events
+
+        async def replay(stream: ReplayStream):
+            SSE_FIRST_FRAME.observe(time.perf_counter() - started)
+            for event in events:
+                await stream.publish(
+                    event.model_dump_json(exclude_none=True, by_alias=True)
+                )
+
+        stream = streams.start(req.session_id, replay)
+        return StreamingResponse(
+            stream.subscribe(),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
         )
 
     if req.streaming:
         config = RunConfig(streaming_mode=StreamingMode.SSE)
 
-        async def event_generator():
+        async def produce(stream: ReplayStream):
+            events = []
             async for event in runner.run_async(
                 user_id=user_id,
                 session_id=req.session_id,
                 new_message=req.new_message,
                 run_config=config,
             ):
+                if not events:
+                    SSE_FIRST_FRAME.observe(time.perf_counter() - started)
+                events.append(event)
                 sse_event = event.model_dump_json(exclude_none=True, by_alias=True)
-                yield f"data: {sse_event}\n\n"
+                await stream.publish(sse_event)
+            _record_turn(events, started, mode="stream")
+            # The turn outlives its connection, so compact only once it is done.
+            await runner.session_service.compact_session(
+                app_name=APP_NAME, user_id=user_id, session_id=req.session_id
+            )
 
+        stream = streams.start(req.session_id, produce)
         return StreamingResponse(
-            event_generator(),
+            stream.subscribe(),
             media_type="text/event-stream",
+            headers=SSE_HEADERS,
         )
 
     else:
@@ -74,28 +217,90 @@ async def agent_run(req: AgentRunRequest) -> Union[StreamingResponse, List[Event
                 new_message=req.new_message,
             )
         ]
+        _record_turn(events, started, mode="batch")
 
+        # Runs after the response is sent, so compaction never delays a turn.
+        background_tasks.add_task(
+            runner.session_service.compact_session,
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=req.session_id,
+        )
         return events
 
 
-@router.get("/sessions")
-async def get_sessions() -> List[Session]:
+@router.get("/sessions", response_model=Union[List[SessionSummary], List[Session]])
+def get_sessions(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_SESSIONS_PAGE_SIZE, ge=1, le=MAX_SESSIONS_PAGE_SIZE),
+    view: SessionView = SessionView.full,
+):
+    """List sessions, most recently updated first, without their events.
+
+    A plain ``def``: the session store is read synchronously, so FastAPI
+    runs this in its threadpool rather than on the event loop.
+
+    ``view=summary`` returns only ``id``, ``lastUpdateTime`` and ``title``.
+    When more sessions exist the next page's cursor is returned in the
+    ``X-Next-Cursor`` header; pass it back as ``cursor``.
+    """
     user_id = "1"
-    list_sessions_response = await session_service.list_sessions(
-        app_name=APP_NAME, user_id=user_id
+    try:
+        before = decode_position(cursor) if cursor else None
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST, content={"message": str(e)}
+        )
+
+    summaries, next_position = get_session_service().list_session_summaries(
+        app_name=APP_NAME, user_id=user_id, limit=limit, before=before
     )
+    if next_position:
+        response.headers[NEXT_CURSOR_HEADER] = encode_position(next_position)
 
-    return list_sessions_response.sessions
+    if view == SessionView.summary:
+        return [SessionSummary(**summary) for summary in summaries]
+    return [
+        Session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            id=summary["id"],
+            last_update_time=summary["last_update_time"],
+        )
+        for summary in summaries
+    ]
 
 
 @router.get("/session/{session_id}", response_model=List[Event])
-async def get_session(session_id: str) -> List[Event]:
-    user_id = "1"
-    session = await session_service.get_session(
-        app_name=APP_NAME, user_id=user_id, session_id=session_id
-    )
+def get_session(
+    session_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(DEFAULT_HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+):
+    """Return the latest ``limit`` events of a session, oldest first.
 
-    if not session:
-        return []
+    To scroll back, pass the ``X-Next-Cursor`` header of a page as
+    ``before``; the header is absent once the first event is reached.
+    Events archived by compaction are included. Like ``get_sessions`` this
+    runs in the threadpool, since the history is read synchronously.
+    """
+    user_id = "1"
+    try:
+        position = decode_position(before) if before else None
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST, content={"message": str(e)}
+        )
 
-    return session.events
+    events, next_position = get_session_service().list_history(
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+        limit=limit,
+        before=position,
+    )
+    if next_position:
+        response.headers[NEXT_CURSOR_HEADER] = encode_position(next_position)
+    return events
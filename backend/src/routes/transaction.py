@@ -1,14 +1,46 @@
-from datetime import datetime
+import base64
+import binascii
+import csv
+import enum
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError, field_validator
+from sqlalchemy import Date, Select, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from src.database.models import Transaction, get_db
+from src.cache import bump_data_version_async, cached_response
+from src.database.bulk import bulk_insert_transactions
+from src.database.models import (
+    Transaction,
+    TransactionTotal,
+    TransactionType,
+    data_version,
+    get_async_db,
+)
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# WIB, the zone of agent.prompt.TIMEZONE, in which dates are stored.
+TIMEZONE = timezone(timedelta(hours=7))
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.type,
+    Transaction.amount,
+    Transaction.description,
+    Transaction.category,
+    Transaction.date,
+    Transaction.created_at,
+)
+
 
 class TransactionCreate(BaseModel):
     type: str
@@ -17,6 +49,18 @@ class TransactionCreate(BaseModel):
     category: str
     date: datetime
 
+    @field_validator("date")
+    @classmethod
+    def naive_wib(cls, value: datetime) -> datetime:
+        """Convert a date with an offset to naive WIB.
+
+        The column is ``TIMESTAMP WITHOUT TIME ZONE`` and asyncpg refuses
+        aware datetimes for it.
+        """
+        if value.tzinfo is not None:
+            value = value.astimezone(TIMEZONE).replace(tzinfo=None)
+        return value
+
 
 class TransactionResponse(BaseModel):
     id: int
@@ -28,17 +72,223 @@ class TransactionResponse(BaseModel):
     created_at: datetime
 
 
+class BulkRowError(BaseModel):
+    index: int
+    errors: list[str]
+
+
+class BulkCreateResponse(BaseModel):
+    inserted: int
+    errors: list[BulkRowError]
+
+
+class CategoryReport(BaseModel):
+    category: str
+    type: TransactionType
+    total: int
+    count: int
+
+
+class PeriodReport(BaseModel):
+    period: date
+    type: TransactionType
+    total: int
+    count: int
+
+
+class TypeReport(BaseModel):
+    type: TransactionType
+    total: int
+    count: int
+
+
+TRANSACTION_LIST = TypeAdapter(list[TransactionResponse])
+CATEGORY_REPORTS = TypeAdapter(list[CategoryReport])
+PERIOD_REPORTS = TypeAdapter(list[PeriodReport])
+TYPE_REPORTS = TypeAdapter(list[TypeReport])
+
+
+class Granularity(str, enum.Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class TransactionFilter(BaseModel):
+    """Server-side filters shared by the transaction read endpoints.
+
+    Date bounds are half-open: ``start_date <= date < end_date``. Filtering on
+    ``type`` or ``category`` together with the ``date DESC`` ordering lets
+    PostgreSQL walk ``idx_transactions_type_date`` /
+    ``idx_transactions_category_date`` instead of sorting the table.
+    """
+
+    type: TransactionType | None = None
+    category: str | None = None
+    start_date: datetime | None = None
+    end_date: datetime | None = None
+    min_amount: int | None = None
+    max_amount: int | None = None
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.type is not None:
+            clauses.append(Transaction.type == self.type)
+        if self.category is not None:
+            clauses.append(Transaction.category == self.category)
+        if self.start_date is not None:
+            clauses.append(Transaction.date >= self.start_date)
+        if self.end_date is not None:
+            clauses.append(Transaction.date < self.end_date)
+        if self.min_amount is not None:
+            clauses.append(Transaction.amount >= self.min_amount)
+        if self.max_amount is not None:
+            clauses.append(Transaction.amount <= self.max_amount)
+        return clauses
+
+
+def encode_cursor(transaction: Transaction) -> str:
+    """Encode the keyset position ``(date, id)`` of the last row of a page."""
+    payload = json.dumps([transaction.date.isoformat(), transaction.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date), int(transaction_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_export(
+    bind: AsyncEngine, stmt: Select, fmt: ExportFormat
+) -> AsyncIterator[str]:
+    """Yield ``stmt``'s rows serialized as NDJSON or CSV, one batch per chunk.
+
+    Rows are read through a server-side cursor (``AsyncConnection.stream``), so
+    memory stays bounded by ``EXPORT_BATCH_SIZE`` regardless of the table size.
+    """
+    columns = [column.key for column in EXPORT_COLUMNS]
+    async with bind.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        if fmt is ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            if fmt is ExportFormat.csv:
+                writer = csv.writer(buffer)
+                writer.writerows([_export_value(v) for v in row] for row in rows)
+            else:
+                for row in rows:
+                    record = dict(zip(columns, map(_export_value, row)))
+                    buffer.write(json.dumps(record, ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+
+
+def period_expression(granularity: Granularity, dialect_name: str):
+    """SQL expression truncating ``Transaction.date`` to the start of its period.
+
+    PostgreSQL uses ``date_trunc`` (weeks start on Monday); SQLite, used by the
+    tests, gets an equivalent built from its date functions.
+    """
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(granularity.value, Transaction.date), Date)
+    if granularity is Granularity.month:
+        return func.strftime("%Y-%m-01", Transaction.date)
+    if granularity is Granularity.week:
+        return func.date(Transaction.date, "-6 days", "weekday 1")
+    return func.date(Transaction.date)
+
+
+def json_response(adapter: TypeAdapter, value, headers=None) -> Response:
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(value, from_attributes=True)),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
 @router.get("/transactions")
-async def get_transactions(db: Session = Depends(get_db)) -> list[TransactionResponse]:
+async def get_transactions(
+    request: Request,
+    filters: TransactionFilter = Depends(),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[TransactionResponse]:
+    """List transactions newest first, one keyset page at a time.
+
+    When more rows are available the opaque position of the next page is
+    returned in the ``X-Next-Cursor`` header; pass it back as ``cursor``.
+    Pages are cached until the next write and carry an ``ETag``.
+    """
+    return await cached_response(
+        request,
+        "transactions",
+        lambda: _list_transactions(filters, cursor, limit, db),
+        await data_version(db),
+    )
+
+
+async def _list_transactions(
+    filters: TransactionFilter, cursor: str | None, limit: int, db: AsyncSession
+) -> Response:
     try:
-        transactions = db.query(Transaction).all()
+        stmt = (
+            select(Transaction)
+            .where(*filters.clauses())
+            .order_by(Transaction.date.desc(), Transaction.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"message": str(e)},
+                )
+            stmt = stmt.where(tuple_(Transaction.date, Transaction.id) < after)
+
+        transactions = (await db.scalars(stmt)).all()
         if not transactions:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"message": "No transactions found"},
             )
 
-        return transactions
+        headers = {}
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(transactions[-1])
+
+        return json_response(TRANSACTION_LIST, transactions, headers)
 
     except Exception as e:
         return JSONResponse(
@@ -47,9 +297,34 @@ async def get_transactions(db: Session = Depends(get_db)) -> list[TransactionRes
         )
 
 
+@router.get("/transactions/export")
+async def export_transactions(
+    filters: TransactionFilter = Depends(),
+    format: ExportFormat = ExportFormat.ndjson,
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    """Stream every transaction matching ``filters`` as NDJSON or CSV."""
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .where(*filters.clauses())
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+    )
+    media_type = "text/csv" if format is ExportFormat.csv else "application/x-ndjson"
+
+    # The stream opens its own connection: the request-scoped session may be
+    # closed before the response body has been fully sent.
+    return StreamingResponse(
+        stream_export(db.bind, stmt, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format.value}"'
+        },
+    )
+
+
 @router.post("/transactions")
 async def create_transaction(
-    transaction: TransactionCreate, db: Session = Depends(get_db)
+    transaction: TransactionCreate, db: AsyncSession = Depends(get_async_db)
 ):
     try:
         new_transaction = Transaction(
@@ -60,8 +335,9 @@ async def create_transaction(
             date=transaction.date,
         )
         db.add(new_transaction)
-        db.commit()
-        db.refresh(new_transaction)
+        await db.commit()
+        await db.refresh(new_transaction)
+        await bump_data_version_async()
 
         return new_transaction
 
@@ -72,13 +348,194 @@ async def create_transaction(
         )
 
 
-@router.delete("/transactions/{transaction_id}")
-async def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+def validate_bulk_rows(
+    records: list,
+) -> tuple[list[dict], list[BulkRowError]]:
+    """Validate raw records with ``TransactionCreate``, collecting per-row errors."""
+    rows = []
+    errors = []
+    for index, record in enumerate(records):
+        try:
+            transaction = TransactionCreate.model_validate(record)
+        except ValidationError as e:
+            messages = [
+                f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+                for error in e.errors()
+            ]
+            errors.append(BulkRowError(index=index, errors=messages))
+            continue
+
+        if transaction.type not in TransactionType.__members__:
+            errors.append(
+                BulkRowError(
+                    index=index,
+                    errors=[f"type: Invalid transaction type '{transaction.type}'"],
+                )
+            )
+            continue
+
+        rows.append(transaction.model_dump())
+    return rows, errors
+
+
+async def _read_bulk_records(request: Request) -> list:
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise ValueError("Expected a CSV upload in the 'file' field")
+        text = (await upload.read()).decode("utf-8-sig")
+        return list(csv.DictReader(io.StringIO(text)))
+
+    if content_type.startswith("text/csv"):
+        text = (await request.body()).decode("utf-8-sig")
+        return list(csv.DictReader(io.StringIO(text)))
+
+    records = await request.json()
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of transactions")
+    return records
+
+
+async def _bulk_load(db: AsyncSession, rows: list[dict]) -> int:
+    inserted = await db.run_sync(
+        lambda session: bulk_insert_transactions(session.connection(), rows)
+    )
+    await db.commit()
+    await bump_data_version_async()
+    return inserted
+
+
+@router.post("/transactions/bulk")
+async def bulk_create_transactions(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+) -> BulkCreateResponse:
+    """Create many transactions from a JSON array or an uploaded CSV file.
+
+    Invalid rows are reported by their zero-based index and skipped; every
+    valid row is inserted in a single transaction.
+    """
     try:
-        transaction = (
-            db.query(Transaction).filter(Transaction.id == transaction_id).first()
+        records = await _read_bulk_records(request)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": str(e)},
         )
 
+    rows, errors = validate_bulk_rows(records)
+
+    try:
+        inserted = await _bulk_load(db, rows) if rows else 0
+    except Exception as e:
+        await db.rollback()
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"message": str(e)},
+        )
+
+    return BulkCreateResponse(inserted=inserted, errors=errors)
+
+
+@router.get("/reports/by-category")
+async def report_by_category(
+    request: Request,
+    filters: TransactionFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[CategoryReport]:
+    """Totals per category and type, largest first."""
+    total = func.sum(Transaction.amount)
+    stmt = (
+        select(
+            Transaction.category,
+            Transaction.type,
+            total.label("total"),
+            func.count().label("count"),
+        )
+        .where(*filters.clauses())
+        .group_by(Transaction.category, Transaction.type)
+        .order_by(total.desc(), Transaction.category)
+    )
+
+    async def build() -> Response:
+        rows = (await db.execute(stmt)).mappings().all()
+        return json_response(CATEGORY_REPORTS, rows)
+
+    return await cached_response(request, "reports", build, await data_version(db))
+
+
+@router.get("/reports/by-period")
+async def report_by_period(
+    request: Request,
+    granularity: Granularity = Granularity.month,
+    filters: TransactionFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[PeriodReport]:
+    """Totals per calendar day, week or month and type, oldest first."""
+    period = period_expression(granularity, db.bind.dialect.name).label("period")
+    stmt = (
+        select(
+            period,
+            Transaction.type,
+            func.sum(Transaction.amount).label("total"),
+            func.count().label("count"),
+        )
+        .where(*filters.clauses())
+        .group_by(period, Transaction.type)
+        .order_by(period, Transaction.type)
+    )
+
+    async def build() -> Response:
+        rows = (await db.execute(stmt)).mappings().all()
+        return json_response(PERIOD_REPORTS, rows)
+
+    return await cached_response(request, "reports", build, await data_version(db))
+
+
+@router.get("/reports/by-type")
+async def report_by_type(
+    request: Request,
+    filters: TransactionFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[TypeReport]:
+    """Totals per transaction type.
+
+    Unfiltered, this reads the trigger-maintained ``transaction_totals`` (one
+    row per type, archived months included) instead of scanning the table, so
+    the dashboard's balance cards cost the same at any table size.
+    """
+    clauses = filters.clauses()
+    if not clauses:
+        stmt = select(
+            TransactionTotal.type, TransactionTotal.total, TransactionTotal.count
+        ).order_by(TransactionTotal.type)
+    else:
+        stmt = (
+            select(
+                Transaction.type,
+                func.sum(Transaction.amount).label("total"),
+                func.count().label("count"),
+            )
+            .where(*clauses)
+            .group_by(Transaction.type)
+            .order_by(Transaction.type)
+        )
+
+    async def build() -> Response:
+        rows = (await db.execute(stmt)).mappings().all()
+        return json_response(TYPE_REPORTS, rows)
+
+    return await cached_response(request, "reports", build, await data_version(db))
+
+
+@router.delete("/transactions/{transaction_id}")
+async def delete_transaction(
+    transaction_id: int, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        transaction = await db.get(Transaction, transaction_id)
+
         if not transaction:
             print(f"Transaction with ID {transaction_id} not found")
             return JSONResponse(
@@ -86,8 +543,9 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db))
                 content={"message": "Transaction not found"},
             )
 
-        db.delete(transaction)
-        db.commit()
+        await db.delete(transaction)
+        await db.commit()
+        await bump_data_version_async()
         return {"detail": "Transaction deleted successfully"}
 
     except Exception as e:
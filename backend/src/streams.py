@@ -0,0 +1,157 @@
+"""Resumable server-sent event streams for agent turns.
+
+A turn's events are produced by a background task into a ``ReplayStream``
+rather than directly into the HTTP response, so a dropped connection does not
+cancel the turn. Every frame carries an ``id:`` of the form
+``<stream id>-<index>``; a client that reconnects with that value in the
+``Last-Event-ID`` header is served the frames it missed and then follows the
+live stream. Finished streams stay replayable for ``SSE_REPLAY_TTL_SECONDS``.
+
+While no frame is ready a ``: heartbeat`` comment is sent every
+``SSE_HEARTBEAT_SECONDS`` so idle-timeout proxies keep the connection open.
+
+Streams live in process memory, so a resuming client must reach the same
+worker (e.g. sticky sessions on the load balancer).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_REPLAY_TTL_SECONDS = float(os.getenv("SSE_REPLAY_TTL_SECONDS", "60"))
+
+# Sent with every SSE response; X-Accel-Buffering stops nginx from buffering.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+HEARTBEAT_FRAME = ": heartbeat\n\n"
+# Last frame of a turn whose producer raised, so clients can tell a failure
+# from a finished turn and stop resuming.
+ERROR_EVENT = "error"
+ERROR_DATA = json.dumps({"error": "The agent turn failed."})
+
+
+class ReplayStream:
+    """Frames of one agent turn, readable by any number of (re)connecting clients."""
+
+    def __init__(self):
+        self.stream_id = secrets.token_hex(4)
+        self.frames: list[str] = []
+        # SSE ``event:`` names of frames that are not plain messages, by index
+        self.event_types: dict[int, str] = {}
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, data: str, event: Optional[str] = None) -> None:
+        async with self._changed:
+            if event:
+                self.event_types[len(self.frames)] = event
+            self.frames.append(data)
+            self._changed.notify_all()
+
+    async def close(self) -> None:
+        async with self._changed:
+            self.done = True
+            self.finished_at = time.monotonic()
+            self._changed.notify_all()
+
+    def position(self, last_event_id: str) -> Optional[int]:
+        """Index of the frame ``last_event_id`` names, or ``None`` if it is not ours."""
+        stream_id, _, index = last_event_id.strip().rpartition("-")
+        if stream_id != self.stream_id or not index.isdigit():
+            return None
+        return min(int(index), len(self.frames) - 1)
+
+    def _frame(self, index: int) -> str:
+        event = self.event_types.get(index)
+        event_line = f"event: {event}\n" if event else ""
+        return (
+            f"id: {self.stream_id}-{index}\n{event_line}"
+            f"data: {self.frames[index]}\n\n"
+        )
+
+    async def subscribe(
+        self, after: int = -1, heartbeat: float = SSE_HEARTBEAT_SECONDS
+    ) -> AsyncIterator[str]:
+        """Yield SSE frames after index ``after`` until the turn is finished."""
+        index = after + 1
+        while True:
+            while index < len(self.frames):
+                yield self._frame(index)
+                index += 1
+            if self.done:
+                return
+
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(
+                            lambda index=index: len(self.frames) > index or self.done
+                        ),
+                        heartbeat,
+                    )
+                    idle = False
+                except asyncio.TimeoutError:
+                    idle = True
+            if idle:
+                yield HEARTBEAT_FRAME
+
+
+class StreamRegistry:
+    """The latest ``ReplayStream`` of each session."""
+
+    def __init__(self, ttl: float = SSE_REPLAY_TTL_SECONDS):
+        self.ttl = ttl
+        self._streams: dict[str, ReplayStream] = {}
+
+    def get(self, key: str) -> Optional[ReplayStream]:
+        self._prune()
+        return self._streams.get(key)
+
+    def start(
+        self, key: str, produce: Callable[[ReplayStream], Awaitable[None]]
+    ) -> ReplayStream:
+        """Run ``produce(stream)`` in the background and register its stream.
+
+        The task keeps running if every client disconnects; the stream is
+        closed when ``produce`` returns or raises. If it raises, an
+        ``event: error`` frame is published first, so it is also replayed to
+        clients that resume afterwards.
+        """
+        self._prune()
+        stream = ReplayStream()
+
+        async def run():
+            try:
+                await produce(stream)
+            except Exception:
+                logger.exception("Stream %s for %s failed", stream.stream_id, key)
+                await stream.publish(ERROR_DATA, event=ERROR_EVENT)
+            finally:
+                await stream.close()
+
+        stream._task = asyncio.create_task(run())
+        self._streams[key] = stream
+        return stream
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key
+            for key, stream in self._streams.items()
+            if stream.done and now - stream.finished_at > self.ttl
+        ]
+        for key in expired:
+            del self._streams[key]
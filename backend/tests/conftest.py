@@ -4,15 +4,25 @@ import pytest
 from dotenv import load_dotenv
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from server import app
-from src.database.models import Base, get_db
+from src.cache import TTLCache, set_cache
+from src.database.config import async_database_url, engine_options
+from src.database.models import Base, get_async_db, get_db
 
 load_dotenv()
 DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db")
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    **engine_options(async_database_url(DATABASE_URL)),
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 
 def override_get_db():
@@ -23,12 +33,19 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture
 def client():
     Base.metadata.create_all(bind=engine)
+    set_cache(TTLCache())
 
     with TestClient(app) as test_client:
         yield test_client
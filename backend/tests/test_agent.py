@@ -0,0 +1,925 @@
+import asyncio
+import datetime
+import gc
+import inspect
+import threading
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.models import lite_llm
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from sqlalchemy.exc import OperationalError
+
+from agent import answers, parallel, router, tools
+from agent.agent import get_agent
+from agent.executor import offload, tool_timings
+from agent.models import (
+    CACHE_MIN_TOKENS,
+    CHARS_PER_TOKEN,
+    PrefixCache,
+    ScriptedLlm,
+    UsageTrackingClient,
+    build_model,
+    record_model_response,
+)
+from agent.parallel import (
+    discard_prefetched,
+    prefetch_tool_calls,
+    use_prefetched_result,
+)
+from agent.prompt import PROMPT_BODY, TIMEZONE, get_prompt, prompt_context
+from agent.sessions import (
+    SUMMARY_AUTHOR,
+    SUMMARY_HEADER,
+    TITLE_MAX_CHARS,
+    CompactingSessionService,
+    decode_position,
+    encode_position,
+    session_title,
+)
+from agent.tools import (
+    async_execute_sql_query,
+    async_get_balance,
+    bounded_query,
+    execute_sql_query,
+    fetch_json_rows,
+    is_read_query,
+)
+from src.cache import TTLCache, bump_data_version, set_cache
+from src.metrics import AGENT_ANSWER_CACHE
+from src.routes.agent import get_runner
+
+
+class TestAgentCache:
+
+    def test_runner_is_reused(self):
+        """Test the runner and agent are built once per model"""
+        assert get_runner() is get_runner()
+        assert get_runner().agent is get_agent()
+
+    def test_prompt_is_rendered_per_call(self):
+        """Test the cached agent resolves the prompt with today's date"""
+        agent = get_agent()
+        assert agent.instruction is get_prompt
+
+        today = datetime.datetime.now(TIMEZONE).date().isoformat()
+        assert f"TODAY_DATE = {today} (" in get_prompt()
+
+    def test_prompt_has_a_static_prefix(self):
+        """Test only the trailing context differs between days"""
+        prompt = get_prompt()
+        assert prompt.startswith(PROMPT_BODY)
+        assert prompt == PROMPT_BODY + prompt_context()
+
+        monday = prompt_context(datetime.date(2025, 6, 2))
+        assert "TODAY_DATE = 2025-06-02 (Senin)" in monday
+        assert monday != prompt_context(datetime.date(2025, 6, 3))
+
+
+class FakeCursor:
+    def __init__(self, description, rows):
+        self.description = description
+        self.rows = rows
+
+    def fetchmany(self, size):
+        return self.rows[:size]
+
+
+class TestFetchJsonRows:
+
+    def test_converts_columns_by_type(self):
+        """Test numeric and temporal columns are converted per column type"""
+        cursor = FakeCursor(
+            [("category", 25), ("total", 1700), ("month", 1082)],
+            [
+                ("Makanan", Decimal("350000"), datetime.date(2025, 5, 1)),
+                ("Hiburan", None, None),
+            ],
+        )
+
+        assert fetch_json_rows(cursor) == [
+            {"category": "Makanan", "total": 350000.0, "month": "2025-05-01"},
+            {"category": "Hiburan", "total": None, "month": None},
+        ]
+
+    def test_truncates_by_row_count(self):
+        """Test results past the row cap end with a truncation marker"""
+        cursor = FakeCursor([("id", 23)], [(i,) for i in range(10)])
+
+        results = fetch_json_rows(cursor, max_rows=3)
+        assert results[:3] == [{"id": 0}, {"id": 1}, {"id": 2}]
+        assert results[3]["truncated"] is True
+        assert results[3]["returned_rows"] == 3
+
+    def test_truncates_by_size(self):
+        """Test results past the byte cap end with a truncation marker"""
+        cursor = FakeCursor([("description", 25)], [("x" * 100,)] * 5)
+
+        results = fetch_json_rows(cursor, max_rows=10, max_bytes=250)
+        assert len(results) == 3
+        assert results[-1]["returned_rows"] == 2
+
+
+class TestReadQueries:
+
+    def test_reads_are_bounded_in_the_database(self, monkeypatch):
+        """Test the row cap is a LIMIT on the statement, not only on the fetch"""
+        executed = []
+
+        class Cursor(FakeCursor):
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                executed.append(sql)
+
+        class Connection:
+            def cursor(self):
+                return Cursor([("id", 23)], [(i,) for i in range(4)])
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr(tools.engine, "raw_connection", Connection)
+        results = tools._run_query("SELECT id FROM transactions_table;")
+
+        assert executed[0].endswith(
+            "SELECT * FROM (\nSELECT id FROM transactions_table\n) AS bounded LIMIT 201"
+        )
+        assert bounded_query("SELECT 1 -- x", max_rows=3) == (
+            "SELECT * FROM (\nSELECT 1 -- x\n) AS bounded LIMIT 4"
+        )
+        assert bounded_query("EXPLAIN SELECT 1") == "EXPLAIN SELECT 1"
+        assert results == [{"id": i} for i in range(4)]
+
+    def test_classifies_by_first_keyword(self):
+        """Test CTEs, parenthesised and commented SELECTs are reads"""
+        assert is_read_query("select * from transactions_table")
+        assert is_read_query(
+            "WITH monthly AS (SELECT date_trunc('month', date) AS month, amount "
+            "FROM transactions_table) SELECT month, SUM(amount) FROM monthly GROUP BY 1"
+        )
+        assert is_read_query("(SELECT 1 FROM transactions_table) UNION (SELECT 2)")
+        assert is_read_query(
+            "-- saldo\n/* bulan ini */ SELECT 1 FROM transactions_table"
+        )
+        assert is_read_query("EXPLAIN SELECT * FROM transactions_table")
+
+    def test_writes_are_not_reads(self):
+        """Test writes, including data-modifying CTEs, take the write path"""
+        assert not is_read_query("INSERT INTO transactions_table VALUES (1)")
+        assert not is_read_query("  delete from transactions_table where id = 1")
+        assert not is_read_query(
+            "WITH gone AS (DELETE FROM transactions_table RETURNING *) "
+            "SELECT count(*) FROM gone"
+        )
+        assert not is_read_query(
+            "EXPLAIN ANALYZE UPDATE transactions_table SET amount = 1"
+        )
+        assert not is_read_query("-- SELECT\nDROP TABLE transactions_table")
+
+
+def lookup(key: str) -> dict:
+    """Return a fixed record for ``key``."""
+    return {"key": key, "value": 42}
+
+
+async def run_scripted(model: ScriptedLlm, streaming: bool) -> list:
+    runner = InMemoryRunner(
+        agent=Agent(name="scripted_agent", model=model, tools=[lookup]),
+        app_name="test",
+    )
+    session = await runner.session_service.create_session(app_name="test", user_id="1")
+    config = RunConfig(
+        streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE
+    )
+    return [
+        event
+        async for event in runner.run_async(
+            user_id="1",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="cek")]),
+            run_config=config,
+        )
+    ]
+
+
+class TestScriptedLlm:
+    SCRIPT = [
+        {"tool": "lookup", "args": {"key": "saldo"}},
+        {"text": "Hasil: {result}"},
+    ]
+
+    def test_build_model(self):
+        """Test scripted names resolve offline and others go to LiteLLM"""
+        assert isinstance(build_model("scripted"), ScriptedLlm)
+        assert isinstance(build_model("azure/gpt-4o-mini"), LiteLlm)
+
+    def test_replays_tool_call_then_reply(self):
+        """Test the script calls the tool and answers with its result"""
+        events = asyncio.run(run_scripted(ScriptedLlm(steps=self.SCRIPT), False))
+
+        calls = [call for event in events for call in event.get_function_calls()]
+        assert [(call.name, call.args) for call in calls] == [
+            ("lookup", {"key": "saldo"})
+        ]
+        assert events[-1].content.parts[0].text == (
+            'Hasil: {"key": "saldo", "value": 42}'
+        )
+
+    def test_streams_reply_in_chunks(self):
+        """Test streamed replies arrive as partial chunks before the full text"""
+        model = ScriptedLlm(steps=[{"text": "Saldo kamu aman"}])
+        events = asyncio.run(run_scripted(model, True))
+
+        chunks = [event.content.parts[0].text for event in events if event.partial]
+        assert chunks == ["Saldo", " kamu", " aman"]
+        assert not events[-1].partial
+        assert events[-1].content.parts[0].text == "Saldo kamu aman"
+
+
+async def add_turns(service, session, start: int, count: int) -> None:
+    for turn in range(start, start + count):
+        for author, text in (
+            ("user", f"pertanyaan {turn}"),
+            ("agent", f"jawaban {turn}"),
+        ):
+            await service.append_event(
+                session,
+                Event(
+                    author=author,
+                    invocation_id=f"inv-{turn}",
+                    content=types.Content(
+                        role="user" if author == "user" else "model",
+                        parts=[types.Part(text=text)],
+                    ),
+                ),
+            )
+
+
+class TestSessionCompaction:
+
+    def compact(self, service, session):
+        return asyncio.run(
+            service.compact_session(app_name="test", user_id="1", session_id=session.id)
+        )
+
+    def load(self, service, session):
+        return asyncio.run(
+            service.get_session(app_name="test", user_id="1", session_id=session.id)
+        )
+
+    def create(self, tmp_path, **options):
+        service = CompactingSessionService(
+            db_url=f"sqlite:///{tmp_path}/sessions.db", **options
+        )
+        session = asyncio.run(service.create_session(app_name="test", user_id="1"))
+        return service, session
+
+    def test_runs_off_the_event_loop(self, tmp_path):
+        """Test the blocking archive work happens on a worker thread"""
+        threads = []
+
+        def summarizer(previous, events):
+            threads.append(threading.get_ident())
+            return "ringkasan"
+
+        service, session = self.create(
+            tmp_path, keep_turns=1, compact_batch=1, summarizer=summarizer
+        )
+        asyncio.run(add_turns(service, session, 0, 3))
+
+        assert self.compact(service, session) == 4
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_keeps_recent_turns_and_archives_the_rest(self, tmp_path):
+        """Test old turns are archived and replaced by one summary event"""
+        service, session = self.create(tmp_path, keep_turns=2, compact_batch=1)
+        asyncio.run(add_turns(service, session, 0, 5))
+
+        assert self.compact(service, session) == 6
+
+        events = self.load(service, session).events
+        assert events[0].author == SUMMARY_AUTHOR
+        summary = events[0].content.parts[0].text
+        assert "- Pengguna: pertanyaan 0" in summary
+        assert "- Asisten: jawaban 2" in summary
+        assert [event.content.parts[0].text for event in events[1:]] == [
+            "pertanyaan 3",
+            "jawaban 3",
+            "pertanyaan 4",
+            "jawaban 4",
+        ]
+
+        archived = service.archived_events(
+            app_name="test", user_id="1", session_id=session.id
+        )
+        assert [event.content.parts[0].text for event in archived][:2] == [
+            "pertanyaan 0",
+            "jawaban 0",
+        ]
+        assert len(archived) == 6
+
+    def test_waits_for_a_full_batch(self, tmp_path):
+        """Test nothing is compacted until keep_turns + compact_batch is exceeded"""
+        service, session = self.create(tmp_path, keep_turns=2, compact_batch=3)
+        asyncio.run(add_turns(service, session, 0, 5))
+
+        assert self.compact(service, session) == 0
+        assert len(self.load(service, session).events) == 10
+
+    def test_summary_rolls_forward(self, tmp_path):
+        """Test a second compaction folds the previous summary into the new one"""
+        service, session = self.create(tmp_path, keep_turns=1, compact_batch=1)
+        asyncio.run(add_turns(service, session, 0, 3))
+        self.compact(service, session)
+
+        session = self.load(service, session)
+        asyncio.run(add_turns(service, session, 3, 2))
+        assert self.compact(service, session) == 4
+
+        events = self.load(service, session).events
+        summaries = [event for event in events if event.author == SUMMARY_AUTHOR]
+        assert len(summaries) == 1
+        text = summaries[0].content.parts[0].text
+        assert text.count(SUMMARY_HEADER) == 1
+        assert "pertanyaan 0" in text and "jawaban 3" in text
+        assert len(events) == 3
+
+
+class TestSessionPagination:
+
+    def create(self, tmp_path, **options):
+        return CompactingSessionService(
+            db_url=f"sqlite:///{tmp_path}/sessions.db", **options
+        )
+
+    def test_history_pages_back_through_archive(self, tmp_path):
+        """Test history pages walk back across compacted events in order"""
+        service = self.create(tmp_path, keep_turns=1, compact_batch=1)
+        session = asyncio.run(service.create_session(app_name="test", user_id="1"))
+        asyncio.run(add_turns(service, session, 0, 3))
+        asyncio.run(
+            service.compact_session(app_name="test", user_id="1", session_id=session.id)
+        )
+
+        texts, before = [], None
+        while True:
+            events, before = service.list_history(
+                app_name="test",
+                user_id="1",
+                session_id=session.id,
+                limit=4,
+                before=before,
+            )
+            texts = [event.content.parts[0].text for event in events] + texts
+            if before is None:
+                break
+            before = decode_position(encode_position(before))
+
+        assert texts == [
+            f"{kind} {turn}" for turn in range(3) for kind in ("pertanyaan", "jawaban")
+        ]
+
+    def test_session_summaries_page_newest_first(self, tmp_path):
+        """Test summaries carry titles and page by last update"""
+        service = self.create(tmp_path)
+        # Ids break ties between sessions updated within the same second.
+        first = asyncio.run(
+            service.create_session(
+                app_name="test",
+                user_id="1",
+                session_id="a",
+                state={"title": "Cek saldo"},
+            )
+        )
+        untitled = asyncio.run(
+            service.create_session(app_name="test", user_id="1", session_id="b")
+        )
+        asyncio.run(add_turns(service, untitled, 0, 1))
+
+        page, before = service.list_session_summaries(
+            app_name="test", user_id="1", limit=1
+        )
+        assert [(item["id"], item["title"]) for item in page] == [
+            (untitled.id, "pertanyaan 0")
+        ]
+
+        page, before = service.list_session_summaries(
+            app_name="test", user_id="1", limit=1, before=before
+        )
+        assert [(item["id"], item["title"]) for item in page] == [
+            (first.id, "Cek saldo")
+        ]
+        assert before is None
+
+    def test_session_title_is_clipped(self):
+        """Test titles collapse whitespace and are clipped"""
+        content = types.Content(role="user", parts=[types.Part(text=" a \n b " * 50)])
+        title = session_title(content)
+
+        assert title.startswith("a b a b")
+        assert len(title) == TITLE_MAX_CHARS and title.endswith("...")
+
+
+class TestOffload:
+
+    def test_runs_off_the_event_loop_with_a_concurrency_limit(self):
+        """Test offloaded tools run in threads, at most max_concurrency at once"""
+        running, peak = 0, 0
+        lock = threading.Lock()
+
+        def slow_tool(value: int) -> dict:
+            """Sleep, then echo ``value``."""
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return {"value": value, "thread": threading.get_ident()}
+
+        tool = offload(slow_tool, max_concurrency=2)
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            results = await asyncio.gather(*(tool(value) for value in range(4)))
+            task.cancel()
+            return results, ticks
+
+        results, ticks = asyncio.run(scenario())
+
+        assert [result["value"] for result in results] == [0, 1, 2, 3]
+        assert threading.get_ident() not in {result["thread"] for result in results}
+        assert peak == 2
+        # The loop kept running while the tools slept.
+        assert ticks >= 10
+
+        timing = tool_timings()["slow_tool"]
+        assert timing["calls"] == 4
+        assert timing["in_flight"] == 0
+        assert timing["wait_seconds"] > 0
+
+    def test_keeps_the_tool_declaration(self):
+        """Test the wrapper keeps the name, signature and docstring"""
+        assert async_execute_sql_query.__name__ == "execute_sql_query"
+        assert inspect.iscoroutinefunction(async_execute_sql_query)
+        assert list(inspect.signature(async_execute_sql_query).parameters) == [
+            "sql_query"
+        ]
+        assert async_execute_sql_query.__doc__ == execute_sql_query.__doc__
+
+
+class TestPromptCaching:
+
+    def test_prefix_cache_counts_shared_prefixes(self):
+        """Test only a long enough shared prefix is reported as cached"""
+        cache = PrefixCache()
+        static = "x" * (CACHE_MIN_TOKENS * CHARS_PER_TOKEN * 2)
+
+        assert cache.lookup(static + "hari ini Senin") == (
+            len(static + "hari ini Senin") // CHARS_PER_TOKEN,
+            0,
+        )
+        _, cached = cache.lookup(static + "hari ini Selasa")
+        assert cached == len(static) // CHARS_PER_TOKEN
+
+        short = "y" * (CACHE_MIN_TOKENS * CHARS_PER_TOKEN // 2)
+        cache.lookup(short + "a")
+        assert cache.lookup(short + "b")[1] == 0
+
+    def test_scripted_turns_report_cached_tokens(self):
+        """Test repeated turns with a static prompt are served from the cache"""
+        model = ScriptedLlm(steps=[{"text": "Oke"}])
+
+        async def scenario():
+            runner = InMemoryRunner(
+                agent=Agent(name="scripted_agent", model=model, instruction=get_prompt),
+                app_name="test",
+            )
+            usages = []
+            for _ in range(2):
+                session = await runner.session_service.create_session(
+                    app_name="test", user_id="1"
+                )
+                async for event in runner.run_async(
+                    user_id="1",
+                    session_id=session.id,
+                    new_message=types.Content(
+                        role="user", parts=[types.Part(text="cek")]
+                    ),
+                ):
+                    usages.append(event.usage_metadata)
+            return usages
+
+        first, second = asyncio.run(scenario())
+        assert first.cached_content_token_count == 0
+        assert second.cached_content_token_count >= CACHE_MIN_TOKENS
+        assert second.cached_content_token_count <= second.prompt_token_count
+
+    def test_litellm_cached_tokens_reach_the_response(self, monkeypatch):
+        """Test cached prompt tokens reported by LiteLLM are kept on the response"""
+
+        async def fake_acompletion(**kwargs):
+            return {
+                "usage": {
+                    "prompt_tokens": 2000,
+                    "prompt_tokens_details": SimpleNamespace(cached_tokens=1536),
+                }
+            }
+
+        monkeypatch.setattr(lite_llm, "acompletion", fake_acompletion)
+
+        async def scenario():
+            await UsageTrackingClient().acompletion("m", [], None)
+            response = LlmResponse(
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=2000
+                )
+            )
+            record_model_response(SimpleNamespace(invocation_id="cache-test"), response)
+            return response
+
+        response = asyncio.run(scenario())
+        assert response.usage_metadata.cached_content_token_count == 1536
+
+
+def message(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+class TestAnswerCache:
+
+    BALANCE = {
+        "total_income": 5_000_000,
+        "total_expense": 1_250_000,
+        "balance": 3_750_000,
+    }
+
+    def fake_balance(self, monkeypatch) -> list:
+        calls = []
+
+        async def fake_get_balance():
+            calls.append(1)
+            return dict(self.BALANCE)
+
+        monkeypatch.setattr(answers, "async_get_balance", fake_get_balance)
+        set_cache(TTLCache())
+        return calls
+
+    def count(self, result: str) -> float:
+        return sum(
+            value
+            for _, labels, value in AGENT_ANSWER_CACHE.samples()
+            if labels == (("result", result),)
+        )
+
+    def test_rephrasings_share_an_intent(self):
+        """Test word order, stopwords and punctuation do not change the intent"""
+        assert answers.normalize("Saldo saya berapa ya?") == ("saldo",)
+        assert answers.match_intent("berapa saldo saya").name == "balance"
+        assert answers.match_intent("cek saldo dong").name == "balance"
+        assert answers.match_intent("Pengeluaran bulan ini?").name == "month_expense"
+        assert answers.match_intent("saldo bulan lalu") is None
+
+    def test_mutations_bypass(self):
+        """Test messages naming an amount or a write verb never match"""
+        for text in (
+            "catat saldo",
+            "hapus transaksi kemarin",
+            "saldo 50rb",
+            "beli kopi 25 ribu",
+            "tambah pemasukan bulan ini",
+        ):
+            assert answers.is_mutating(text), text
+            assert answers.match_intent(text) is None
+        assert not answers.is_mutating("pendapatan bulan ini")
+
+    def test_second_ask_is_a_hit_until_a_write(self, monkeypatch):
+        """Test repeated questions skip the tool until the data version changes"""
+        calls = self.fake_balance(monkeypatch)
+        hits, misses = self.count("hit"), self.count("miss")
+
+        first = asyncio.run(answers.cached_answer(message("saldo saya berapa?")))
+        second = asyncio.run(answers.cached_answer(message("berapa saldo")))
+        assert first == second
+        assert "Rp 3.750.000" in first
+        assert len(calls) == 1
+
+        bump_data_version()
+        asyncio.run(answers.cached_answer(message("saldo")))
+        assert len(calls) == 2
+        assert self.count("hit") == hits + 1
+        assert self.count("miss") == misses + 2
+
+    def test_tool_errors_fall_back_to_the_model(self, monkeypatch):
+        """Test an error from the tool is neither answered nor cached"""
+
+        async def failing():
+            return {"error": "boom"}
+
+        monkeypatch.setattr(answers, "async_get_balance", failing)
+        set_cache(TTLCache())
+        assert asyncio.run(answers.cached_answer(message("saldo"))) is None
+        assert asyncio.run(answers.cached_answer(message("catat 10rb"))) is None
+
+    def test_database_errors_fall_back_to_the_model(self, monkeypatch):
+        """Test a failing monthly totals query is a miss, not an exception"""
+
+        class BrokenEngine:
+            def connect(self):
+                raise OperationalError("SELECT 1", {}, Exception("db down"))
+
+        monkeypatch.setattr(answers, "engine", BrokenEngine())
+        set_cache(TTLCache())
+        unmatched = self.count("unmatched")
+
+        assert "error" in answers._month_totals(datetime.date(2025, 5, 1))
+        assert (
+            asyncio.run(answers.cached_answer(message("pengeluaran bulan ini"))) is None
+        )
+        assert self.count("unmatched") == unmatched + 1
+
+    def test_run_answers_without_the_model(self, client, monkeypatch):
+        """Test /run answers a cached intent and records it in the session"""
+        self.fake_balance(monkeypatch)
+        monkeypatch.setattr(router, "ANSWER_CACHE_ENABLED", True)
+        session_id = f"answer-{time.time_ns()}"
+
+        response = client.post(
+            "/api/v1/run",
+            json={
+                "session_id": session_id,
+                "new_message": {"role": "user", "parts": [{"text": "cek saldo"}]},
+                "streaming": False,
+            },
+        )
+        assert response.status_code == 200
+        (event,) = response.json()
+        assert "Rp 3.750.000" in event["content"]["parts"][0]["text"]
+
+        history = client.get(f"/api/v1/session/{session_id}").json()
+        assert [event["author"] for event in history] == ["user", event["author"]]
+
+
+class TestIntentRouter:
+
+    TODAY = datetime.date(2025, 5, 31)
+
+    def parse(self, text: str):
+        return router.parse_transaction(text, self.TODAY)
+
+    def test_parses_amounts_dates_and_categories(self):
+        """Test the common ways of asking to record a transaction"""
+        parsed = self.parse("tambah pengeluaran 20 ribu makan siang")
+        assert parsed == router.ParsedTransaction(
+            "expense", 20_000, "Makan Siang", "Makanan", self.TODAY
+        )
+
+        parsed = self.parse("Catat pemasukan gaji 7,5 jt tanggal 25")
+        assert (parsed.type, parsed.amount, parsed.category) == (
+            "income",
+            7_500_000,
+            "Gaji",
+        )
+        assert parsed.date == datetime.date(2025, 5, 25)
+
+        parsed = self.parse("input pengeluaran bensin Rp 30.000 kemarin")
+        assert (parsed.amount, parsed.description, parsed.date) == (
+            30_000,
+            "Bensin",
+            datetime.date(2025, 5, 30),
+        )
+        assert self.parse("catat pengeluaran 50rb pulsa 3 juni").date == (
+            datetime.date(2024, 6, 3)
+        )
+        assert self.parse("tolong catat pengeluaran obat 1.5 jt").amount == 1_500_000
+
+    def test_ambiguous_requests_fall_back(self):
+        """Test anything the parser is not sure about is left to the model"""
+        for text in (
+            "cek saldo",
+            "tambah 20 ribu makan siang",  # no type
+            "tambah pengeluaran makan siang",  # no amount
+            "tambah pengeluaran 20 ribu makan siang 2 porsi",  # two amounts
+            "tambah pengeluaran 20 ribu buat hadiah",  # unknown category
+            "tambah pengeluaran 20 makan siang",  # amount too small
+            "ubah pengeluaran makan siang jadi 25 ribu",  # update
+            "tambah pengeluaran 20 ribu makan siang kemarin tanggal 3",
+            "tambah pengeluaran 20 ribu makan siang; drop table",
+        ):
+            assert self.parse(text) is None, text
+
+    def test_insert_is_recorded_like_a_model_turn(self, tmp_path, monkeypatch):
+        """Test a routed write runs the SQL tool and stores call, result and reply"""
+        calls = []
+
+        async def fake_execute(sql_query):
+            calls.append(sql_query)
+            return [{"success": True, "affected_rows": 1}]
+
+        fake_execute.__name__ = "execute_sql_query"
+        monkeypatch.setattr(router, "async_execute_sql_query", fake_execute)
+        monkeypatch.setattr(router, "INTENT_ROUTER_ENABLED", True)
+        service = CompactingSessionService(db_url=f"sqlite:///{tmp_path}/sessions.db")
+        text = "tambah pengeluaran 20 ribu makan siang"
+
+        async def scenario():
+            session = await service.create_session(app_name="test", user_id="1")
+            turn = await router.route_message(message(text))
+            await router.append_turn(
+                service, session, message(text), turn, author="financial_agent"
+            )
+            return await service.get_session(
+                app_name="test", user_id="1", session_id=session.id
+            )
+
+        events = asyncio.run(scenario()).events
+        assert calls == [
+            "INSERT INTO transactions_table (type, amount, description, category, "
+            "date) VALUES ('expense', 20000, 'Makan Siang', 'Makanan', "
+            f"'{datetime.datetime.now(TIMEZONE).date().isoformat()}');"
+        ]
+        assert [event.author for event in events] == ["user"] + ["financial_agent"] * 3
+        call = events[1].get_function_calls()[0]
+        response = events[2].get_function_responses()[0]
+        assert (call.name, call.args) == ("execute_sql_query", {"sql_query": calls[0]})
+        assert response.id == call.id
+        assert response.response == {"result": [{"success": True, "affected_rows": 1}]}
+        assert (
+            events[3]
+            .content.parts[0]
+            .text.startswith(
+                "Oke, udah saya catat pengeluaran Rp 20.000 buat Makan Siang"
+            )
+        )
+
+    def test_failed_insert_falls_back_to_the_model(self, monkeypatch):
+        """Test a tool error is not answered from a template"""
+
+        async def failing(sql_query):
+            return [{"error": "Database error: boom"}]
+
+        monkeypatch.setattr(router, "async_execute_sql_query", failing)
+        monkeypatch.setattr(router, "INTENT_ROUTER_ENABLED", True)
+        turn = asyncio.run(router.route_message(message("catat pengeluaran 20rb kopi")))
+        assert turn is None
+
+
+class TestParallelToolCalls:
+
+    def run(self, monkeypatch, calls, parallel=True, delay=0.2):
+        """Run one scripted turn making ``calls``; return the query log and events."""
+        log = []
+
+        def fake_run_query(sql_query):
+            started = time.perf_counter()
+            time.sleep(delay)
+            log.append((sql_query, started, time.perf_counter()))
+            return [{"total_income": 1, "total_expense": 0}]
+
+        monkeypatch.setattr(tools, "_run_query", fake_run_query)
+        set_cache(TTLCache())
+        callbacks = (
+            {
+                "after_model_callback": prefetch_tool_calls,
+                "before_tool_callback": use_prefetched_result,
+                "after_agent_callback": discard_prefetched,
+            }
+            if parallel
+            else {}
+        )
+        agent = Agent(
+            name="scripted_agent",
+            model=ScriptedLlm(steps=[{"tools": calls}, {"text": "Oke"}]),
+            tools=[async_execute_sql_query, async_get_balance],
+            **callbacks,
+        )
+
+        async def scenario():
+            runner = InMemoryRunner(agent=agent, app_name="test")
+            session = await runner.session_service.create_session(
+                app_name="test", user_id="1"
+            )
+            return [
+                event
+                async for event in runner.run_async(
+                    user_id="1", session_id=session.id, new_message=message("cek")
+                )
+            ]
+
+        started = time.perf_counter()
+        events = asyncio.run(scenario())
+        return log, events, time.perf_counter() - started
+
+    @staticmethod
+    def sql(query: str) -> dict:
+        return {"tool": "execute_sql_query", "args": {"sql_query": query}}
+
+    def test_reads_run_concurrently(self, monkeypatch):
+        """Test read-only calls of one response overlap and keep their order"""
+        calls = [
+            self.sql("SELECT 1 FROM transactions_table"),
+            self.sql("SELECT 2 FROM transactions_table"),
+            {"tool": "get_balance"},
+        ]
+        _, _, serial = self.run(monkeypatch, calls, parallel=False)
+        log, events, parallel = self.run(monkeypatch, calls)
+
+        assert len(log) == 3
+        assert serial >= 0.6
+        assert parallel < 0.4
+        responses = events[1].get_function_responses()
+        assert [response.name for response in responses] == [
+            "execute_sql_query",
+            "execute_sql_query",
+            "get_balance",
+        ]
+        assert responses[2].response["balance"] == 1
+
+    def test_writes_stay_ordered(self, monkeypatch):
+        """Test a write waits for the reads before it and blocks the reads after it"""
+        insert = (
+            "INSERT INTO transactions_table (type, amount, description, category, "
+            "date) VALUES ('expense', 1000, 'Kopi', 'Makanan', '2025-05-31')"
+        )
+        log, _, _ = self.run(
+            monkeypatch,
+            [
+                self.sql("SELECT 1 FROM transactions_table"),
+                self.sql("SELECT 2 FROM transactions_table"),
+                self.sql(insert),
+                self.sql("SELECT 3 FROM transactions_table"),
+            ],
+            delay=0.1,
+        )
+        spans = {sql.split()[1]: (start, end) for sql, start, end in log}
+
+        assert spans["1"][0] < spans["2"][1] and spans["2"][0] < spans["1"][1]
+        assert spans["INTO"][0] >= max(spans["1"][1], spans["2"][1])
+        assert spans["3"][0] >= spans["INTO"][1]
+
+    def test_extra_arguments_are_dropped(self, monkeypatch):
+        """Test arguments a tool does not take are not passed to the started call"""
+        calls = [
+            {"tool": "get_balance", "args": {"month": "2025-05"}},
+            self.sql("SELECT 1 FROM transactions_table"),
+        ]
+        log, events, _ = self.run(monkeypatch, calls, delay=0.01)
+
+        assert len(log) == 2
+        responses = events[1].get_function_responses()
+        assert responses[0].response["balance"] == 1
+        assert parallel._prefetched == {}
+
+    def test_unused_failures_are_retrieved(self, monkeypatch):
+        """Test discarded calls that failed log no unretrieved exception"""
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(parallel, "async_get_balance", failing)
+        response = LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(function_call=types.FunctionCall(name="get_balance"))]
+                * 2,
+            )
+        )
+        context = SimpleNamespace(invocation_id="unused")
+        unhandled = []
+
+        async def scenario():
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: unhandled.append(context)
+            )
+            prefetch_tool_calls(context, response)
+            await asyncio.sleep(0.01)
+            discard_prefetched(context)
+            gc.collect()
+
+        asyncio.run(scenario())
+        assert parallel._prefetched == {}
+        assert unhandled == []
@@ -0,0 +1,40 @@
+import httpx
+
+from benchmarks.api import generate_rows, summarize, tool_error
+
+
+class TestBenchmarkHelpers:
+    def test_summarize_percentiles(self):
+        """Test p50/p95/p99 over a uniform sample."""
+        p50, p95, p99 = summarize([float(i) for i in range(1, 101)])
+
+        assert p50 == 50.5
+        assert 95 <= p95 <= 96
+        assert 99 <= p99 <= 100
+
+    def test_summarize_single_sample(self):
+        """Test a single latency is reported for every percentile."""
+        assert summarize([7.0]) == (7.0, 7.0, 7.0)
+
+    def test_generate_rows_is_deterministic(self):
+        """Test the same seed yields the same rows."""
+        rows = generate_rows(20, seed=3)
+
+        assert rows == generate_rows(20, seed=3)
+        assert rows != generate_rows(20, seed=4)
+        assert {row["type"] for row in rows} <= {"income", "expense"}
+
+    def test_tool_errors_fail_agent_turns(self):
+        """Test a /run response is failed when a tool call returned an error."""
+
+        def run(*responses):
+            events = [
+                {"content": {"parts": [{"functionResponse": {"response": response}}]}}
+                for response in responses
+            ]
+            return httpx.Response(200, json=events)
+
+        assert not tool_error(run({"balance": 1}, {"result": [{"total": 1}]}))
+        assert tool_error(run({"error": "Database error: boom"}))
+        assert tool_error(run({"result": [{"error": "Database error: boom"}]}))
+        assert tool_error(httpx.Response(500, json=[]))
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import cache as cache_module
+from src.cache import RedisCache, TTLCache, require_shared_cache, set_cache
+from src.database.models import Transaction, TransactionType
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis client calls the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls_on_loop = []
+
+    def _record(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.calls_on_loop.append(False)
+        else:
+            self.calls_on_loop.append(True)
+
+    def get(self, key):
+        self._record()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._record()
+        self.data[key] = value
+
+    def incr(self, key):
+        self._record()
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+TRANSACTION = {
+    "type": "expense",
+    "amount": 250,
+    "description": "Coffee",
+    "category": "food",
+    "date": "2024-12-01T08:00:00",
+}
+
+
+class TestTTLCache:
+
+    def test_expires_entries(self):
+        """Test entries are dropped once their TTL has passed"""
+        cache = TTLCache()
+        cache.set("a", b"1", ttl=0)
+        time.sleep(0.01)
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest entry is evicted past max_entries"""
+        cache = TTLCache(max_entries=2)
+        cache.set("a", b"1", ttl=60)
+        cache.set("b", b"2", ttl=60)
+        cache.get("a")
+        cache.set("c", b"3", ttl=60)
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+
+    def test_bump_version(self):
+        """Test bumping the version invalidates every entry"""
+        cache = TTLCache()
+        cache.set("a", b"1", ttl=60)
+        assert cache.bump_version() == 1
+        assert cache.get("a") is None
+
+    def test_workers_require_shared_cache(self, monkeypatch):
+        """Test several workers refuse to start on per-process caches"""
+        monkeypatch.setattr(cache_module, "CACHE_URL", "")
+        require_shared_cache(1)
+        with pytest.raises(RuntimeError, match="CACHE_URL"):
+            require_shared_cache(4)
+
+        monkeypatch.setattr(cache_module, "CACHE_URL", "redis://redis:6379/0")
+        require_shared_cache(4)
+
+
+class TestResponseCache:
+
+    def test_etag_not_modified(self, client: TestClient):
+        """Test revalidating with If-None-Match returns 304 until a write"""
+        client.post("/api/v1/transactions", json=TRANSACTION)
+
+        first = client.get("/api/v1/transactions")
+        etag = first.headers["ETag"]
+        revalidated = client.get(
+            "/api/v1/transactions", headers={"If-None-Match": etag}
+        )
+        assert revalidated.status_code == 304
+
+        client.post("/api/v1/transactions", json=TRANSACTION)
+        changed = client.get("/api/v1/transactions", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert len(changed.json()) == 2
+
+    def test_outside_writes_invalidate(self, client: TestClient, db_session):
+        """Test a write that bypasses the API still changes pages and ETags"""
+        client.post("/api/v1/transactions", json=TRANSACTION)
+        etag = client.get("/api/v1/transactions").headers["ETag"]
+
+        # As a seed script or psql would: no API route, no version bump.
+        db_session.add(
+            Transaction(
+                type=TransactionType.income,
+                amount=1000,
+                description="Salary",
+                category="salary",
+                date=datetime(2024, 12, 2),
+            )
+        )
+        db_session.commit()
+
+        changed = client.get("/api/v1/transactions", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert len(changed.json()) == 2
+        report = client.get("/api/v1/reports/by-type").json()
+        assert {row["type"] for row in report} == {"income", "expense"}
+
+    def test_etag_changes_across_restarts(self, client: TestClient):
+        """Test a tag issued before a restart is not answered with 304"""
+        client.post("/api/v1/transactions", json=TRANSACTION)
+        etag = client.get("/api/v1/transactions").headers["ETag"]
+
+        # A new process starts with a fresh in-process cache at version 0.
+        set_cache(TTLCache())
+        client.post("/api/v1/transactions", json=TRANSACTION)
+        restarted = client.get("/api/v1/transactions", headers={"If-None-Match": etag})
+        assert restarted.status_code == 200
+        assert restarted.headers["ETag"] != etag
+        assert len(restarted.json()) == 2
+
+    def test_delete_invalidates_list(self, client: TestClient):
+        """Test a cached page is not served after a delete"""
+        created = client.post("/api/v1/transactions", json=TRANSACTION).json()
+        assert len(client.get("/api/v1/transactions").json()) == 1
+
+        client.delete(f"/api/v1/transactions/{created['id']}")
+        assert client.get("/api/v1/transactions").status_code == 404
+
+    def test_redis_backend(self, client: TestClient):
+        """Test the Redis backend shares entries and the version counter"""
+        redis = FakeRedis()
+        set_cache(RedisCache(redis))
+
+        client.post("/api/v1/transactions", json=TRANSACTION)
+        cached = client.get("/api/v1/reports/by-type")
+        assert redis.data["finansi:data_version"] == 1
+        assert any(key.startswith("finansi:reports:v1.1:") for key in redis.data)
+
+        hit = client.get("/api/v1/reports/by-type")
+        assert hit.json() == cached.json()
+        assert hit.headers["ETag"] == cached.headers["ETag"]
+
+    def test_redis_calls_leave_the_event_loop(self, client: TestClient):
+        """Test the async routes call Redis in the threadpool"""
+        redis = FakeRedis()
+        set_cache(RedisCache(redis))
+
+        client.post("/api/v1/transactions", json=TRANSACTION)
+        client.get("/api/v1/reports/by-type")
+        client.get("/api/v1/reports/by-type")
+
+        assert redis.calls_on_loop
+        assert not any(redis.calls_on_loop)
@@ -0,0 +1,150 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from agent.models import record_model_response, start_model_timer
+from src.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_QUERY_DURATION,
+    DB_QUERY_ERRORS,
+    LLM_CALL_DURATION,
+    LLM_TOKENS,
+    Counter,
+    Histogram,
+    Registry,
+    instrument_engine,
+)
+
+
+def sample(metric, name: str, **labels) -> float:
+    """Value of the sample ``name`` whose labels include ``labels``, or 0."""
+    wanted = {(key, str(value)) for key, value in labels.items()}
+    for sample_name, sample_labels, value in metric.samples():
+        if sample_name == name and wanted <= set(sample_labels):
+            return value
+    return 0
+
+
+class TestExposition:
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histograms render cumulative buckets, count and sum"""
+        registry = Registry()
+        histogram = registry.register(
+            Histogram("job_seconds", "Job time.", buckets=(0.1, 1.0))
+        )
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, job="sync")
+
+        lines = registry.render().splitlines()
+        assert lines[:2] == [
+            "# HELP job_seconds Job time.",
+            "# TYPE job_seconds histogram",
+        ]
+        assert 'job_seconds_bucket{job="sync",le="0.1"} 1' in lines
+        assert 'job_seconds_bucket{job="sync",le="1.0"} 3' in lines
+        assert 'job_seconds_bucket{job="sync",le="+Inf"} 4' in lines
+        assert 'job_seconds_count{job="sync"} 4' in lines
+        assert 'job_seconds_sum{job="sync"} 4.05' in lines
+
+    def test_label_values_are_escaped(self):
+        """Test quotes, backslashes and newlines in label values are escaped"""
+        registry = Registry()
+        counter = registry.register(Counter("hits_total", "Hits."))
+        counter.inc(route='a"b\\c\nd')
+
+        assert 'hits_total{route="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+    def test_samples_carry_the_worker(self):
+        """Test every sample is labelled with the process that rendered it"""
+        registry = Registry(label_worker=True)
+        counter = registry.register(Counter("hits_total", "Hits."))
+        counter.inc(route="/")
+
+        assert f'hits_total{{worker="{os.getpid()}",route="/"}} 1' in registry.render()
+
+
+class TestInstrumentation:
+
+    def test_engine_statements_and_pool_are_recorded(self, tmp_path):
+        """Test statements, failures and checked-out connections are exported"""
+        engine = create_engine(f"sqlite:///{tmp_path}/metrics.db")
+        instrument_engine(engine, "metrics-test")
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+            assert (
+                sample(
+                    DB_POOL_CHECKED_OUT, "db_pool_checked_out", engine="metrics-test"
+                )
+                == 1
+            )
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+
+        assert (
+            sample(
+                DB_QUERY_DURATION,
+                "db_query_duration_seconds_count",
+                engine="metrics-test",
+            )
+            == 2
+        )
+        assert (
+            sample(DB_QUERY_ERRORS, "db_query_errors_total", engine="metrics-test") == 1
+        )
+        assert (
+            sample(DB_POOL_CHECKED_OUT, "db_pool_checked_out", engine="metrics-test")
+            == 0
+        )
+
+    def test_model_callbacks_record_latency_and_tokens(self):
+        """Test model calls are timed to their final response and tokens counted"""
+        context = SimpleNamespace(invocation_id="metrics-test")
+        calls = sample(LLM_CALL_DURATION, "llm_call_duration_seconds_count")
+        prompt = sample(LLM_TOKENS, "llm_tokens_total", kind="prompt")
+        cached = sample(LLM_TOKENS, "llm_tokens_total", kind="cached")
+
+        start_model_timer(context, None)
+        record_model_response(context, LlmResponse(partial=True))
+        record_model_response(
+            context,
+            LlmResponse(
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=120,
+                    candidates_token_count=30,
+                    cached_content_token_count=100,
+                )
+            ),
+        )
+
+        assert sample(LLM_CALL_DURATION, "llm_call_duration_seconds_count") == calls + 1
+        assert sample(LLM_TOKENS, "llm_tokens_total", kind="prompt") == prompt + 120
+        assert sample(LLM_TOKENS, "llm_tokens_total", kind="cached") == cached + 100
+
+
+class TestMetricsEndpoint:
+
+    def test_requests_are_timed_by_route(self, client):
+        """Test /metrics reports request latency labelled by route template"""
+        client.delete("/api/v1/transactions/12345")
+        client.get("/no-such-path")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert (
+            f'http_request_duration_seconds_count{{worker="{os.getpid()}",'
+            'method="DELETE",route="/api/v1/transactions/{transaction_id}",'
+            'status="404"}'
+        ) in body
+        assert 'route="unmatched"' in body
+        assert "/no-such-path" not in body
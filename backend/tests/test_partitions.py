@@ -0,0 +1,135 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, text
+
+from src.database.models import Transaction, TransactionType
+from src.database.partitions import (
+    archive_cutoff,
+    archive_partitions,
+    cold_months,
+    ensure_partitions,
+    is_partitioned,
+    migrate,
+    partition_month,
+    partition_name,
+)
+from tests.conftest import engine
+
+requires_postgres = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="partitioning needs PostgreSQL (set TEST_DATABASE_URL)",
+)
+
+
+def add_expense(when: date, amount: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Transaction).values(
+                type=TransactionType.expense,
+                amount=amount,
+                description="Makan",
+                category="Makanan",
+                date=datetime.combine(when, datetime.min.time()),
+            )
+        )
+
+
+def count(sql: str) -> int:
+    with engine.connect() as connection:
+        return connection.scalar(text(sql))
+
+
+class TestPartitions:
+
+    def test_partition_name_round_trips(self):
+        """Test partition names encode the month and parse back to its first day"""
+        assert partition_name(date(2025, 5, 31)) == "transactions_y2025m05"
+        assert partition_month("transactions_y2025m05") == date(2025, 5, 1)
+        assert partition_month("transactions_default") is None
+        assert partition_month("transactions_y2025m05_bounds") is None
+
+    def test_archive_cutoff_crosses_years(self):
+        """Test the cutoff is the first day of the oldest kept month"""
+        assert archive_cutoff(date(2025, 5, 18), 24) == date(2023, 5, 1)
+        assert archive_cutoff(date(2025, 1, 31), 1) == date(2024, 12, 1)
+        assert archive_cutoff(date(2025, 1, 31), 0) == date(2025, 1, 1)
+
+    def test_cold_months_skips_recent_and_default_partitions(self):
+        """Test only monthly partitions older than the cutoff are archived"""
+        names = [
+            "transactions_y2025m04",
+            "transactions_default",
+            "transactions_y2023m04",
+            "transactions_y2023m05",
+            "transactions_y2022m12",
+        ]
+
+        assert cold_months(names, date(2025, 5, 18), 24) == [
+            date(2022, 12, 1),
+            date(2023, 4, 1),
+        ]
+
+    def test_sqlite_is_never_partitioned(self):
+        """Test SQLite keeps the plain table and ensure_partitions is a no-op"""
+        with engine.begin() as connection:
+            assert not is_partitioned(connection)
+            assert ensure_partitions(connection) == []
+
+
+@requires_postgres
+class TestPartitionsOnPostgres:
+
+    @pytest.fixture
+    def partitioned(self, db_session):
+        yield
+        with engine.begin() as connection:
+            # The view depends on the table's row type; drop it before the
+            # fixture drops the tables.
+            connection.execute(text("DROP VIEW IF EXISTS transactions_archived"))
+            connection.execute(text("DROP TABLE IF EXISTS transactions_archive"))
+
+    def test_migrate_ensure_and_archive(self, partitioned):
+        """Test rows, totals and late rows survive migration and archival"""
+        today = date(2025, 5, 18)
+        for when, amount in (
+            (date(2023, 1, 10), 1000),
+            (date(2025, 4, 2), 5000),
+            (date(2025, 5, 1), 2000),
+        ):
+            add_expense(when, amount)
+
+        with engine.begin() as connection:
+            migrate(connection)
+            assert is_partitioned(connection)
+        assert count("SELECT count(*) FROM transactions_table") == 3
+        assert count("SELECT count(*) FROM transactions_y2023m01") == 1
+        assert count("SELECT total FROM transaction_totals") == 8000
+
+        # A month without a partition lands in the default partition until
+        # the next ensure run.
+        add_expense(date(2024, 2, 29), 700)
+        assert count("SELECT count(*) FROM transactions_default") == 1
+        with engine.begin() as connection:
+            created = ensure_partitions(connection, today=today)
+        assert "transactions_y2024m02" in created
+        assert count("SELECT count(*) FROM transactions_default") == 0
+
+        archived = archive_partitions(engine, keep_months=12, today=today)
+        assert archived == {date(2023, 1, 1): 1, date(2024, 2, 1): 1}
+        assert count("SELECT count(*) FROM transactions_table") == 2
+        assert count("SELECT count(*) FROM transactions_archived") == 2
+        assert count("SELECT total FROM transaction_totals") == 8700
+
+        # Back-dated into an archived month: archived again, appended.
+        add_expense(date(2023, 1, 20), 300)
+        archived = archive_partitions(engine, keep_months=12, today=today)
+        assert archived == {date(2023, 1, 1): 1}
+        assert count("SELECT count(*) FROM transactions_default") == 0
+        assert count("SELECT count(*) FROM transactions_archived") == 3
+        assert (
+            count(
+                "SELECT count(*) FROM transactions_archive WHERE month = '2023-01-01'"
+            )
+            == 2
+        )
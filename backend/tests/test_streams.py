@@ -0,0 +1,131 @@
+import asyncio
+
+from src.routes.agent import streams
+from src.streams import ERROR_DATA, HEARTBEAT_FRAME, ReplayStream, StreamRegistry
+
+
+async def collect(iterator) -> list[str]:
+    return [frame async for frame in iterator]
+
+
+class TestReplayStream:
+
+    def test_frames_carry_ids_and_resume_after_last_event_id(self):
+        """Test a subscriber resumes after the frame named by Last-Event-ID"""
+
+        async def scenario():
+            stream = ReplayStream()
+            for data in ("a", "b", "c"):
+                await stream.publish(data)
+            await stream.close()
+
+            frames = await collect(stream.subscribe())
+            last_seen = frames[0].split("\n")[0].removeprefix("id: ")
+            resumed = await collect(stream.subscribe(after=stream.position(last_seen)))
+            return stream, frames, resumed
+
+        stream, frames, resumed = asyncio.run(scenario())
+        assert frames == [
+            f"id: {stream.stream_id}-{index}\ndata: {data}\n\n"
+            for index, data in enumerate("abc")
+        ]
+        assert resumed == frames[1:]
+
+    def test_position_rejects_other_streams(self):
+        """Test ids from another stream or garbage do not resume"""
+        stream = ReplayStream()
+        assert stream.position("deadbeef-0") is None
+        assert stream.position("garbage") is None
+
+    def test_heartbeat_while_idle(self):
+        """Test a heartbeat comment is sent while no frame is ready"""
+
+        async def scenario():
+            stream = ReplayStream()
+            subscriber = stream.subscribe(heartbeat=0.01)
+            first = await anext(subscriber)
+            await stream.publish("a")
+            await stream.close()
+            return [first] + await collect(subscriber)
+
+        frames = asyncio.run(scenario())
+        assert frames[0] == HEARTBEAT_FRAME
+        assert frames[-1].endswith("data: a\n\n")
+
+    def test_turn_survives_disconnect(self):
+        """Test the producer keeps running after its subscriber goes away"""
+
+        async def scenario():
+            registry = StreamRegistry()
+
+            async def produce(stream):
+                for data in ("a", "b"):
+                    await asyncio.sleep(0.01)
+                    await stream.publish(data)
+
+            stream = registry.start("session", produce)
+            subscriber = stream.subscribe()
+            await anext(subscriber)
+            await subscriber.aclose()
+            await asyncio.sleep(0.05)
+            return stream
+
+        stream = asyncio.run(scenario())
+        assert stream.done
+        assert stream.frames == ["a", "b"]
+
+    def test_failed_turn_ends_with_an_error_frame(self):
+        """Test a producer that raises closes the stream with event: error"""
+
+        async def scenario():
+            registry = StreamRegistry()
+
+            async def produce(stream):
+                await stream.publish("a")
+                raise RuntimeError("model unavailable")
+
+            stream = registry.start("session", produce)
+            frames = await collect(stream.subscribe())
+            resumed = await collect(stream.subscribe(after=0))
+            return stream, frames, resumed
+
+        stream, frames, resumed = asyncio.run(scenario())
+        assert frames[-1] == (
+            f"id: {stream.stream_id}-1\nevent: error\ndata: {ERROR_DATA}\n\n"
+        )
+        assert resumed == frames[1:]
+
+
+class TestRunResume:
+    BODY = {
+        "session_id": "resume",
+        "new_message": {"role": "user", "parts": [{"text": "cek saldo"}]},
+    }
+
+    def test_resume_replays_missed_frames(self, client):
+        """Test a reconnect with Last-Event-ID replays frames without a new turn"""
+        stream = ReplayStream()
+        stream.frames = ['{"id": "1"}', '{"id": "2"}']
+        stream.done = True
+        stream.finished_at = float("inf")
+        streams._streams["resume"] = stream
+
+        response = client.post(
+            "/api/v1/run",
+            json=self.BODY,
+            headers={"Last-Event-ID": f"{stream.stream_id}-0"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.text == f'id: {stream.stream_id}-1\ndata: {{"id": "2"}}\n\n'
+
+    def test_unknown_last_event_id_returns_no_content(self, client):
+        """Test resuming a turn that is no longer buffered returns 204"""
+        response = client.post(
+            "/api/v1/run",
+            json={**self.BODY, "session_id": "gone"},
+            headers={"Last-Event-ID": "deadbeef-3"},
+        )
+
+        assert response.status_code == 204
@@ -0,0 +1,95 @@
+from datetime import date
+
+import numpy as np
+from sqlalchemy import func, select
+
+from src.database.models import Transaction, TransactionTotal
+from src.database.synthetic import (
+    EXPENSE_CATEGORIES,
+    LEBARAN,
+    SyntheticConfig,
+    generate_batches,
+    load_batch,
+)
+
+CONFIG = SyntheticConfig(
+    rows=60_000, users=20, start=date(2024, 1, 1), days=366, seed=7, batch_size=25_000
+)
+
+
+def generate(config: SyntheticConfig = CONFIG) -> list:
+    return list(generate_batches(config))
+
+
+def column(batches: list, name: str) -> np.ndarray:
+    return np.concatenate([getattr(batch, name) for batch in batches])
+
+
+class TestSyntheticGenerator:
+
+    def test_is_deterministic_and_exact(self):
+        """Test the same config yields the same rows, in batches of the set size"""
+        batches = generate()
+
+        assert sum(len(batch) for batch in batches) == CONFIG.rows
+        assert max(len(batch) for batch in batches) <= CONFIG.batch_size
+        assert np.array_equal(column(batches, "amount"), column(generate(), "amount"))
+
+        other = SyntheticConfig(**{**CONFIG.__dict__, "seed": 8})
+        assert not np.array_equal(
+            column(batches, "amount"), column(generate(other), "amount")
+        )
+
+    def test_rows_stay_in_the_period_and_categories(self):
+        """Test dates, types, categories and amounts are all valid"""
+        batches = generate()
+        dates = column(batches, "date")
+        categories = set(column(batches, "category"))
+
+        assert dates.min() >= np.datetime64("2024-01-01")
+        assert dates.max() < np.datetime64("2025-01-01")
+        assert set(column(batches, "type")) == {"income", "expense"}
+        assert categories <= set(EXPENSE_CATEGORIES) | {
+            "Gaji",
+            "Bonus",
+            "Sampingan",
+            "Tempat Tinggal",
+        }
+        assert (column(batches, "amount") >= 500).all()
+
+    def test_salary_and_thr_recur_per_user(self):
+        """Test every user is paid monthly and gets THR before Lebaran"""
+        batches = generate()
+        categories = column(batches, "category")
+        dates = column(batches, "date")
+
+        assert (categories == "Gaji").sum() == CONFIG.users * 12
+        thr = dates[categories == "Bonus"].astype("datetime64[D]")
+        lebaran = np.datetime64(next(day for day in LEBARAN if day.startswith("2024")))
+        assert len(thr) == CONFIG.users
+        assert (thr == lebaran - 14).all()
+
+    def test_spending_follows_paydays_and_lebaran(self):
+        """Test spending is denser after paydays and around Lebaran"""
+        batches = generate()
+        expenses = column(batches, "date")[column(batches, "type") == "expense"]
+        days = expenses.astype("datetime64[D]")
+        day_of_month = (days - days.astype("datetime64[M]")).astype(int) + 1
+        per_day = np.bincount(day_of_month, minlength=32)[1:29]
+
+        # Days 25-28 (just after the usual payday) vs. days 18-21.
+        assert per_day[24:28].sum() > 1.3 * per_day[17:21].sum()
+
+        lebaran = np.datetime64("2024-04-10")
+        lebaran_week = ((days >= lebaran - 3) & (days <= lebaran + 3)).sum() / 7
+        assert lebaran_week > 1.3 * len(days) / CONFIG.days
+
+    def test_load_batch_keeps_totals_in_sync(self, db_session):
+        """Test loaded batches reach the table and the totals triggers"""
+        config = SyntheticConfig(rows=3_000, users=5, batch_size=1_000)
+        connection = db_session.connection()
+        loaded = sum(load_batch(connection, batch) for batch in generate(config))
+
+        assert loaded == 3_000
+        assert db_session.scalar(select(func.count(Transaction.id))) == 3_000
+        assert db_session.scalar(select(func.sum(TransactionTotal.count))) == 3_000
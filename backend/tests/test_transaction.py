@@ -1,8 +1,17 @@
+import csv
+import io
+import json
 from datetime import datetime
 
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 
-from src.database.models import Transaction, TransactionType
+from src.database.models import (
+    Transaction,
+    TransactionMonthlyTotal,
+    TransactionTotal,
+    TransactionType,
+)
 
 
 class TestTransactionEndpoints:
@@ -27,6 +36,29 @@ class TestTransactionEndpoints:
         assert data["category"] == "salary"
         assert "id" in data
 
+    def test_create_transaction_with_offset(self, client: TestClient, db_session):
+        """Test dates with a UTC offset are stored as naive WIB"""
+        transaction_data = {
+            "type": "expense",
+            "amount": 1000,
+            "description": "Lunch",
+            "category": "food",
+            "date": "2024-05-01T10:00:00+07:00",
+        }
+
+        response = client.post("/api/v1/transactions", json=transaction_data)
+        assert response.status_code == 200
+        assert response.json()["date"] == "2024-05-01T10:00:00"
+
+        transaction_data["date"] = "2024-05-01T03:00:00Z"
+        response = client.post(
+            "/api/v1/transactions/bulk", json=[transaction_data, transaction_data]
+        )
+        assert response.json() == {"inserted": 2, "errors": []}
+        assert {row.date for row in db_session.query(Transaction)} == {
+            datetime(2024, 5, 1, 10)
+        }
+
     def test_create_transaction_invalid_type(self, client: TestClient):
         """Test transaction creation with invalid type"""
         transaction_data = {
@@ -296,8 +328,10 @@ class TestTransactionEndpoints:
         edge_cases = [
             {"amount": 0, "expected_status": 200},  # Zero amount
             {"amount": 1, "expected_status": 200},  # Minimum positive
-            {"amount": 999999999999, "expected_status": 200},  # Very large amount (BigInteger supports this)
-            {"amount": -999999999999, "expected_status": 200},  # Very large negative amount
+            # Very large amount (BigInteger supports this)
+            {"amount": 999999999999, "expected_status": 200},
+            # Very large negative amount
+            {"amount": -999999999999, "expected_status": 200},
         ]
 
         for case in edge_cases:
@@ -333,3 +367,362 @@ class TestTransactionEndpoints:
 
             response = client.post("/api/v1/transactions", json=transaction_data)
             assert response.status_code == 200
+
+    def test_get_transactions_keyset_pagination(self, client: TestClient, db_session):
+        """Test walking every page with the next cursor header"""
+        for day in range(1, 6):
+            db_session.add(
+                Transaction(
+                    type=TransactionType.expense,
+                    amount=day * 100,
+                    description=f"Day {day}",
+                    category="food",
+                    date=datetime(2024, 12, day),
+                    created_at=datetime.now(),
+                )
+            )
+        db_session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/v1/transactions", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(item["description"] for item in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert seen == ["Day 5", "Day 4", "Day 3", "Day 2", "Day 1"]
+
+    def test_get_transactions_filters(self, client: TestClient, db_session):
+        """Test filtering by type, category, date range and amount range"""
+        db_session.add_all(
+            [
+                Transaction(
+                    type=TransactionType.income,
+                    amount=5000,
+                    description="Salary",
+                    category="salary",
+                    date=datetime(2024, 11, 30),
+                    created_at=datetime.now(),
+                ),
+                Transaction(
+                    type=TransactionType.expense,
+                    amount=300,
+                    description="Lunch",
+                    category="food",
+                    date=datetime(2024, 12, 2),
+                    created_at=datetime.now(),
+                ),
+                Transaction(
+                    type=TransactionType.expense,
+                    amount=900,
+                    description="Dinner",
+                    category="food",
+                    date=datetime(2024, 12, 3),
+                    created_at=datetime.now(),
+                ),
+            ]
+        )
+        db_session.commit()
+
+        response = client.get("/api/v1/transactions", params={"type": "expense"})
+        assert [t["description"] for t in response.json()] == ["Dinner", "Lunch"]
+
+        response = client.get(
+            "/api/v1/transactions",
+            params={
+                "category": "food",
+                "start_date": "2024-12-01T00:00:00",
+                "end_date": "2024-12-03T00:00:00",
+            },
+        )
+        assert [t["description"] for t in response.json()] == ["Lunch"]
+
+        response = client.get(
+            "/api/v1/transactions", params={"min_amount": 500, "max_amount": 1000}
+        )
+        assert [t["description"] for t in response.json()] == ["Dinner"]
+        assert "X-Next-Cursor" not in response.headers
+
+        response = client.get("/api/v1/transactions", params={"category": "rent"})
+        assert response.status_code == 404
+
+    def test_get_transactions_invalid_cursor(self, client: TestClient):
+        """Test listing with a malformed cursor"""
+        response = client.get("/api/v1/transactions", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_get_transactions_invalid_limit(self, client: TestClient):
+        """Test listing with an out-of-range page size"""
+        response = client.get("/api/v1/transactions", params={"limit": 0})
+        assert response.status_code == 422
+
+    def test_export_transactions_ndjson(self, client: TestClient, db_session):
+        """Test streaming every matching transaction as NDJSON"""
+        db_session.add_all(
+            [
+                Transaction(
+                    type=TransactionType.expense if i % 2 else TransactionType.income,
+                    amount=i,
+                    description=f"Row {i}",
+                    category="misc",
+                    date=datetime(2024, 12, 1 + i % 28),
+                    created_at=datetime.now(),
+                )
+                for i in range(30)
+            ]
+        )
+        db_session.commit()
+
+        response = client.get("/api/v1/transactions/export", params={"type": "expense"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 15
+        assert {row["type"] for row in rows} == {"expense"}
+
+    def test_export_transactions_csv(self, client: TestClient, db_session):
+        """Test streaming transactions as CSV with a header row"""
+        db_session.add(
+            Transaction(
+                type=TransactionType.income,
+                amount=1000,
+                description="Salary, December",
+                category="salary",
+                date=datetime(2024, 12, 1),
+                created_at=datetime.now(),
+            )
+        )
+        db_session.commit()
+
+        response = client.get("/api/v1/transactions/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["description"] == "Salary, December"
+        assert rows[0]["type"] == "income"
+        assert rows[0]["amount"] == "1000"
+
+    def test_bulk_create_transactions_json(self, client: TestClient, db_session):
+        """Test bulk creation from a JSON array with per-row errors"""
+        payload = [
+            {
+                "type": "income",
+                "amount": 1000,
+                "description": "Salary",
+                "category": "salary",
+                "date": "2024-12-01T00:00:00",
+            },
+            {
+                "type": "invalid_type",
+                "amount": 10,
+                "description": "Bad type",
+                "category": "test",
+                "date": "2024-12-01T00:00:00",
+            },
+            {
+                "type": "expense",
+                "amount": "not_a_number",
+                "description": "Bad amount",
+                "category": "test",
+                "date": "2024-12-01T00:00:00",
+            },
+            {
+                "type": "expense",
+                "amount": 300,
+                "description": "Rent",
+                "category": "housing",
+                "date": "2024-12-02T00:00:00",
+            },
+        ]
+
+        response = client.post("/api/v1/transactions/bulk", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["inserted"] == 2
+        assert [error["index"] for error in data["errors"]] == [1, 2]
+        assert data["errors"][1]["errors"][0].startswith("amount")
+        assert db_session.query(Transaction).count() == 2
+
+    def test_bulk_create_transactions_csv_upload(self, client: TestClient, db_session):
+        """Test bulk creation from an uploaded CSV file"""
+        content = (
+            "type,amount,description,category,date\n"
+            "income,1000,Salary,salary,2024-12-01T00:00:00\n"
+            'expense,25,"Coffee, large",food,2024-12-02T08:00:00\n'
+            "expense,25,Missing date,food,\n"
+        )
+
+        response = client.post(
+            "/api/v1/transactions/bulk",
+            files={"file": ("statement.csv", content, "text/csv")},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["inserted"] == 2
+        assert [error["index"] for error in data["errors"]] == [2]
+
+        descriptions = {t.description for t in db_session.query(Transaction).all()}
+        assert descriptions == {"Salary", "Coffee, large"}
+
+    def test_bulk_create_transactions_not_a_list(self, client: TestClient):
+        """Test bulk creation with a JSON object instead of an array"""
+        response = client.post("/api/v1/transactions/bulk", json={"type": "income"})
+        assert response.status_code == 400
+
+    def test_totals_follow_inserts_and_deletes(self, client: TestClient, db_session):
+        """Test the aggregate tables track creates, bulk loads and deletes"""
+        created = client.post(
+            "/api/v1/transactions",
+            json={
+                "type": "expense",
+                "amount": 250,
+                "description": "Coffee",
+                "category": "food",
+                "date": "2024-12-01T08:00:00",
+            },
+        ).json()
+        client.post(
+            "/api/v1/transactions/bulk",
+            json=[
+                {
+                    "type": "income",
+                    "amount": 1000,
+                    "description": "Salary",
+                    "category": "salary",
+                    "date": "2024-12-01T00:00:00",
+                },
+                {
+                    "type": "expense",
+                    "amount": 50,
+                    "description": "Snack",
+                    "category": "food",
+                    "date": "2024-12-15T00:00:00",
+                },
+            ],
+        )
+
+        totals = {
+            t.type: (t.total, t.count) for t in db_session.query(TransactionTotal)
+        }
+        assert totals == {
+            TransactionType.income: (1000, 1),
+            TransactionType.expense: (300, 2),
+        }
+        food = (
+            db_session.query(TransactionMonthlyTotal)
+            .filter(TransactionMonthlyTotal.category == "food")
+            .one()
+        )
+        assert food.month.isoformat() == "2024-12-01"
+        assert (food.total, food.count) == (300, 2)
+
+        client.delete(f"/api/v1/transactions/{created['id']}")
+        db_session.expire_all()
+
+        expense = db_session.get(TransactionTotal, TransactionType.expense)
+        assert (expense.total, expense.count) == (50, 1)
+
+
+class TestReportEndpoints:
+
+    def _seed(self, db_session):
+        rows = [
+            ("income", 5000, "salary", datetime(2024, 11, 25)),
+            ("expense", 300, "food", datetime(2024, 11, 30)),
+            ("expense", 200, "food", datetime(2024, 12, 2)),
+            ("expense", 700, "rent", datetime(2024, 12, 3)),
+            ("income", 5000, "salary", datetime(2024, 12, 25)),
+        ]
+        db_session.add_all(
+            Transaction(
+                type=TransactionType(kind),
+                amount=amount,
+                description=category.title(),
+                category=category,
+                date=date,
+                created_at=datetime.now(),
+            )
+            for kind, amount, category, date in rows
+        )
+        db_session.commit()
+
+    def test_report_by_category(self, client: TestClient, db_session):
+        """Test totals grouped by category within a date range"""
+        self._seed(db_session)
+
+        response = client.get(
+            "/api/v1/reports/by-category",
+            params={"type": "expense", "start_date": "2024-12-01T00:00:00"},
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"category": "rent", "type": "expense", "total": 700, "count": 1},
+            {"category": "food", "type": "expense", "total": 200, "count": 1},
+        ]
+
+    def test_report_by_period(self, client: TestClient, db_session):
+        """Test totals grouped by calendar month and week"""
+        self._seed(db_session)
+
+        response = client.get("/api/v1/reports/by-period", params={"type": "expense"})
+        assert response.status_code == 200
+        assert response.json() == [
+            {"period": "2024-11-01", "type": "expense", "total": 300, "count": 1},
+            {"period": "2024-12-01", "type": "expense", "total": 900, "count": 2},
+        ]
+
+        response = client.get(
+            "/api/v1/reports/by-period",
+            params={"granularity": "week", "category": "food"},
+        )
+        # 2024-11-30 is a Saturday and 2024-12-02 a Monday
+        assert [row["period"] for row in response.json()] == [
+            "2024-11-25",
+            "2024-12-02",
+        ]
+
+    def test_report_by_type(self, client: TestClient, db_session):
+        """Test totals grouped by transaction type"""
+        self._seed(db_session)
+
+        response = client.get("/api/v1/reports/by-type")
+        assert response.status_code == 200
+        totals = {row["type"]: (row["total"], row["count"]) for row in response.json()}
+        assert totals == {"income": (10000, 2), "expense": (1200, 3)}
+
+        response = client.get("/api/v1/reports/by-type", params={"category": "food"})
+        assert response.json() == [
+            {"type": "expense", "total": 500, "count": 2},
+        ]
+
+    def test_report_by_type_reads_running_totals(self, client: TestClient, db_session):
+        """Test the unfiltered report comes from transaction_totals"""
+        self._seed(db_session)
+        db_session.execute(
+            update(TransactionTotal)
+            .where(TransactionTotal.type == TransactionType.income)
+            .values(total=1)
+        )
+        db_session.commit()
+
+        response = client.get("/api/v1/reports/by-type")
+        assert {row["type"]: row["total"] for row in response.json()} == {
+            "income": 1,
+            "expense": 1200,
+        }
+
+    def test_report_invalid_granularity(self, client: TestClient):
+        """Test period report with an unsupported granularity"""
+        response = client.get(
+            "/api/v1/reports/by-period", params={"granularity": "year"}
+        )
+        assert response.status_code == 422
@@ -4,22 +4,41 @@ import { useState, useEffect } from "react";
 
 import { Card, CardContent } from "@/components/ui/card";
 
-import { getTransactions, TransactionResponse } from "@/lib/actions";
+import {
+  CategoryReport,
+  getCategoryReport,
+  getTransactions,
+  getTypeReport,
+  TransactionResponse,
+  TypeReport,
+} from "@/lib/actions";
 import Loading from "@/components/loading";
 import Cards from "@/components/cards";
 import TabsAnalytics from "@/components/tabs-analytics";
 import SidebarLayout from "@/components/sidebar-layout";
 
+// The overview tab lists only the newest rows; everything else is aggregated
+// by the /reports endpoints.
+const RECENT_TRANSACTIONS = 3;
+
 export default function AnalyticsPage() {
   const [transactions, setTransactions] = useState<TransactionResponse[]>([]);
+  const [totals, setTotals] = useState<TypeReport[]>([]);
+  const [categories, setCategories] = useState<CategoryReport[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const fetchTransactions = async () => {
       try {
         setLoading(true);
-        const data = await getTransactions();
-        setTransactions(data);
+        const [recent, typeReport, categoryReport] = await Promise.all([
+          getTransactions(null, RECENT_TRANSACTIONS),
+          getTypeReport(),
+          getCategoryReport(),
+        ]);
+        setTransactions(recent.items);
+        setTotals(typeReport);
+        setCategories(categoryReport);
       } catch (error) {
         console.error("Error fetching transactions:", error);
       } finally {
@@ -59,9 +78,13 @@ export default function AnalyticsPage() {
       breadcrumbs={[{ title: "Dashboard", href: "/" }, { title: "Analitik" }]}
     >
       <div className="space-y-6">
-        <Cards transactions={transactions} />
+        <Cards totals={totals} />
 
-        <TabsAnalytics transactions={transactions} />
+        <TabsAnalytics
+          totals={totals}
+          categories={categories}
+          recentTransactions={transactions}
+        />
       </div>
     </SidebarLayout>
   );
@@ -1,21 +1,25 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef, useCallback } from "react";
 import Loading from "@/components/loading";
 import SidebarLayout from "@/components/sidebar-layout";
 import ChatHistoryCards from "@/components/chat-history-cards";
-import { ChatSession, getChatHistory } from "@/lib/actions";
+import { ChatSessionSummary, getChatHistory } from "@/lib/actions";
 
 export default function ChatHistoryPage() {
-  const [chatHistory, setChatHistory] = useState<ChatSession[]>([]);
+  const [chatHistory, setChatHistory] = useState<ChatSessionSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const endRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
     async function fetchChatHistory() {
       try {
         setLoading(true);
-        const history = await getChatHistory();
-        setChatHistory(history);
+        const page = await getChatHistory();
+        setChatHistory(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("Error fetching chat history:", err);
       } finally {
@@ -26,10 +30,39 @@ export default function ChatHistoryPage() {
     fetchChatHistory();
   }, []);
 
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const page = await getChatHistory(nextCursor);
+      setChatHistory((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching chat history:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor, loadingMore]);
+
+  // Fetch the next page once the end of the list scrolls into view.
+  useEffect(() => {
+    const end = endRef.current;
+    if (!end || !nextCursor) return;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        loadMore();
+      }
+    });
+    observer.observe(end);
+    return () => observer.disconnect();
+  }, [nextCursor, loadMore]);
+
   return (
     <SidebarLayout
       header="Riwayat Chat"
-      description={`${chatHistory.length} percakapan tersimpan`}
+      description={`${chatHistory.length}${
+        nextCursor ? "+" : ""
+      } percakapan tersimpan`}
       breadcrumbs={[
         { title: "Dashboard", href: "/" },
         { title: "Chat", href: "/chat" },
@@ -39,7 +72,11 @@ export default function ChatHistoryPage() {
       {loading ? (
         <Loading description="Memuat histori" />
       ) : (
-        <ChatHistoryCards chatHistory={chatHistory} />
+        <>
+          <ChatHistoryCards chatHistory={chatHistory} />
+          <div ref={endRef} />
+          {loadingMore && <Loading description="Memuat histori" />}
+        </>
       )}
     </SidebarLayout>
   );
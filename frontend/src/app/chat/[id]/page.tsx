@@ -25,10 +25,18 @@ export default function FinancialChat() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const scrollAreaRef = useRef<HTMLDivElement>(null);
+  // Older history is prepended; only new messages should scroll to the end.
+  const keepScrollRef = useRef(false);
 
   useEffect(() => {
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     if (messagesEndRef.current) {
       messagesEndRef.current.scrollIntoView({
         behavior: "smooth",
@@ -37,22 +45,19 @@ export default function FinancialChat() {
     }
   }, [messages]);
 
+  const withoutToolEvents = (events: Message[]) =>
+    events.filter((event) => {
+      return !event.content?.parts?.some(
+        (part) => part.functionCall || part.functionResponse
+      );
+    });
+
   useEffect(() => {
     const fecthSession = async () => {
       try {
         const session = await getSession(chatId as string);
-        if (session && session.length > 0) {
-          console.log("Fetched session:", session);
-          const filteredEvents = session.filter((event) => {
-            return !event.content?.parts?.some(
-              (part) => part.functionCall || part.functionResponse
-            );
-          });
-
-          setMessages(filteredEvents);
-        } else {
-          setMessages([]);
-        }
+        setMessages(withoutToolEvents(session.items));
+        setOlderCursor(session.nextCursor);
       } catch (error) {
         console.error("Error fetching session:", error);
       }
@@ -60,6 +65,21 @@ export default function FinancialChat() {
     fecthSession();
   }, [chatId]);
 
+  const loadOlderMessages = async () => {
+    if (!olderCursor || loadingOlder) return;
+    setLoadingOlder(true);
+    try {
+      const session = await getSession(chatId as string, olderCursor);
+      keepScrollRef.current = true;
+      setMessages((prev) => [...withoutToolEvents(session.items), ...prev]);
+      setOlderCursor(session.nextCursor);
+    } catch (error) {
+      console.error("Error fetching session:", error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!input.trim()) return;
@@ -90,12 +110,7 @@ export default function FinancialChat() {
         streaming: false,
       });
 
-      const filteredEvents = events.filter((event) => {
-        return !event.content?.parts?.some(
-          (part) => part.functionCall || part.functionResponse
-        );
-      });
-      setMessages((prev) => [...prev, ...filteredEvents]);
+      setMessages((prev) => [...prev, ...withoutToolEvents(events)]);
       setIsLoading(false);
     } catch (error) {
       console.error("Error sending message:", error);
@@ -129,6 +144,18 @@ export default function FinancialChat() {
           <ScrollArea className="h-full w-full" ref={scrollAreaRef}>
             <div className="p-4">
               <div className="space-y-6 sm:max-w-4xl mx-auto">
+                {olderCursor && (
+                  <div className="flex justify-center">
+                    <Button
+                      variant="ghost"
+                      size="sm"
+                      onClick={loadOlderMessages}
+                      disabled={loadingOlder}
+                    >
+                      {loadingOlder ? "Memuat..." : "Muat pesan sebelumnya"}
+                    </Button>
+                  </div>
+                )}
                 {messages.map((message) => (
                   <div
                     key={message.id}
@@ -2,22 +2,29 @@
 
 import { Overview } from "@/components/overview";
 import SidebarLayout from "@/components/sidebar-layout";
-import { getTransactions } from "@/lib/actions";
+import { getTransactions, getTypeReport } from "@/lib/actions";
 import { useState, useEffect } from "react";
-import type { TransactionResponse } from "@/lib/actions";
+import type { TransactionResponse, TypeReport } from "@/lib/actions";
 import Loading from "@/components/loading";
 
+// Only the newest few rows are listed; the cards use the running totals.
+const RECENT_TRANSACTIONS = 5;
+
 export default function Dashboard() {
   const [transactions, setTransactions] = useState<TransactionResponse[]>([]);
+  const [totals, setTotals] = useState<TypeReport[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     async function fetchTransactions() {
       try {
         setLoading(true);
-        const apiTransactions = await getTransactions();
+        const [recent, report] = await Promise.all([
+          getTransactions(null, RECENT_TRANSACTIONS),
+          getTypeReport(),
+        ]);
 
-        const formattedTransactions = apiTransactions.map((transaction) => ({
+        const formattedTransactions = recent.items.map((transaction) => ({
           id: transaction.id,
           type: transaction.type,
           amount: transaction.amount,
@@ -28,6 +35,7 @@ export default function Dashboard() {
         }));
 
         setTransactions(formattedTransactions);
+        setTotals(report);
       } catch (err) {
         console.error("Failed to fetch transactions:", err);
       } finally {
@@ -43,7 +51,7 @@ export default function Dashboard() {
       {loading ? (
         <Loading description="Memuat data transaksi..." />
       ) : (
-        <Overview transactions={transactions} />
+        <Overview totals={totals} recentTransactions={transactions} />
       )}
     </SidebarLayout>
   );
@@ -35,7 +35,9 @@ import TableTransaction from "@/components/table-transaction";
 
 export default function TransactionsPage() {
   const [transactions, setTransactions] = useState<TransactionResponse[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
 
@@ -54,8 +56,9 @@ export default function TransactionsPage() {
   const loadTransactions = async () => {
     try {
       setLoading(true);
-      const data = await getTransactions();
-      setTransactions(data);
+      const page = await getTransactions();
+      setTransactions(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Failed to load transactions:", error);
       alert("Failed to load transactions");
@@ -64,6 +67,21 @@ export default function TransactionsPage() {
     }
   };
 
+  const loadMoreTransactions = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await getTransactions(nextCursor);
+      setTransactions((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to load transactions:", error);
+      toast.error("Gagal memuat transaksi");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
 
@@ -163,7 +181,8 @@ export default function TransactionsPage() {
             <CardHeader>
               <CardTitle>Semua Transaksi</CardTitle>
               <CardDescription>
-                {transactions.length} transaksi ditemukan
+                {transactions.length}
+                {nextCursor ? "+" : ""} transaksi ditemukan
               </CardDescription>
             </CardHeader>
             <CardContent>
@@ -179,10 +198,23 @@ export default function TransactionsPage() {
                   </p>
                 </div>
               ) : (
-                <TableTransaction
-                  transactions={transactions}
-                  loadTransactions={loadTransactions}
-                />
+                <>
+                  <TableTransaction
+                    transactions={transactions}
+                    loadTransactions={loadTransactions}
+                  />
+                  {nextCursor && (
+                    <div className="flex justify-center pt-4">
+                      <Button
+                        variant="outline"
+                        onClick={loadMoreTransactions}
+                        disabled={loadingMore}
+                      >
+                        {loadingMore ? "Memuat..." : "Muat lebih banyak"}
+                      </Button>
+                    </div>
+                  )}
+                </>
               )}
             </CardContent>
           </Card>
@@ -1,20 +1,11 @@
 import { Banknote, PieChart, TrendingDown, TrendingUp } from "lucide-react";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
-import { Transaction } from "@/lib/actions";
-import { formatCurrency } from "@/lib/utils";
+import { TypeReport } from "@/lib/actions";
+import { formatCurrency, summarizeTotals } from "@/lib/utils";
 import { Progress } from "./ui/progress";
 
-export default function Cards({
-  transactions,
-}: {
-  transactions: Transaction[];
-}) {
-  const totalIncome = transactions
-    .filter((t) => t.type === "income")
-    .reduce((sum, t) => sum + t.amount, 0);
-  const totalExpenses = transactions
-    .filter((t) => t.type === "expense")
-    .reduce((sum, t) => sum + t.amount, 0);
+export default function Cards({ totals }: { totals: TypeReport[] }) {
+  const { totalIncome, totalExpenses } = summarizeTotals(totals);
   const netBalance = totalIncome - totalExpenses;
   const savingsRate = totalIncome > 0 ? (netBalance / totalIncome) * 100 : 0;
 
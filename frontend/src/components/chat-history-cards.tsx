@@ -7,13 +7,13 @@ import {
 } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
-import type { ChatSession } from "@/lib/actions";
+import type { ChatSessionSummary } from "@/lib/actions";
 import Link from "next/link";
 
 export default function ChatHistoryCards({
   chatHistory,
 }: {
-  chatHistory: ChatSession[];
+  chatHistory: ChatSessionSummary[];
 }) {
   const handleDeleteChat = (chatId: string) => {
     console.log("Menghapus chat:", chatId);
@@ -61,66 +61,64 @@ export default function ChatHistoryCards({
       ) : (
         <div className="space-y-6">
           <div className="grid gap-4">
-            {chatHistory
-              .sort((a, b) => b.lastUpdateTime - a.lastUpdateTime)
-              .map((chat) => (
-                <Card
-                  key={chat?.id}
-                  className="group border bg-white overflow-hidden"
-                >
-                  <CardContent className="p-0">
-                    <div className="px-6">
-                      <div className="flex items-start justify-between gap-4">
-                        <div className="flex-1 min-w-0">
-                          <div className="flex items-start gap-4">
-                            <div className=" rounded-xl p-3 flex-shrink-0">
-                              <MessageSquare className="w-5 h-5" />
-                            </div>
-                            <div className="flex-1 min-w-0">
-                              {chat.appName ? (
-                                <h3 className="font-semibold text-gray-900 mb-1 leading-tight">
-                                  {chat.appName}
-                                </h3>
-                              ) : (
-                                <h3 className="font-medium text-gray-500 mb-1 italic">
-                                  Tidak ada ringkasan tersedia
-                                </h3>
-                              )}
+            {chatHistory.map((chat) => (
+              <Card
+                key={chat?.id}
+                className="group border bg-white overflow-hidden"
+              >
+                <CardContent className="p-0">
+                  <div className="px-6">
+                    <div className="flex items-start justify-between gap-4">
+                      <div className="flex-1 min-w-0">
+                        <div className="flex items-start gap-4">
+                          <div className=" rounded-xl p-3 flex-shrink-0">
+                            <MessageSquare className="w-5 h-5" />
+                          </div>
+                          <div className="flex-1 min-w-0">
+                            {chat.title ? (
+                              <h3 className="font-semibold text-gray-900 mb-1 leading-tight">
+                                {chat.title}
+                              </h3>
+                            ) : (
+                              <h3 className="font-medium text-gray-500 mb-1 italic">
+                                Tidak ada ringkasan tersedia
+                              </h3>
+                            )}
 
-                              <div className="flex items-center gap-2 text-sm text-gray-500">
-                                <Clock className="w-4 h-4" />
-                                <span className="font-medium">
-                                  {formatTimestamp(chat.lastUpdateTime)}
-                                </span>
-                              </div>
+                            <div className="flex items-center gap-2 text-sm text-gray-500">
+                              <Clock className="w-4 h-4" />
+                              <span className="font-medium">
+                                {formatTimestamp(chat.lastUpdateTime)}
+                              </span>
                             </div>
                           </div>
                         </div>
+                      </div>
 
-                        <div className="flex items-center gap-2 flex-shrink-0">
-                          <Link href={`/chat/${chat.id}`}>
-                            <Button
-                              className="text-white font-medium shadow-md hover:shadow-lg transition-all duration-200 group/btn"
-                              size="sm"
-                            >
-                              <span className="mr-2">Lanjutkan</span>
-                              <ArrowRight className="w-4 h-4" />
-                            </Button>
-                          </Link>
+                      <div className="flex items-center gap-2 flex-shrink-0">
+                        <Link href={`/chat/${chat.id}`}>
                           <Button
-                            onClick={() => handleDeleteChat(chat.id)}
-                            variant="ghost"
+                            className="text-white font-medium shadow-md hover:shadow-lg transition-all duration-200 group/btn"
                             size="sm"
-                            className="text-gray-400 "
                           >
-                            <Trash2 className="w-4 h-4" />
+                            <span className="mr-2">Lanjutkan</span>
+                            <ArrowRight className="w-4 h-4" />
                           </Button>
-                        </div>
+                        </Link>
+                        <Button
+                          onClick={() => handleDeleteChat(chat.id)}
+                          variant="ghost"
+                          size="sm"
+                          className="text-gray-400 "
+                        >
+                          <Trash2 className="w-4 h-4" />
+                        </Button>
                       </div>
                     </div>
-                  </CardContent>
-                </Card>
-              ))}
+                  </div>
+                </CardContent>
+              </Card>
+            ))}
           </div>
         </div>
       )}
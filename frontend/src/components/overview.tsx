@@ -5,28 +5,22 @@ import {
   CardHeader,
   CardTitle,
 } from "@/components/ui/card";
-import { TransactionResponse } from "@/lib/actions";
+import { TransactionResponse, TypeReport } from "@/lib/actions";
+import { summarizeTotals } from "@/lib/utils";
 import { TrendingUp, TrendingDown, DollarSign, Activity } from "lucide-react";
 
 export function Overview({
-  transactions,
+  totals,
+  recentTransactions,
 }: {
-  transactions: TransactionResponse[];
+  totals: TypeReport[];
+  recentTransactions: TransactionResponse[];
 }) {
-  const totalIncome = transactions
-    .filter((t) => t.type === "income")
-    .reduce((sum, t) => sum + t.amount, 0);
-
-  const totalExpenses = transactions
-    .filter((t) => t.type === "expense")
-    .reduce((sum, t) => sum + t.amount, 0);
+  const { totalIncome, totalExpenses, incomeCount, expenseCount } =
+    summarizeTotals(totals);
 
   const balance = totalIncome - totalExpenses;
 
-  const recentTransactions = transactions
-    .sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
-    .slice(0, 5);
-
   const formatNumber = (number: number) => {
     return number.toString().replace(/\B(?=(\d{3})+(?!\d))/g, ".");
   };
@@ -65,8 +59,7 @@ export function Overview({
               Rp {formatNumber(totalIncome)}
             </div>
             <p className="text-xs text-muted-foreground">
-              Dari {transactions.filter((t) => t.type === "income").length}{" "}
-              transaksi
+              Dari {incomeCount} transaksi
             </p>
           </CardContent>
         </Card>
@@ -83,8 +76,7 @@ export function Overview({
               Rp {formatNumber(totalExpenses)}
             </div>
             <p className="text-xs text-muted-foreground">
-              Dari {transactions.filter((t) => t.type === "expense").length}{" "}
-              transaksi
+              Dari {expenseCount} transaksi
             </p>
           </CardContent>
         </Card>
@@ -95,7 +87,9 @@ export function Overview({
             <Activity className="h-4 w-4 text-muted-foreground" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold">{transactions.length}</div>
+            <div className="text-2xl font-bold">
+              {incomeCount + expenseCount}
+            </div>
             <p className="text-xs text-muted-foreground">
               Total transaksi yang tercatat
             </p>
@@ -1,4 +1,8 @@
-import { TransactionResponse } from "@/lib/actions";
+import {
+  CategoryReport,
+  TransactionResponse,
+  TypeReport,
+} from "@/lib/actions";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { Progress } from "@/components/ui/progress";
 import {
@@ -8,37 +12,35 @@ import {
   CardHeader,
   CardTitle,
 } from "@/components/ui/card";
-import { formatCurrency } from "@/lib/utils";
+import { formatCurrency, summarizeTotals } from "@/lib/utils";
 
 export default function TabsAnalytics({
-  transactions,
+  totals,
+  categories,
+  recentTransactions,
 }: {
-  transactions: TransactionResponse[];
+  totals: TypeReport[];
+  categories: CategoryReport[];
+  recentTransactions: TransactionResponse[];
 }) {
-  const totalIncome = transactions
-    .filter((t) => t.type === "income")
-    .reduce((sum, t) => sum + t.amount, 0);
-
-  const totalExpenses = transactions
-    .filter((t) => t.type === "expense")
-    .reduce((sum, t) => sum + t.amount, 0);
+  const { totalIncome, totalExpenses, incomeCount, expenseCount } =
+    summarizeTotals(totals);
 
   const netBalance = totalIncome - totalExpenses;
   const savingsRate = totalIncome > 0 ? (netBalance / totalIncome) * 100 : 0;
 
-  const expensesByCategory = transactions
-    .filter((t) => t.type === "expense")
-    .reduce((acc, t) => {
-      acc[t.category] = (acc[t.category] || 0) + t.amount;
-      return acc;
-    }, {} as Record<string, number>);
+  // /reports/by-category is already ordered largest total first.
+  const expensesByCategory = Object.fromEntries(
+    categories
+      .filter((c) => c.type === "expense")
+      .map((c) => [c.category, c.total])
+  );
 
-  const incomeByCategory = transactions
-    .filter((t) => t.type === "income")
-    .reduce((acc, t) => {
-      acc[t.category] = (acc[t.category] || 0) + t.amount;
-      return acc;
-    }, {} as Record<string, number>);
+  const incomeByCategory = Object.fromEntries(
+    categories
+      .filter((c) => c.type === "income")
+      .map((c) => [c.category, c.total])
+  );
 
   return (
     <Tabs defaultValue="overview" className="space-y-4">
@@ -95,42 +97,36 @@ export default function TabsAnalytics({
             </CardHeader>
             <CardContent>
               <div className="space-y-3">
-                {[...transactions]
-                  .sort(
-                    (a, b) =>
-                      new Date(b.date).getTime() - new Date(a.date).getTime()
-                  )
-                  .slice(0, 3)
-                  .map((transaction) => (
-                    <div
-                      key={transaction.id}
-                      className="flex items-center justify-between"
-                    >
-                      <div className="flex flex-col">
-                        <span className="text-sm font-medium">
-                          {transaction.description}
-                        </span>
-                        <span className="text-xs text-muted-foreground">
-                          {transaction.category}
-                        </span>
-                      </div>
-                      <div className="text-right">
-                        <span
-                          className={`text-sm font-medium ${
-                            transaction.type === "income"
-                              ? "text-green-600"
-                              : "text-red-600"
-                          }`}
-                        >
-                          {transaction.type === "income" ? "+" : "-"}
-                          {formatCurrency(transaction.amount)}
-                        </span>
-                        <div className="text-xs text-muted-foreground">
-                          {new Date(transaction.date).toLocaleDateString()}
-                        </div>
+                {recentTransactions.map((transaction) => (
+                  <div
+                    key={transaction.id}
+                    className="flex items-center justify-between"
+                  >
+                    <div className="flex flex-col">
+                      <span className="text-sm font-medium">
+                        {transaction.description}
+                      </span>
+                      <span className="text-xs text-muted-foreground">
+                        {transaction.category}
+                      </span>
+                    </div>
+                    <div className="text-right">
+                      <span
+                        className={`text-sm font-medium ${
+                          transaction.type === "income"
+                            ? "text-green-600"
+                            : "text-red-600"
+                        }`}
+                      >
+                        {transaction.type === "income" ? "+" : "-"}
+                        {formatCurrency(transaction.amount)}
+                      </span>
+                      <div className="text-xs text-muted-foreground">
+                        {new Date(transaction.date).toLocaleDateString()}
                       </div>
                     </div>
-                  ))}
+                  </div>
+                ))}
               </div>
             </CardContent>
           </Card>
@@ -244,7 +240,7 @@ export default function TabsAnalytics({
               <div className="grid grid-cols-2 gap-4 pt-4">
                 <div className="text-center p-4 bg-green-50 rounded-lg">
                   <div className="text-2xl font-bold text-green-600">
-                    {transactions.filter((t) => t.type === "income").length}
+                    {incomeCount}
                   </div>
                   <div className="text-sm text-muted-foreground">
                     Transaksi Pemasukan
@@ -252,7 +248,7 @@ export default function TabsAnalytics({
                 </div>
                 <div className="text-center p-4 bg-red-50 rounded-lg">
                   <div className="text-2xl font-bold text-red-600">
-                    {transactions.filter((t) => t.type === "expense").length}
+                    {expenseCount}
                   </div>
                   <div className="text-sm text-muted-foreground">
                     Transaksi Pengeluaran
@@ -11,7 +11,11 @@ export type Content = components["schemas"]["Content-Output"];
 export type ChatRequest = components["schemas"]["AgentRunRequest"];
 export type PartOutput = components["schemas"]["Part-Output"];
 
-export type ChatSession = components["schemas"]["Session"];
+// One page of a cursor-paginated list; pass nextCursor back for the next one.
+export type Page<T> = {
+  items: T[];
+  nextCursor: string | null;
+};
 
 const API_BASE_URL =
   process.env.NEXT_PUBLIC_API_BASE_URL || "http://backend:8000";
@@ -40,22 +44,69 @@ const apiRequest = async (endpoint: string, options: RequestInit = {}) => {
   return response;
 };
 
-export async function getTransactions(): Promise<TransactionResponse[]> {
+// The list endpoint is keyset-paginated: pages are fetched on demand, and
+// totals come from the /reports endpoints rather than from the rows.
+const TRANSACTIONS_PAGE_SIZE = 50;
+
+export type TypeReport = {
+  type: "income" | "expense";
+  total: number;
+  count: number;
+};
+
+export type CategoryReport = TypeReport & {
+  category: string;
+};
+
+export async function getTransactions(
+  cursor?: string | null,
+  limit: number = TRANSACTIONS_PAGE_SIZE
+): Promise<Page<TransactionResponse>> {
   try {
-    const response = await apiRequest("/api/v1/transactions", {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
+    const response = await apiRequest(`/api/v1/transactions?${params}`, {
       cache: "no-store",
     });
-
-    return await response.json();
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get("X-Next-Cursor"),
+    };
   } catch (error) {
     if (error instanceof Error && error.message.includes("404")) {
-      return [];
+      return { items: [], nextCursor: null };
     }
     console.error("Error fetching transactions:", error);
     throw new Error("Failed to fetch transactions from server");
   }
 }
 
+export async function getTypeReport(): Promise<TypeReport[]> {
+  try {
+    const response = await apiRequest("/api/v1/reports/by-type", {
+      cache: "no-store",
+    });
+    return await response.json();
+  } catch (error) {
+    console.error("Error fetching totals:", error);
+    throw new Error("Failed to fetch totals from server");
+  }
+}
+
+export async function getCategoryReport(): Promise<CategoryReport[]> {
+  try {
+    const response = await apiRequest("/api/v1/reports/by-category", {
+      cache: "no-store",
+    });
+    return await response.json();
+  } catch (error) {
+    console.error("Error fetching category totals:", error);
+    throw new Error("Failed to fetch category totals from server");
+  }
+}
+
 export async function createTransaction(
   transaction: Transaction
 ): Promise<TransactionResponse> {
@@ -106,21 +157,49 @@ export async function sendChatMessage(payload: ChatRequest): Promise<Event[]> {
   }
 }
 
-export async function getChatHistory(): Promise<ChatSession[]> {
+// The `view=summary` shape of GET /sessions: no events, just the listing.
+export type ChatSessionSummary = {
+  id: string;
+  lastUpdateTime: number;
+  title?: string | null;
+};
+
+export async function getChatHistory(
+  cursor?: string | null
+): Promise<Page<ChatSessionSummary>> {
   try {
-    const response = await apiRequest("/api/v1/sessions");
-    const data: ChatSession[] = await response.json();
-    return data;
+    const params = new URLSearchParams({ view: "summary" });
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
+    const response = await apiRequest(`/api/v1/sessions?${params}`, {
+      cache: "no-store",
+    });
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get("X-Next-Cursor"),
+    };
   } catch (error) {
     console.error("Error fetching chat history:", error);
     throw new Error("Failed to fetch chat history from server");
   }
 }
 
-export async function getSession(chatId: string): Promise<Event[]> {
-  const response = await apiRequest(`/api/v1/session/${chatId}`);
-  if (!response.ok) {
-    return [];
+// Returns the newest events of a session, oldest first; pass nextCursor as
+// `before` to load the events that precede them.
+export async function getSession(
+  chatId: string,
+  before?: string | null
+): Promise<Page<Event>> {
+  const params = new URLSearchParams();
+  if (before) {
+    params.set("before", before);
   }
-  return await response.json();
+  const response = await apiRequest(`/api/v1/session/${chatId}?${params}`, {
+    cache: "no-store",
+  });
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
 }
@@ -1,5 +1,6 @@
 import { clsx, type ClassValue } from "clsx";
 import { twMerge } from "tailwind-merge";
+import type { TypeReport } from "@/lib/actions";
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs));
@@ -12,3 +13,15 @@ export const formatCurrency = (amount: number) => {
     minimumFractionDigits: 0,
   }).format(amount);
 };
+
+// Folds the /reports/by-type rows into the figures the summary cards show.
+export function summarizeTotals(report: TypeReport[]) {
+  const income = report.find((row) => row.type === "income");
+  const expense = report.find((row) => row.type === "expense");
+  return {
+    totalIncome: income?.total ?? 0,
+    totalExpenses: expense?.total ?? 0,
+    incomeCount: income?.count ?? 0,
+    expenseCount: expense?.count ?? 0,
+  };
+}
@@ -0,0 +1,106 @@
+-- init-scripts/02-create-transaction-totals.sql
+
+-- Aggregate tables kept in sync with transactions_table by statement-level
+-- triggers, so balance and monthly summaries never scan the base table.
+CREATE TABLE IF NOT EXISTS transaction_totals (
+    type transaction_type PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0,
+    count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS transaction_monthly_totals (
+    type transaction_type NOT NULL,
+    category TEXT NOT NULL,
+    month DATE NOT NULL,
+    total BIGINT NOT NULL DEFAULT 0,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (type, category, month)
+);
+
+-- Bumped by every write statement; the API's response cache keys on it
+CREATE TABLE IF NOT EXISTS transaction_data_version (
+    id SMALLINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Triggers (mirrored in backend/src/database/totals.py)
+CREATE OR REPLACE FUNCTION apply_transaction_totals() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO transaction_totals AS t (type, total, count)
+        SELECT type, -SUM(amount), -COUNT(*) FROM old_rows GROUP BY type
+        ON CONFLICT (type) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+
+        INSERT INTO transaction_monthly_totals AS t (type, category, month, total, count)
+        SELECT type, category, date_trunc('month', date)::date, -SUM(amount), -COUNT(*)
+        FROM old_rows GROUP BY 1, 2, 3
+        ON CONFLICT (type, category, month) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO transaction_totals AS t (type, total, count)
+        SELECT type, SUM(amount), COUNT(*) FROM new_rows GROUP BY type
+        ON CONFLICT (type) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+
+        INSERT INTO transaction_monthly_totals AS t (type, category, month, total, count)
+        SELECT type, category, date_trunc('month', date)::date, SUM(amount), COUNT(*)
+        FROM new_rows GROUP BY 1, 2, 3
+        ON CONFLICT (type, category, month) DO UPDATE
+        SET total = t.total + EXCLUDED.total, count = t.count + EXCLUDED.count;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM transaction_monthly_totals WHERE count = 0;
+    END IF;
+
+    INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reset_transaction_totals() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM transaction_totals;
+    DELETE FROM transaction_monthly_totals;
+    INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER transactions_totals_insert
+AFTER INSERT ON transactions_table
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals();
+
+CREATE OR REPLACE TRIGGER transactions_totals_update
+AFTER UPDATE ON transactions_table
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals();
+
+CREATE OR REPLACE TRIGGER transactions_totals_delete
+AFTER DELETE ON transactions_table
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals();
+
+CREATE OR REPLACE TRIGGER transactions_totals_truncate
+AFTER TRUNCATE ON transactions_table
+FOR EACH STATEMENT EXECUTE FUNCTION reset_transaction_totals();
+
+-- Backfill from any rows that already exist
+INSERT INTO transaction_totals (type, total, count)
+SELECT type, SUM(amount), COUNT(*) FROM transactions_table GROUP BY type
+ON CONFLICT (type) DO UPDATE SET total = EXCLUDED.total, count = EXCLUDED.count;
+
+INSERT INTO transaction_monthly_totals (type, category, month, total, count)
+SELECT type, category, date_trunc('month', date)::date, SUM(amount), COUNT(*)
+FROM transactions_table GROUP BY 1, 2, 3
+ON CONFLICT (type, category, month) DO UPDATE
+SET total = EXCLUDED.total, count = EXCLUDED.count;
+
+COMMENT ON TABLE transaction_totals IS 'Running totals per transaction type';
+COMMENT ON TABLE transaction_monthly_totals IS 'Running totals per transaction type, category and month';
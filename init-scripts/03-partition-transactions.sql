@@ -0,0 +1,210 @@
+-- init-scripts/03-partition-transactions.sql
+
+-- Partition transactions_table by month of date, create the partitions of
+-- the coming months and set up archival of cold months
+-- (mirrored in backend/src/database/partitions.py).
+
+-- Partition maintenance and archival functions
+CREATE OR REPLACE FUNCTION create_transaction_partition(month date) RETURNS text AS $$
+DECLARE
+    lower_bound date := date_trunc('month', month)::date;
+    upper_bound date := (date_trunc('month', month) + interval '1 month')::date;
+    table_name text := 'transactions_y' || to_char(lower_bound, 'YYYY"m"MM');
+BEGIN
+    IF to_regclass(table_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Rows of this month may already sit in the default partition: move
+    -- them into the new table first, then attach it. The CHECK constraint
+    -- lets ATTACH skip scanning the new partition. Writes wait until the
+    -- commit (reads do not), so no row of this month can land in the
+    -- default partition between the move and the ATTACH, which would fail
+    -- on it; they are routed to the new partition once it is attached.
+    LOCK TABLE transactions_table IN SHARE ROW EXCLUSIVE MODE;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE transactions_table INCLUDING DEFAULTS, '
+        || 'CONSTRAINT %I CHECK (date >= %L AND date < %L))',
+        table_name, table_name || '_bounds', lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM transactions_default '
+        || 'WHERE date >= %L AND date < %L RETURNING *) '
+        || 'INSERT INTO %I SELECT * FROM moved',
+        lower_bound, upper_bound, table_name
+    );
+    EXECUTE format(
+        'ALTER TABLE transactions_table ATTACH PARTITION %I '
+        || 'FOR VALUES FROM (%L) TO (%L)',
+        table_name, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'ALTER TABLE %I DROP CONSTRAINT %I', table_name, table_name || '_bounds'
+    );
+    RETURN table_name;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION IF EXISTS ensure_transaction_partitions(integer);
+
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(
+    months_ahead integer,
+    today date DEFAULT (now() AT TIME ZONE 'Asia/Jakarta')::date
+) RETURNS SETOF text AS $$
+DECLARE
+    month date;
+    created text;
+BEGIN
+    -- Workers starting together must not race to create the same table.
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_transaction_partitions'));
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', today::timestamp),
+            date_trunc('month', today::timestamp) + make_interval(months => months_ahead),
+            interval '1 month'
+        )::date
+        -- Rows dated into months that have no partition (yet or any more)
+        UNION
+        SELECT date_trunc('month', date)::date FROM transactions_default
+        ORDER BY 1
+    LOOP
+        created := create_transaction_partition(month);
+        IF created IS NOT NULL THEN
+            RETURN NEXT created;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE IF NOT EXISTS transactions_archive (
+    month DATE NOT NULL,
+    chunk INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    payload JSONB NOT NULL,
+    archived_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (month, chunk)
+);
+
+CREATE OR REPLACE FUNCTION archive_transaction_partition(month date, chunk_rows integer)
+RETURNS bigint AS $$
+DECLARE
+    table_name text := 'transactions_y' || to_char(month, 'YYYY"m"MM');
+    archived bigint;
+    first_chunk integer;
+BEGIN
+    -- The rows are copied out of the still-attached partition; meanwhile
+    -- only writes to it wait, transactions_table stays fully usable.
+    EXECUTE format('LOCK TABLE %I IN SHARE MODE', table_name);
+    EXECUTE format('SELECT count(*) FROM %I', table_name) INTO archived;
+    -- A month archived before (and re-created for late rows) is appended to.
+    SELECT coalesce(max(a.chunk) + 1, 0) INTO first_chunk
+    FROM transactions_archive a
+    WHERE a.month = date_trunc('month', archive_transaction_partition.month)::date;
+    -- Large JSONB values are TOASTed: compressed and stored out of line.
+    EXECUTE format(
+        'INSERT INTO transactions_archive (month, chunk, row_count, payload) '
+        || 'SELECT %L, %s + chunk, count(*), jsonb_agg(doc ORDER BY seq) '
+        || 'FROM (SELECT row_number() OVER (ORDER BY date, id) AS seq, '
+        || '(row_number() OVER (ORDER BY date, id) - 1) / %s AS chunk, '
+        || 'to_jsonb(p) AS doc FROM %I p) numbered GROUP BY chunk',
+        date_trunc('month', month)::date, first_chunk, chunk_rows, table_name
+    );
+    -- DETACH locks transactions_table exclusively until the caller commits,
+    -- so call this in a transaction of its own. DETACH ... CONCURRENTLY is
+    -- not allowed while a default partition exists.
+    EXECUTE format('ALTER TABLE transactions_table DETACH PARTITION %I', table_name);
+    EXECUTE format('DROP TABLE %I', table_name);
+    -- DETACH and DROP fire no triggers, but the rows left the API's reads.
+    INSERT INTO transaction_data_version AS v (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1;
+    RETURN archived;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move the existing rows into monthly partitions (no-op if already partitioned)
+DO $$
+DECLARE
+    id_sequence text;
+    month date;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'transactions_table'::regclass
+    ) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE transactions_table RENAME TO transactions_table_unpartitioned;
+    id_sequence := pg_get_serial_sequence('transactions_table_unpartitioned', 'id');
+
+    EXECUTE format($ddl$
+        CREATE TABLE transactions_table (
+            id INTEGER NOT NULL DEFAULT nextval(%L::regclass),
+            type transaction_type NOT NULL,
+            amount BIGINT NOT NULL,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) PARTITION BY RANGE (date)
+    $ddl$, id_sequence);
+    CREATE TABLE transactions_default PARTITION OF transactions_table DEFAULT;
+
+    FOR month IN
+        SELECT DISTINCT date_trunc('month', date)::date
+        FROM transactions_table_unpartitioned
+    LOOP
+        PERFORM create_transaction_partition(month);
+    END LOOP;
+
+    -- The old table's triggers are dropped with it; the totals are already
+    -- up to date, so the copy must not fire them again.
+    INSERT INTO transactions_table (id, type, amount, description, category, date, created_at)
+    SELECT id, type, amount, description, category, date, created_at
+    FROM transactions_table_unpartitioned;
+
+    EXECUTE format(
+        'ALTER SEQUENCE %s OWNED BY transactions_table.id', id_sequence
+    );
+    DROP TABLE transactions_table_unpartitioned;
+
+    -- Indexes are built after the copy; the partition key must be part of
+    -- the primary key.
+    ALTER TABLE transactions_table ADD PRIMARY KEY (id, date);
+    CREATE INDEX idx_transactions_date ON transactions_table (date DESC);
+    CREATE INDEX idx_transactions_type_date ON transactions_table (type, date DESC);
+    CREATE INDEX idx_transactions_category_date
+        ON transactions_table (category, date DESC);
+
+    COMMENT ON TABLE transactions_table IS
+        'Financial transactions, partitioned by month of date';
+END;
+$$;
+
+-- The totals triggers of the old table were dropped with it
+CREATE OR REPLACE TRIGGER transactions_totals_insert
+AFTER INSERT ON transactions_table
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals();
+
+CREATE OR REPLACE TRIGGER transactions_totals_update
+AFTER UPDATE ON transactions_table
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals();
+
+CREATE OR REPLACE TRIGGER transactions_totals_delete
+AFTER DELETE ON transactions_table
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_transaction_totals();
+
+CREATE OR REPLACE TRIGGER transactions_totals_truncate
+AFTER TRUNCATE ON transactions_table
+FOR EACH STATEMENT EXECUTE FUNCTION reset_transaction_totals();
+
+-- Archived rows, read back from transactions_archive
+CREATE OR REPLACE VIEW transactions_archived AS
+SELECT r.*
+FROM transactions_archive a
+CROSS JOIN LATERAL jsonb_populate_recordset(NULL::transactions_table, a.payload) AS r;
+
+-- The current month (in WIB) and the next three
+SELECT ensure_transaction_partitions(3);